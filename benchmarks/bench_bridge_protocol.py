@@ -0,0 +1,228 @@
+"""Compare bridge calls and bytes per minute of play for each bridge protocol
+
+Replays the page's bridge traffic for simulated play and counts the
+QWebChannel messages and their JSON size:
+
+    full    one call per operation, saves send JSON.stringify(game_state)
+    patch   operations queued in the same task share one batch() call, and
+            saves send a patch of the fields changed since the last sync
+    engine  the Python engine owns the state: input goes to Python in
+            batches and the page receives view deltas every tick
+
+Run from the repository root:
+
+    python benchmarks/bench_bridge_protocol.py --saves 3 --telemetry
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bignum import BigNum, json_default
+from game_data import GENERATORS, generator_cost
+from engine import GameEngine
+from state_sync import StateMirror, diff
+from telemetry import Telemetry
+
+TICKS_PER_SECOND = 10
+# Method indexes are irrelevant to the size; QWebChannel sends them as strings
+INVOKE = {"type": 6, "object": "bridge", "method": "12", "id": 0}
+
+
+def dumps(value):
+    """Serialize like JSON.stringify (no whitespace)"""
+    return json.dumps(value, separators=(',', ':'), default=json_default)
+
+
+class Channel:
+    """Counts the messages each protocol puts on the QWebChannel transport"""
+
+    def __init__(self):
+        self.calls = 0
+        self.bytes_to_python = 0
+        self.bytes_to_page = 0
+
+    def invoke(self, args, response):
+        self.calls += 1
+        self.bytes_to_python += len(dumps(dict(INVOKE, args=args, id=self.calls)))
+        self.bytes_to_page += len(dumps({"type": 10, "id": self.calls, "data": response}))
+
+    def signal(self, args):
+        self.bytes_to_page += len(dumps({"type": 1, "object": "bridge", "signal": 5, "args": args}))
+
+
+def initial_state(counts, now):
+    """Page game state (as JSON values) with the given generator counts"""
+    generators = []
+    for static, count in zip(GENERATORS, counts):
+        gen = dict(static, count=count, unlocked=True)
+        gen["cost"] = generator_cost(static["base_cost"], count).to_json()
+        generators.append(gen)
+    return {
+        "bytes": BigNum(123456.789).to_json(),
+        "total_bytes": BigNum(9876543.21).to_json(),
+        "clicks": 4321,
+        "generators": generators,
+        "last_save": now,
+        "game_start": now - 3600 * 1000,
+        "last_update": now,
+    }
+
+
+def play_second(state, second, args, rng):
+    """Advance the state by one second of ticks, clicks and purchases"""
+    production = sum(gen["count"] * gen["base_production"] for gen in state["generators"])
+    for tick in range(TICKS_PER_SECOND):
+        state["last_update"] += 1000 / TICKS_PER_SECOND
+        earned = production / TICKS_PER_SECOND + args.clicks_per_second / TICKS_PER_SECOND
+        state["bytes"] = (BigNum.from_json(state["bytes"]) + earned).to_json()
+        state["total_bytes"] = (BigNum.from_json(state["total_bytes"]) + earned).to_json()
+    state["clicks"] += args.clicks_per_second
+    if second % args.buy_every == 0:
+        gen = rng.choice(state["generators"])
+        gen["count"] += 1
+        gen["cost"] = generator_cost(gen["base_cost"], gen["count"]).to_json()
+
+
+def timing_samples(rng):
+    """One second of samples as the page's telemetry collects them"""
+    return {
+        "game_loop": [rng.random() * 0.2 for _ in range(TICKS_PER_SECOND)],
+        "render": [rng.random() * 0.5 for _ in range(TICKS_PER_SECOND)],
+        "check_unlocks": [rng.random() * 0.05],
+    }
+
+
+def manual_seconds(saves):
+    """Seconds within each minute at which the manual saves happen"""
+    return {int((i + 1) * 60 / (saves + 1)) for i in range(saves)}
+
+
+def run(args, batched):
+    """Count the bridge traffic for one protocol"""
+    rng = random.Random(args.seed)
+    state = initial_state([50, 40, 30, 20, 10, 5, 1], 1.7e12)
+    synced = json.loads(dumps(state))
+    # The autosave runs every minute; manual saves are spread in between
+    save_seconds = {second for second in range(args.seconds)
+                    if second % 60 == 59 or second % 60 in manual_seconds(args.saves)}
+    telemetry = Telemetry()
+    channel = Channel()
+    version = 1
+    ticket = 0
+
+    for second in range(args.seconds):
+        play_second(state, second, args, rng)
+        ops = []
+        if second in save_seconds:
+            state["last_save"] = state["last_update"]
+            ticket += 1
+            if batched:
+                patch = diff(synced, state)
+                synced = json.loads(dumps(state))
+                ops.append(({"op": "patch", "args": [version, patch]}, version + 1))
+                version += 1
+                ops.append(({"op": "save", "args": []}, ticket))
+            else:
+                channel.invoke([dumps(state)], ticket)
+            channel.signal([ticket, f"Saved {ticket}"])
+        if args.telemetry:
+            samples = timing_samples(rng)
+            telemetry.record_batch(samples)
+            summary = telemetry.summary()
+            if batched:
+                ops.append(({"op": "report_timings", "args": [samples]}, None))
+                ops.append(({"op": "get_timing_summary", "args": []}, summary))
+            else:
+                channel.invoke([dumps(samples)], None)
+                channel.invoke([], dumps(summary))
+        if ops:
+            response = {"version": version, "results": [{"result": result} for _, result in ops]}
+            channel.invoke([dumps([op for op, _ in ops])], dumps(response))
+
+    return per_minute(channel, args.seconds)
+
+
+def run_engine(args):
+    """Count the bridge traffic when the Python engine owns the state"""
+    rng = random.Random(args.seed)
+    start = 1.7e12
+    engine = GameEngine(now=start)
+    engine.load_state(initial_state([50, 40, 30, 20, 10, 5, 1], start))
+    mirror = StateMirror()
+    mirror.update(engine.view_state())
+    save_seconds = {second for second in range(args.seconds)
+                    if second % 60 == 59 or second % 60 in manual_seconds(args.saves)}
+    # Ticks within each second that carry a click
+    click_ticks = [tick * args.clicks_per_second // TICKS_PER_SECOND for tick in range(TICKS_PER_SECOND)]
+    telemetry = Telemetry()
+    channel = Channel()
+    ticket = 0
+
+    def push():
+        version, patch = mirror.update(engine.view_state())
+        if patch:
+            channel.signal([version, dumps(patch)])
+
+    def batch(ops, results):
+        response = {"version": mirror.version, "results": [{"result": result} for result in results]}
+        channel.invoke([dumps(ops)], dumps(response))
+        push()
+
+    for second in range(args.seconds):
+        for tick in range(TICKS_PER_SECOND):
+            if tick == 0 or click_ticks[tick] != click_ticks[tick - 1]:
+                engine.click()
+                batch([{"op": "click", "args": []}], [None])
+            engine.tick()
+            push()
+        if second % args.buy_every == 0:
+            index = rng.randrange(len(engine.catalog))
+            batch([{"op": "buy", "args": [index]}], [engine.buy(index)])
+        ops, results = [], []
+        if second in save_seconds:
+            ticket += 1
+            ops.append({"op": "save", "args": []})
+            results.append(ticket)
+            channel.signal([ticket, f"Saved {ticket}"])
+        if args.telemetry:
+            samples = timing_samples(rng)
+            telemetry.record_batch(samples)
+            ops += [{"op": "report_timings", "args": [samples]}, {"op": "get_timing_summary", "args": []}]
+            results += [None, telemetry.summary()]
+        if ops:
+            batch(ops, results)
+
+    return per_minute(channel, args.seconds)
+
+
+def per_minute(channel, seconds):
+    scale = 60 / seconds
+    return {
+        "calls": channel.calls * scale,
+        "to_python": channel.bytes_to_python * scale,
+        "to_page": channel.bytes_to_page * scale,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=int, default=600, help="seconds of play to simulate")
+    parser.add_argument("--saves", type=int, default=2, help="manual saves per minute, besides the autosave")
+    parser.add_argument("--clicks-per-second", type=int, default=5)
+    parser.add_argument("--buy-every", type=int, default=10, help="seconds between purchases")
+    parser.add_argument("--telemetry", action="store_true", help="include the once-a-second telemetry flush")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'protocol':<8} {'calls/min':>10} {'to python B/min':>16} {'to page B/min':>14}")
+    for name, result in (("full", run(args, False)), ("patch", run(args, True)), ("engine", run_engine(args))):
+        print(f"{name:<8} {result['calls']:>10.1f} {result['to_python']:>16.0f} {result['to_page']:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
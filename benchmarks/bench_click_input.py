@@ -0,0 +1,129 @@
+"""Stress the click area with synthetic high-rate clicks and report frame time and dropped input
+
+Runs the game page offscreen, fires clicks on the click area through
+runJavaScript at a fixed rate and records every animation frame meanwhile.
+Clicks the engine never counted are reported as dropped. "per-event" mode
+sends one bridge operation per click, as the page did before clicks were
+coalesced per frame:
+
+    python benchmarks/bench_click_input.py --rates 100 500 2000 --seconds 3
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, ".."))
+sys.path.insert(0, BENCH_DIR)
+
+from PyQt6.QtCore import QEventLoop, QTimer
+from PyQt6.QtWidgets import QApplication
+
+from session import StartupProfile
+from suite import percentile, run_async_js, wait_until
+
+MODES = ("coalesced", "per-event")
+# Clicks are fired in bursts every interval, as timers below 10 ms are clamped
+BURST_INTERVAL_MS = 10
+
+
+def stress(page, mode, rate, seconds):
+    """Fire rate clicks per second for seconds; returns clicks fired and frame times"""
+    per_burst = max(1, round(rate * BURST_INTERVAL_MS / 1000))
+    override = "click_byte = () => bridge_call('click', [1]);" if mode == "per-event" else ""
+    return run_async_js(page, f"""
+        const original = click_byte;
+        {override}
+        const area = document.querySelector('.click-area');
+        const frames = [];
+        let last = performance.now();
+        let running = true;
+        const frame = now => {{
+            frames.push(now - last);
+            last = now;
+            if (running) {{
+                requestAnimationFrame(frame);
+            }}
+        }};
+        requestAnimationFrame(frame);
+        let fired = 0;
+        const begin = performance.now();
+        await new Promise(resolve => {{
+            const timer = setInterval(() => {{
+                for (let i = 0; i < {per_burst}; i++) {{
+                    area.click();
+                    fired++;
+                }}
+                if (performance.now() - begin >= {seconds * 1000}) {{
+                    clearInterval(timer);
+                    resolve();
+                }}
+            }}, {BURST_INTERVAL_MS});
+        }});
+        running = false;
+        click_byte = original;
+        return {{fired: fired, frames: frames, elapsed_ms: performance.now() - begin}};
+    """, timeout=seconds + 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rates", type=int, nargs="+", default=[100, 500, 2000],
+                        help="synthetic clicks per second")
+    parser.add_argument("--seconds", type=float, default=3.0, help="seconds to click at each rate")
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES)
+    parser.add_argument("--settle", type=float, default=2.0,
+                        help="seconds to wait for queued clicks to reach the engine")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for startup")
+    args = parser.parse_args()
+
+    import web_ui
+    os.chdir(tempfile.mkdtemp(prefix="byte-clicker-clicks-"))
+    web_ui.register_app_scheme()
+    profile = StartupProfile()
+    app = QApplication(sys.argv[:1])
+    window = web_ui.WebWindow(profile)
+    window.show()
+    page = window.web_view.page()
+    wait_until(lambda: "first_tick" in profile.marks, args.timeout)
+
+    engine = window.bridge.engine
+    # Count the click operations that reach Python
+    click = window.bridge.batch_ops["click"]
+    calls = [0]
+
+    def counted_click(count=1):
+        calls[0] += 1
+        click(count)
+    window.bridge.batch_ops["click"] = counted_click
+
+    print(f"{'mode':<10} {'rate/s':>7} {'fired':>7} {'counted':>8} {'dropped':>8} {'bridge ops':>11}"
+          f" {'frame p50 ms':>13} {'frame p95 ms':>13} {'frame max ms':>13}")
+    for mode in args.modes:
+        for rate in args.rates:
+            clicks_before = engine.clicks
+            calls[0] = 0
+            result = stress(page, mode, rate, args.seconds)
+            fired = result["fired"]
+            deadline = time.monotonic() + args.settle
+            while engine.clicks - clicks_before < fired and time.monotonic() < deadline:
+                QApplication.processEvents(QEventLoop.ProcessEventsFlag.AllEvents, 50)
+            counted = engine.clicks - clicks_before
+            frames = result["frames"][1:] or [0.0]
+            print(f"{mode:<10} {rate:>7} {fired:>7} {counted:>8} {fired - counted:>8} {calls[0]:>11}"
+                  f" {percentile(frames, 0.50):>13.2f} {percentile(frames, 0.95):>13.2f}"
+                  f" {max(frames):>13.2f}")
+
+    window.bridge.session.shutdown()
+    window.close()
+    QTimer.singleShot(0, app.quit)
+    app.exec()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Measure engine tick, purchase, unlock, view snapshot and view push cost against catalog size
+
+Runs the Python GameEngine headless with synthetic catalogs of growing size,
+each generator unlocked by owning 5 of the previous one. "push" is a tick
+plus the view delta WebBridge sends the page after it; "full push" diffs
+the whole view state instead, as before generators were tracked:
+
+    python benchmarks/bench_engine.py --sizes 7 100 1000 10000
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bignum import BigNum
+from engine import GameEngine
+from game_data import GENERATORS, Catalog
+from state_sync import StateMirror
+
+
+def catalog(size):
+    """size generators following the same cost and production progression"""
+    generators = []
+    for index in range(size):
+        static = GENERATORS[index % len(GENERATORS)]
+        scale = 10.0 ** min(index // len(GENERATORS), 250)
+        generators.append({
+            "id": index,
+            "name": f"{static['name']} {index // len(GENERATORS) + 1}",
+            "base_cost": static["base_cost"] * scale,
+            "base_production": static["base_production"] * scale,
+        })
+    return Catalog(generators)
+
+
+def measure(func, number):
+    """Return the mean time of func in microseconds"""
+    return timeit.timeit(func, number=number) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[7, 100, 1000, 10000],
+                        help="catalog sizes to measure")
+    parser.add_argument("--number", type=int, default=200, help="iterations per measurement")
+    args = parser.parse_args()
+
+    print(f"{'generators':>10} {'load ms':>9} {'tick us':>9} {'buy us':>9} {'unlock us':>10} "
+          f"{'multiplier us':>14} {'view us':>10} {'push us':>9} {'full push us':>13}")
+    for size in args.sizes:
+        rules = catalog(size)
+        engine = GameEngine(rules, now=0)
+        state = engine.to_state()
+        for gen in state["generators"]:
+            gen["count"] = 10
+            gen["unlocked"] = True
+        state["bytes"] = BigNum.from_log10(300)
+        load_ms = measure(lambda: engine.load_state(state), 1) / 1000
+
+        tick_us = measure(engine.tick, args.number * 10)
+        buy_us = measure(lambda: engine.buy(0), args.number)
+        # The purchase that unlocks the last generator
+        last = size - 1
+        unlock_us = 0.0
+        if last:
+            engine.counts[last - 1] = 4
+            engine.unlocked[last] = 0
+            unlock_us = measure(lambda: engine.buy(last - 1), 1)
+        multiplier_us = measure(lambda: engine.set_multiplier(last, 2.0), args.number)
+        engine.view_state()
+        view_us = measure(engine.view_state, max(1, args.number // 10))
+
+        mirror = StateMirror()
+
+        def push():
+            engine.tick()
+            fields, generators = engine.view_delta()
+            mirror.update(fields, {"generators": generators})
+        push()
+        push_us = measure(push, args.number * 10)
+        full_mirror = StateMirror()
+
+        def full_push():
+            engine.tick()
+            full_mirror.update(engine.view_state())
+        full_push()
+        full_push_us = measure(full_push, max(1, args.number // 10))
+        print(f"{size:>10} {load_ms:>9.2f} {tick_us:>9.2f} {buy_us:>9.2f} {unlock_us:>10.2f} "
+              f"{multiplier_us:>14.2f} {view_us:>10.1f} {push_us:>9.2f} {full_push_us:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Compare startup time and memory of the web and native front ends
+
+Starts main.py once per front end in a temporary directory, waits for the
+first rendered game tick and reads the RSS of the game process and its
+helper processes (Linux /proc only). Both run offscreen unless
+QT_QPA_PLATFORM is set:
+
+    python benchmarks/bench_frontends.py --runs 3
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+MAIN = os.path.join(BENCH_DIR, "..", "main.py")
+sys.path.insert(0, BENCH_DIR)
+
+from suite import child_pids, read_rss_kb
+
+FRONT_ENDS = {"web": [], "native": ["--native-ui"]}
+
+
+def measure(flags, timeout):
+    """Return (first_tick_ms, rss_total_mb) for one start of the game"""
+    process = subprocess.Popen([sys.executable, MAIN, "--startup-profile"] + flags,
+                               cwd=tempfile.mkdtemp(prefix="byte-clicker-frontend-"),
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    # Ends the wait below if the game hangs without printing
+    watchdog = threading.Timer(timeout, process.kill)
+    watchdog.start()
+    try:
+        first_tick = None
+        for line in process.stdout:
+            if line.startswith("first_tick"):
+                first_tick = float(line.split()[1])
+                break
+        if first_tick is None:
+            raise RuntimeError(f"main.py {' '.join(flags)} did not report its first tick")
+        # Give helper processes a moment to settle
+        time.sleep(1.0)
+        rss_kb = read_rss_kb(process.pid) + sum(read_rss_kb(child) for child in child_pids(process.pid))
+        return first_tick, rss_kb / 1024
+    finally:
+        watchdog.cancel()
+        process.kill()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3, help="starts per front end")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for startup")
+    parser.add_argument("--front-ends", nargs="+", default=list(FRONT_ENDS), choices=list(FRONT_ENDS))
+    args = parser.parse_args()
+
+    print(f"{'front end':<10} {'first tick ms':>14} {'RSS MB':>8}")
+    for name in args.front_ends:
+        results = [measure(FRONT_ENDS[name], args.timeout) for _ in range(args.runs)]
+        first_tick = statistics.median(result[0] for result in results)
+        rss = statistics.median(result[1] for result in results)
+        print(f"{name:<10} {first_tick:>14.1f} {rss:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Measure event journal appends, compaction and crash recovery replay
+
+Run from the repository root:
+
+    python benchmarks/bench_journal.py --events 1000 10000 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from engine import GameEngine
+from journal import Journal, OP_BUY, OP_CLICK, RECORD_SIZE, replay
+
+
+def measure(func, number):
+    """Return the mean time of func in milliseconds"""
+    return timeit.timeit(func, number=number) / number * 1000
+
+
+def record_play(engine, journal, events, rng):
+    """Play random clicks and purchases, journaling each like GameSession does"""
+    for _ in range(events):
+        engine.tick(rng.randint(0, 10))
+        if rng.random() < 0.8:
+            count = rng.randint(1, 20)
+            engine.click(count)
+            journal.append(engine.last_update, OP_CLICK, count)
+        else:
+            index = rng.randrange(len(engine.catalog))
+            amount = engine.purchase_amount(index)
+            if engine.buy(index):
+                journal.append(engine.last_update, OP_BUY, index, amount)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="journal lengths to measure")
+    parser.add_argument("--number", type=int, default=10000, help="appends per measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        journal = Journal(os.path.join(directory, "append.journal"))
+        append_us = measure(lambda: journal.append(0.0, OP_CLICK, 1), args.number) * 1000
+        journal.close()
+    print(f"append: {append_us:.2f} us per record, {RECORD_SIZE} bytes")
+
+    print(f"{'events':>8} {'KiB':>8} {'replay ms':>10} {'compact ms':>11} {'match':>6}")
+    for events in args.events:
+        rng = random.Random(0)
+        with tempfile.TemporaryDirectory() as directory:
+            journal = Journal(os.path.join(directory, "play.journal"))
+            engine = GameEngine(now=0.0)
+            snapshot = engine.to_state()
+            record_play(engine, journal, events, rng)
+
+            recovered = GameEngine()
+            def recover():
+                recovered.load_state(snapshot)
+                replay(recovered, journal.records())
+            replay_ms = measure(recover, 3)
+            match = (recovered.counts == engine.counts and recovered.clicks == engine.clicks
+                     and abs(recovered.bytes.log10() - engine.bytes.log10()) < 1e-9)
+
+            size_kib = journal.size / 1024
+            compact_ms = measure(lambda: journal.compact(journal.seq // 2), 1)
+            journal.close()
+        print(f"{events:>8} {size_kib:>8.1f} {replay_ms:>10.2f} {compact_ms:>11.2f} {str(match):>6}")
+
+
+if __name__ == "__main__":
+    main()
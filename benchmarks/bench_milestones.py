@@ -0,0 +1,87 @@
+"""Measure engine tick cost against the number of defined milestones
+
+Compares the engine, which checks the top of one threshold heap per
+metric, with scanning every pending milestone on each tick. Run from the
+repository root:
+
+    python benchmarks/bench_milestones.py --milestones 0 100 1000 10000
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from engine import GameEngine
+from game_data import CATALOG, Catalog
+
+
+def synthetic_milestones(count, rng):
+    """count milestones spread over every metric, with thresholds no run reaches"""
+    milestones = []
+    for index in range(count):
+        metric = rng.choice(("total_bytes", "clicks", "play_seconds", "generator"))
+        if metric == "total_bytes":
+            threshold = 10 ** rng.uniform(20, 300)
+        else:
+            threshold = rng.randint(10 ** 6, 10 ** 9)
+        milestone = {"name": f"Milestone {index}", "metric": metric, "threshold": threshold}
+        if metric == "generator":
+            milestone["generator"] = rng.randrange(len(CATALOG))
+        milestones.append(milestone)
+    return milestones
+
+
+def scan_milestones(engine, pending):
+    """Check every pending milestone against the engine, as a per-tick scan would"""
+    reached = []
+    play_seconds = (engine.last_update - engine.game_start) / 1000
+    for milestone in pending:
+        key = milestone["key"]
+        if key == "total_bytes":
+            value = engine.total_bytes
+        elif key == "clicks":
+            value = engine.clicks
+        elif key == "play_seconds":
+            value = play_seconds
+        else:
+            value = engine.counts[key]
+        if value >= milestone["threshold"]:
+            reached.append(milestone)
+    return reached
+
+
+def measure(func, number):
+    """Return the mean time of func in microseconds"""
+    return timeit.timeit(func, number=number) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--milestones", type=int, nargs="+", default=[0, 100, 1000, 10000],
+                        help="numbers of milestones to measure")
+    parser.add_argument("--number", type=int, default=20000, help="ticks per measurement")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'milestones':>10} {'heap tick us':>13} {'scan tick us':>13}")
+    for count in args.milestones:
+        catalog = Catalog(CATALOG.generators, CATALOG.click_power, synthetic_milestones(count, rng))
+        engine = GameEngine(catalog, now=0.0)
+        for index in range(len(catalog)):
+            engine.counts[index] = 10
+        engine.load_state(engine.to_state())
+        heap_us = measure(engine.tick, args.number)
+
+        def scan_tick():
+            engine.tick()
+            scan_milestones(engine, catalog.milestones)
+        scan_us = measure(scan_tick, max(1, args.number // max(1, count // 100)))
+        print(f"{count:>10} {heap_us:>13.2f} {scan_us:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
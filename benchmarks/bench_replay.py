@@ -0,0 +1,141 @@
+"""Replay an input recording as a repeatable load on the engine, the bridge or the page
+
+Without --recording a synthetic one is made from random play. Run from the
+repository root:
+
+    python benchmarks/bench_replay.py --events 20000 --through engine bridge page
+    python main.py --record session.rec    # play, then exit
+    python benchmarks/bench_replay.py --recording session.rec --through page
+
+"engine" replays straight into a GameEngine; "bridge" sends every event
+through WebBridge.batch() with the session on a replay clock, including
+the view deltas; "page" does the same with the game page running
+offscreen and reports the page's render and delta timings (needs
+QtWebEngine).
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, ".."))
+sys.path.insert(0, BENCH_DIR)
+
+import recording
+from bench_journal import record_play
+from engine import GameEngine
+
+TARGETS = ("engine", "bridge", "page")
+# Events between runs of the Qt event loop while the page is replayed
+PAGE_EVENTS_PER_FRAME = 20
+
+
+def synthetic_recording(path, events, seed=0):
+    """Write a recording of random play with the given number of events to path"""
+    engine = GameEngine(now=0.0)
+    recorder = recording.Recorder(path, engine.to_state())
+    record_play(engine, recorder, events, random.Random(seed))
+    return recorder.close(engine.to_state())
+
+
+def replay_engine(rec, repeat):
+    """Fastest of repeat headless engine replays, in ms"""
+    engine = GameEngine(now=0.0)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        recording.replay_recording(rec, engine)
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings), recording.compare_states(rec.final_state, engine.to_state())
+
+
+def replay_bridge(rec, with_page, timeout):
+    """Replay through a WebBridge, optionally with the page rendering; returns (ms, differences, page timings)"""
+    from PyQt6.QtCore import QEventLoop
+    from PyQt6.QtWidgets import QApplication
+    import web_ui
+    from session import StartupProfile
+    from suite import run_js, wait_until
+
+    os.chdir(tempfile.mkdtemp(prefix="byte-clicker-replay-"))
+    web_ui.register_app_scheme()
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    clock = recording.ReplayClock()
+    on_event = None
+    if with_page:
+        profile = StartupProfile()
+        window = web_ui.WebWindow(profile)
+        window.show()
+        wait_until(lambda: "first_tick" in profile.marks, timeout)
+        bridge = window.bridge
+        bridge.session.tick_timer.stop()
+        bridge.session.clock = clock
+        run_js(window.web_view.page(), "set_telemetry(true); true")
+
+        def pump_events(index):
+            if index % PAGE_EVENTS_PER_FRAME == 0:
+                app.processEvents(QEventLoop.ProcessEventsFlag.AllEvents)
+        on_event = pump_events
+    else:
+        window = None
+        bridge = web_ui.WebBridge(web_ui.GameSession(clock=clock))
+        bridge.session.window_active = False
+
+    start = time.perf_counter()
+    final_state = recording.replay_through_bridge(rec, bridge, clock, on_event)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    differences = recording.compare_states(rec.final_state, final_state)
+
+    page_timings = {}
+    if with_page:
+        # Let the page send its last timings
+        run_js(window.web_view.page(), "flush_telemetry(); true")
+        deadline = time.monotonic() + 2
+        while time.monotonic() < deadline:
+            app.processEvents(QEventLoop.ProcessEventsFlag.AllEvents, 50)
+        page_timings = bridge.telemetry.summary()
+        window.close()
+    bridge.session.shutdown()
+    return elapsed_ms, differences, page_timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recording", help="recording to replay (default: a synthetic one)")
+    parser.add_argument("--events", type=int, default=20000, help="events in the synthetic recording")
+    parser.add_argument("--through", nargs="+", default=["engine"], choices=TARGETS)
+    parser.add_argument("--repeat", type=int, default=5, help="engine replays; the fastest is reported")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for the page")
+    args = parser.parse_args()
+
+    path = args.recording
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(prefix="byte-clicker-recording-"), "synthetic.rec")
+        synthetic_recording(path, args.events)
+    path = os.path.abspath(path)
+    rec = recording.read_recording(path)
+    print(f"{len(rec.events)} events, {rec.duration_ms / 1000:.1f} s of play, {os.path.getsize(path)} bytes")
+
+    print(f"{'through':<8} {'replay ms':>10} {'us/event':>9} {'matches':>8}")
+    for target in args.through:
+        if target == "engine":
+            elapsed_ms, differences = replay_engine(rec, args.repeat)
+            page_timings = {}
+        else:
+            elapsed_ms, differences, page_timings = replay_bridge(rec, target == "page", args.timeout)
+        per_event = elapsed_ms * 1000 / max(1, len(rec.events))
+        print(f"{target:<8} {elapsed_ms:>10.1f} {per_event:>9.2f} {str(not differences):>8}")
+        for line in differences:
+            print("    " + line)
+        for name, summary in sorted(page_timings.items()):
+            print(f"    {name:<28} p50 {summary['p50']:.3f} ms  p95 {summary['p95']:.3f} ms  n {summary['count']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Compare save size and encode/decode time of the binary and JSON formats
+
+Run from the repository root:
+
+    python benchmarks/bench_save_format.py
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import save_format
+from bignum import BigNum, json_default
+from game_data import GENERATORS, generator_cost
+
+
+def sample_state(counts, bytes_=123456.789, total_bytes=9876543.21):
+    """Build a full game state like the engine saves"""
+    now = time.time() * 1000
+    generators = []
+    for static, count in zip(GENERATORS, counts):
+        gen = dict(static)
+        gen["count"] = count
+        gen["cost"] = generator_cost(static["base_cost"], count)
+        gen["unlocked"] = True
+        generators.append(gen)
+    return {
+        "bytes": BigNum.from_json(bytes_),
+        "total_bytes": BigNum.from_json(total_bytes),
+        "clicks": 4321,
+        "generators": generators,
+        "last_save": now,
+        "game_start": now - 3600 * 1000,
+        "last_update": now,
+    }
+
+
+def measure(func, number):
+    """Return the mean time of func in microseconds"""
+    seconds = timeit.timeit(func, number=number)
+    return seconds / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000, help="iterations per measurement")
+    args = parser.parse_args()
+
+    scenarios = {
+        "new game": sample_state([0] * len(GENERATORS)),
+        "mid game": sample_state([50, 40, 30, 20, 10, 5, 1]),
+        "late game": sample_state([400, 350, 300, 250, 200, 150, 100]),
+        "endless": sample_state([5000] * len(GENERATORS), BigNum.from_log10(1234.5),
+                                BigNum.from_log10(1240.25)),
+    }
+
+    print(f"{'scenario':<10} {'format':<7} {'bytes':>7} {'encode us':>10} {'decode us':>10}")
+    for name, state in scenarios.items():
+        json_data = json.dumps(state, default=json_default).encode('utf-8')
+        binary_data = save_format.encode(state)
+
+        results = (
+            ("json", len(json_data),
+             measure(lambda: json.dumps(state, default=json_default).encode('utf-8'), args.number),
+             measure(lambda: json.loads(json_data.decode('utf-8')), args.number)),
+            ("binary", len(binary_data),
+             measure(lambda: save_format.encode(state), args.number),
+             measure(lambda: save_format.decode(binary_data), args.number)),
+        )
+        for fmt, size, encode_us, decode_us in results:
+            print(f"{name:<10} {fmt:<7} {size:>7} {encode_us:>10.2f} {decode_us:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Measure listing save slots from the SQLite index against decoding every save
+
+Run from the repository root:
+
+    python benchmarks/bench_save_slots.py --slots 10 100 1000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import save_format
+from bench_save_format import sample_state
+from save_slots import SlotStore, summarize
+
+
+def measure(func, number):
+    """Return the mean time of func in milliseconds"""
+    return timeit.timeit(func, number=number) / number * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--slots", type=int, nargs="+", default=[10, 100, 1000],
+                        help="numbers of slots to measure")
+    parser.add_argument("--number", type=int, default=20, help="iterations per measurement")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'slots':>6} {'save ms':>9} {'list ms':>9} {'decode all ms':>14} {'load one ms':>12}")
+    for count in args.slots:
+        with tempfile.TemporaryDirectory() as directory:
+            store = SlotStore(os.path.join(directory, "slots.db"))
+            states = [sample_state([rng.randint(0, 500) for _ in range(7)]) for _ in range(count)]
+            for index, state in enumerate(states):
+                store.write(f"slot {index}", save_format.encode(state), summarize(state))
+
+            state = states[0]
+            save_ms = measure(lambda: store.write("slot 0", save_format.encode(state), summarize(state)),
+                              args.number)
+            list_ms = measure(store.list, args.number)
+            names = [slot["name"] for slot in store.list()]
+            decode_ms = measure(lambda: [save_format.decode(store.read(name)[0]) for name in names],
+                                max(1, args.number // 10))
+            load_ms = measure(lambda: save_format.decode(store.read("slot 0")[0]), args.number)
+            store.close()
+        print(f"{count:>6} {save_ms:>9.3f} {list_ms:>9.3f} {decode_ms:>14.3f} {load_ms:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
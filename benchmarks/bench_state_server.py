@@ -0,0 +1,147 @@
+"""Measure the state streaming endpoint against the number of connected dashboards
+
+Starts a StateServer on a free localhost port, connects local event
+stream clients and publishes the state of an engine under random play.
+Reports the publish cost on the publishing (GUI) thread, the delay until
+each client received a version and whether every client rebuilt the
+final state from its snapshot and deltas. No Qt or network access is
+needed. Run from the repository root:
+
+    python benchmarks/bench_state_server.py --clients 1 10 100 --seconds 3
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, ".."))
+
+from engine import GameEngine
+from state_server import StateServer, dashboard_state
+from state_sync import apply_patch
+from telemetry import percentile
+
+
+class StreamClient(threading.Thread):
+    """Reads /events and rebuilds the state from its snapshot and deltas"""
+
+    def __init__(self, server, published):
+        super().__init__(daemon=True)
+        host, port = server.url.rsplit("/", 1)[1].split(":")
+        self.connection = http.client.HTTPConnection(host, int(port))
+        self.published = published
+        self.state = None
+        self.version = 0
+        self.delays = []
+
+    def run(self):
+        self.connection.request("GET", "/events")
+        response = self.connection.getresponse()
+        event = None
+        try:
+            for line in response:
+                line = line.decode('utf-8').rstrip("\n")
+                if line.startswith("event: "):
+                    event = line[len("event: "):]
+                elif line.startswith("data: "):
+                    self.on_event(event, json.loads(line[len("data: "):]))
+        except (OSError, http.client.HTTPException):
+            pass
+
+    def on_event(self, event, data):
+        if event == "snapshot":
+            self.state = data["state"]
+        else:
+            if self.state is None:
+                self.state = {}
+            apply_patch(self.state, data["patch"])
+        self.version = data["version"]
+        sent = self.published.get(self.version)
+        if sent is not None:
+            self.delays.append((time.perf_counter() - sent) * 1000)
+
+    def close(self):
+        if self.connection.sock:
+            self.connection.sock.close()
+
+
+def play(engine, rng, steps):
+    """Advance the engine by steps ticks of clicking and buying"""
+    for _ in range(steps):
+        engine.click(rng.randint(0, 5))
+        if rng.random() < 0.3:
+            engine.buy(rng.randrange(len(engine.catalog)))
+        engine.tick()
+
+
+def run(clients, seconds, interval_ms):
+    """Publish for seconds with clients connected; returns the measurements"""
+    server = StateServer(interval_ms=interval_ms)
+    session = SimpleNamespace(engine=GameEngine(now=0.0), slot="bench")
+    rng = random.Random(0)
+    published = {}
+    server.publish(dashboard_state(session))
+    streams = [StreamClient(server, published) for _ in range(clients)]
+    for stream in streams:
+        stream.start()
+    deadline = time.monotonic() + 5
+    while server.clients < clients and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    publish_ms = []
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        play(session.engine, rng, 10)
+        start = time.perf_counter()
+        if server.maybe_publish(session):
+            publish_ms.append((time.perf_counter() - start) * 1000)
+            published[server.version] = time.perf_counter()
+        time.sleep(0.01)
+
+    # The last state always reaches the clients
+    final = dashboard_state(session)
+    if server.publish(final):
+        published[server.version] = time.perf_counter()
+    deadline = time.monotonic() + 5
+    while any(stream.version < server.version for stream in streams) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    matched = sum(stream.state == final for stream in streams)
+    delays = [delay for stream in streams for delay in stream.delays]
+    for stream in streams:
+        stream.close()
+    server.close()
+    return {
+        "versions": server.version,
+        "publish_ms": sorted(publish_ms),
+        "delays": sorted(delays),
+        "matched": matched,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 10, 100],
+                        help="numbers of connected event stream clients")
+    parser.add_argument("--seconds", type=float, default=3.0, help="seconds to publish for")
+    parser.add_argument("--interval", type=int, default=100, help="least ms between published states")
+    args = parser.parse_args()
+
+    print(f"{'clients':>7} {'versions':>9} {'publish p50 ms':>15} {'publish p95 ms':>15}"
+          f" {'delay p50 ms':>13} {'delay p95 ms':>13} {'rebuilt':>8}")
+    for clients in args.clients:
+        result = run(clients, args.seconds, args.interval)
+        publish_ms, delays = result["publish_ms"], result["delays"]
+        print(f"{clients:>7} {result['versions']:>9} {percentile(publish_ms, 50):>15.3f}"
+              f" {percentile(publish_ms, 95):>15.3f} {percentile(delays, 50):>13.2f}"
+              f" {percentile(delays, 95):>13.2f} {result['matched']:>4}/{clients:<3}")
+
+
+if __name__ == "__main__":
+    main()
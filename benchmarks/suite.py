@@ -0,0 +1,327 @@
+"""Headless benchmark suite for the bridge, the save path, the game tick and idle CPU
+
+Runs the real game window offscreen and writes the results as JSON:
+
+    python benchmarks/suite.py --output results.json
+    python benchmarks/suite.py --compare baseline.json --threshold 0.15
+
+With --compare the run fails (exit status 1) when any metric is worse than
+the baseline by more than the threshold.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from PyQt6.QtCore import QEventLoop, QTimer
+from PyQt6.QtWidgets import QApplication
+
+from session import StartupProfile
+from bignum import BigNum, json_default
+from game_data import GENERATORS, generator_cost
+
+# Whether a larger value of each metric is better or worse
+METRICS = {
+    "startup_load_finished_ms": "lower",
+    "bridge_roundtrip_p50_ms": "lower",
+    "bridge_roundtrip_p95_ms": "lower",
+    "bridge_calls_per_s": "higher",
+    "save_realistic_ms": "lower",
+    "load_realistic_ms": "lower",
+    "save_large_ms": "lower",
+    "load_large_ms": "lower",
+    "tick_ms": "lower",
+    "update_display_ms": "lower",
+    "rss_main_mb": "lower",
+    "rss_total_mb": "lower",
+    "idle_cpu_visible_pct": "lower",
+    "idle_cpu_hidden_pct": "lower",
+}
+
+
+def wait_until(predicate, timeout=30.0):
+    """Run the Qt event loop until predicate() is true"""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise TimeoutError("Benchmark step timed out")
+        QApplication.processEvents(QEventLoop.ProcessEventsFlag.AllEvents, 50)
+
+
+def run_js(page, code, timeout=30.0):
+    """Evaluate code in the page and return its (synchronous) result"""
+    result = {}
+    page.runJavaScript(code, lambda value: result.setdefault("value", value))
+    wait_until(lambda: "value" in result, timeout)
+    return result["value"]
+
+
+def run_async_js(page, code, timeout=60.0):
+    """Evaluate an async function body in the page and return what it resolves to"""
+    run_js(page, f"window.__bench_result = undefined;"
+                 f"(async () => {{ {code} }})().then(r => {{ window.__bench_result = JSON.stringify(r); }});"
+                 f"true")
+    value = {}
+
+    def poll():
+        raw = run_js(page, "window.__bench_result === undefined ? null : window.__bench_result")
+        if raw is not None:
+            value["result"] = json.loads(raw)
+        return "result" in value
+
+    wait_until(poll, timeout)
+    return value["result"]
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def sample_state(generator_count, count=120):
+    """Full game state with generator_count generators, like the page sends"""
+    now = time.time() * 1000
+    generators = []
+    for index in range(generator_count):
+        static = GENERATORS[index % len(GENERATORS)]
+        gen = dict(static, id=index, count=count, unlocked=True)
+        gen["cost"] = generator_cost(static["base_cost"], count)
+        generators.append(gen)
+    return {
+        "bytes": BigNum.from_log10(42.5),
+        "total_bytes": BigNum.from_log10(43.1),
+        "clicks": 123456,
+        "generators": generators,
+        "last_save": now,
+        "game_start": now - 86400 * 1000,
+        "last_update": now,
+    }
+
+
+def bench_bridge(page, calls):
+    """Round-trip latency of sequential slot calls and throughput of pipelined ones"""
+    result = run_async_js(page, f"""
+        const times = [];
+        for (let i = 0; i < {calls}; i++) {{
+            const start = performance.now();
+            await bridge.save_stats();
+            times.push(performance.now() - start);
+        }}
+        const start = performance.now();
+        await Promise.all(Array.from({{length: {calls}}}, () => bridge.save_stats()));
+        return {{times: times, pipelined_ms: performance.now() - start}};
+    """)
+    return {
+        "bridge_roundtrip_p50_ms": percentile(result["times"], 0.50),
+        "bridge_roundtrip_p95_ms": percentile(result["times"], 0.95),
+        "bridge_calls_per_s": calls / (result["pipelined_ms"] / 1000),
+    }
+
+
+def bench_persistence(bridge, repeats):
+    """Save (encode, write, fsync) and load times for realistic and very large states"""
+    results = {}
+    for label, generator_count in (("realistic", len(GENERATORS)), ("large", 20000)):
+        # The engine only holds the built-in catalog, so the large state goes
+        # straight to the session's save path that the page's "save" uses
+        state_json = json.dumps(sample_state(generator_count), default=json_default)
+        save_times = []
+        load_times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            bridge.session.submit(state_json)
+            bridge.save_writer.flush()
+            save_times.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            bridge.load_game()
+            load_times.append((time.perf_counter() - start) * 1000)
+        results[f"save_{label}_ms"] = statistics.median(save_times)
+        results[f"load_{label}_ms"] = statistics.median(load_times)
+    return results
+
+
+def bench_tick(bridge, page, ticks):
+    """Cost of an engine tick with its view delta, and of a forced full page render"""
+    engine = bridge.engine
+    state = engine.to_state()
+    for gen in state["generators"]:
+        gen["count"] = 25
+        gen["unlocked"] = True
+    engine.load_state(state)
+    start = time.perf_counter()
+    for _ in range(ticks):
+        engine.tick()
+        bridge.push_view(force=True)
+    tick_ms = (time.perf_counter() - start) * 1000 / ticks
+
+    update_display_ms = run_js(page, f"""
+        (() => {{
+            const start = performance.now();
+            for (let i = 0; i < {ticks}; i++) {{
+                stat_views.last = {{}};
+                generator_views.forEach(view => {{ view.last = {{}}; }});
+                render();
+            }}
+            return (performance.now() - start) / {ticks};
+        }})()
+    """)
+    return {"tick_ms": tick_ms, "update_display_ms": update_display_ms}
+
+
+def read_rss_kb(pid):
+    """Resident set size of a process in kB, or 0 if it cannot be read"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def child_pids(pid):
+    """All descendant process ids (Linux /proc only)"""
+    parents = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+            parents.setdefault(ppid, []).append(int(entry))
+    found = []
+    pending = [pid]
+    while pending:
+        children = parents.get(pending.pop(), [])
+        found.extend(children)
+        pending.extend(children)
+    return found
+
+
+def bench_rss():
+    """Memory of the game process and of the Chromium helper processes"""
+    pid = os.getpid()
+    main_kb = read_rss_kb(pid)
+    total_kb = main_kb + sum(read_rss_kb(child) for child in child_pids(pid))
+    return {"rss_main_mb": main_kb / 1024, "rss_total_mb": total_kb / 1024}
+
+
+def read_cpu_seconds(pid):
+    """User plus system CPU time of a process in seconds, or 0 if it cannot be read"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return 0.0
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def process_tree_cpu_seconds():
+    pid = os.getpid()
+    return sum(read_cpu_seconds(process) for process in [pid] + child_pids(pid))
+
+
+def idle_cpu_pct(seconds):
+    """CPU use of the game and Chromium processes while the event loop idles"""
+    start_cpu = process_tree_cpu_seconds()
+    start = time.monotonic()
+    deadline = start + seconds
+    while time.monotonic() < deadline:
+        QApplication.processEvents(QEventLoop.ProcessEventsFlag.WaitForMoreEvents, 50)
+    return (process_tree_cpu_seconds() - start_cpu) / (time.monotonic() - start) * 100
+
+
+def bench_idle(window, seconds):
+    """Idle CPU with the window shown and with it hidden, when ticking pauses"""
+    visible = idle_cpu_pct(seconds)
+    window.hide()
+    hidden = idle_cpu_pct(seconds)
+    window.show()
+    return {"idle_cpu_visible_pct": visible, "idle_cpu_hidden_pct": hidden}
+
+
+def run(args):
+    """Start the game offscreen and collect every metric"""
+    import web_ui
+    os.chdir(tempfile.mkdtemp(prefix="byte-clicker-bench-"))
+    web_ui.register_app_scheme()
+    profile = StartupProfile()
+    app = QApplication(sys.argv[:1])
+    window = web_ui.WebWindow(profile)
+    window.show()
+    page = window.web_view.page()
+
+    wait_until(lambda: "first_tick" in profile.marks, args.timeout)
+    results = {"startup_load_finished_ms": profile.marks.get("load_finished", 0.0)}
+    results.update(bench_rss())
+    results.update(bench_bridge(page, args.calls))
+    results.update(bench_persistence(window.bridge, args.repeats))
+    results.update(bench_tick(window.bridge, page, args.ticks))
+    results.update(bench_idle(window, args.idle_seconds))
+
+    window.bridge.session.shutdown()
+    window.close()
+    QTimer.singleShot(0, app.quit)
+    app.exec()
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print a comparison table and return the names of regressed metrics"""
+    regressions = []
+    print(f"{'metric':<28} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, direction in METRICS.items():
+        if name not in results or name not in baseline or not baseline[name]:
+            continue
+        change = (results[name] - baseline[name]) / baseline[name]
+        worse = change > threshold if direction == "lower" else change < -threshold
+        flag = "  REGRESSED" if worse else ""
+        print(f"{name:<28} {baseline[name]:>12.3f} {results[name]:>12.3f} {change:>+7.1%}{flag}")
+        if worse:
+            regressions.append(name)
+    return regressions
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against a previous results file")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="allowed relative regression per metric (default 0.15)")
+    parser.add_argument("--calls", type=int, default=500, help="bridge calls per measurement")
+    parser.add_argument("--repeats", type=int, default=20, help="save/load repetitions")
+    parser.add_argument("--ticks", type=int, default=1000, help="game ticks per measurement")
+    parser.add_argument("--idle-seconds", type=float, default=5.0,
+                        help="seconds to measure idle CPU, shown and hidden")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for startup")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"Regressed beyond {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+    else:
+        print(json.dumps(results, indent=2, sort_keys=True))
+
+
+if __name__ == "__main__":
+    main_cli()
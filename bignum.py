@@ -0,0 +1,222 @@
+"""Mantissa/exponent numbers for byte counts that outgrow a double
+
+A BigNum is m * 10**e. Values below SMALL_LIMIT are kept as a plain double
+with e == 0, so everyday amounts add and compare exactly like floats; larger
+values are normalized to 1 <= |m| < 10. BigNums are serialized to JSON as
+{"m": m, "e": e}, the same shape the page uses, so values pass through the
+bridge and the save file without losing magnitude.
+"""
+
+import math
+
+# Magnitude below which values are stored unnormalized as plain doubles
+SMALL_DIGITS = 15
+SMALL_LIMIT = 10.0 ** SMALL_DIGITS
+# Exponent gap beyond which the smaller operand cannot change the sum
+PRECISION_DIGITS = 17
+
+_UNITS = ("", "U", "D", "T", "Qa", "Qi", "Sx", "Sp", "Oc", "No")
+_TENS = ("", "Dc", "Vg", "Tg", "Qag", "Qig", "Sxg", "Spg", "Ocg", "Nog")
+_HUNDREDS = ("", "Ce")
+_SMALL_SUFFIXES = ("", "K", "M", "B", "T", "Qa", "Qi", "Sx", "Sp", "Oc", "No")
+
+
+def _suffix(group):
+    """Short-scale suffix for 10**(3 * group), or None past centillion"""
+    if group < len(_SMALL_SUFFIXES):
+        return _SMALL_SUFFIXES[group]
+    n = group - 1
+    if n > 100:
+        return None
+    return _UNITS[n % 10] + _TENS[n // 10 % 10] + _HUNDREDS[n // 100]
+
+
+SUFFIXES = tuple(_suffix(group) for group in range(102))
+
+
+class BigNum:
+    """Immutable arbitrary-magnitude number stored as mantissa and exponent"""
+
+    __slots__ = ("m", "e")
+
+    def __init__(self, m=0.0, e=0):
+        m = float(m)
+        e = int(e)
+        if m == 0 or not math.isfinite(m):
+            self.m, self.e = (0.0, 0) if m == 0 else (m, 0)
+            return
+        if e == 0 and abs(m) < SMALL_LIMIT:
+            self.m, self.e = m, 0
+            return
+        shift = math.floor(math.log10(abs(m)))
+        if shift + e < SMALL_DIGITS:
+            # Small enough to hold exactly as a plain double
+            self.m = m * 10.0 ** e if e >= 0 else m / 10.0 ** -e
+            self.e = 0
+            return
+        m = m / 10.0 ** shift if shift >= 0 else m * 10.0 ** -shift
+        # Division can land a hair outside [1, 10)
+        if abs(m) >= 10:
+            m /= 10
+            shift += 1
+        elif abs(m) < 1:
+            m *= 10
+            shift -= 1
+        self.m = m
+        self.e = e + shift
+
+    @classmethod
+    def from_log10(cls, value):
+        """Build the number 10**value"""
+        e = math.floor(value)
+        return cls(10 ** (value - e), e)
+
+    @classmethod
+    def from_json(cls, value):
+        """Accept a plain number, a {"m", "e"} dict or an [m, e] pair"""
+        if isinstance(value, BigNum):
+            return value
+        if isinstance(value, dict):
+            return cls(value.get("m", 0), value.get("e", 0))
+        if isinstance(value, (list, tuple)):
+            return cls(value[0], value[1])
+        return cls(value or 0)
+
+    def to_json(self):
+        return {"m": self.m, "e": self.e}
+
+    def scientific(self):
+        """Return (mantissa, exponent) with 1 <= |mantissa| < 10"""
+        if self.e or self.m == 0:
+            return self.m, self.e
+        shift = math.floor(math.log10(abs(self.m)))
+        return self.m / 10.0 ** shift if shift >= 0 else self.m * 10.0 ** -shift, shift
+
+    def log10(self):
+        return math.log10(self.m) + self.e if self.m > 0 else float("-inf")
+
+    def __float__(self):
+        try:
+            return self.m * 10.0 ** self.e
+        except OverflowError:
+            return math.copysign(math.inf, self.m)
+
+    def __add__(self, other):
+        other = _coerce(other)
+        if self.e == 0 and other.e == 0:
+            return BigNum(self.m + other.m)
+        if other.m == 0:
+            return self
+        if self.m == 0:
+            return other
+        (am, ae), (bm, be) = self.scientific(), other.scientific()
+        if ae < be:
+            (am, ae), (bm, be) = (bm, be), (am, ae)
+        gap = ae - be
+        if gap > PRECISION_DIGITS:
+            return BigNum(am, ae)
+        return BigNum(am + bm / 10.0 ** gap, ae)
+
+    __radd__ = __add__
+
+    def __neg__(self):
+        return BigNum(-self.m, self.e)
+
+    def __sub__(self, other):
+        return self + -_coerce(other)
+
+    def __rsub__(self, other):
+        return _coerce(other) - self
+
+    def __mul__(self, other):
+        if isinstance(other, BigNum):
+            (am, ae), (bm, be) = self.scientific(), other.scientific()
+            return BigNum(am * bm, ae + be)
+        product = self.m * other
+        if math.isfinite(product):
+            return BigNum(product, self.e)
+        m, e = self.scientific()
+        return BigNum(m * other, e)
+
+    __rmul__ = __mul__
+
+    def _compare(self, other):
+        other = _coerce(other)
+        if self.e == 0 and other.e == 0:
+            return (self.m > other.m) - (self.m < other.m)
+        (am, ae), (bm, be) = self.scientific(), other.scientific()
+        if (am > 0) != (bm > 0) or am == 0 or bm == 0 or ae == be:
+            return (am > bm) - (am < bm)
+        result = 1 if ae > be else -1
+        return result if am > 0 else -result
+
+    def __eq__(self, other):
+        if not isinstance(other, (BigNum, int, float)):
+            return NotImplemented
+        return self._compare(other) == 0
+
+    def __lt__(self, other):
+        return self._compare(other) < 0
+
+    def __le__(self, other):
+        return self._compare(other) <= 0
+
+    def __gt__(self, other):
+        return self._compare(other) > 0
+
+    def __ge__(self, other):
+        return self._compare(other) >= 0
+
+    def __hash__(self):
+        # Hash like the int or float the number compares equal to; past the
+        # range of a double nothing else compares equal to it
+        value = float(self)
+        if math.isinf(value) and self.e:
+            return hash((self.m, self.e))
+        return hash(value)
+
+    def __repr__(self):
+        return f"BigNum({self.m!r}, {self.e})"
+
+
+ZERO = BigNum()
+
+
+def _coerce(value):
+    return value if isinstance(value, BigNum) else BigNum(value)
+
+
+def json_default(value):
+    """json.dumps default hook that serializes BigNum values"""
+    if isinstance(value, BigNum):
+        return value.to_json()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+# Formatted strings keyed by the digits that are actually displayed
+_format_cache = {}
+FORMAT_CACHE_SIZE = 512
+
+
+def format_number(value):
+    """Format a byte count with short-scale suffixes, then scientific notation"""
+    value = _coerce(value)
+    if value.e == 0 and abs(value.m) < 1000:
+        return f"{value.m:.2f}"
+    if value.m < 0:
+        return "-" + format_number(-value)
+    m, e = value.scientific()
+    group = e // 3
+    scaled = m * 10 ** (e - group * 3)
+    key = (group, round(scaled * 100))
+    text = _format_cache.get(key)
+    if text is None:
+        suffix = SUFFIXES[group] if group < len(SUFFIXES) else None
+        if suffix is None:
+            text = f"{m:.2f}e{e}"
+        else:
+            text = f"{scaled:.2f}{suffix}"
+        if len(_format_cache) >= FORMAT_CACHE_SIZE:
+            _format_cache.clear()
+        _format_cache[key] = text
+    return text
@@ -0,0 +1,352 @@
+"""Authoritative game rules and state, advanced in fixed time steps
+
+The engine owns clicking, purchasing, unlocking and production. The page
+only renders the view state it is sent and forwards input, so the rules run
+and can be benchmarked without Chromium.
+"""
+
+import heapq
+import math
+import time
+from array import array
+
+from bignum import BigNum, ZERO
+from game_data import CATALOG, Catalog, bulk_cost, generator_cost, max_affordable
+from milestones import MilestoneTracker
+
+# Length of one simulation step in milliseconds
+TICK_MS = 100
+BUY_AMOUNTS = (1, 10, 100, "max")
+
+
+def now_ms():
+    return time.time() * 1000
+
+
+class GameEngine:
+    """Game state for one catalog of generators, stored in parallel arrays
+
+    Total production and click power are cached and updated incrementally
+    when a count or multiplier changes, and a purchase only checks the
+    unlock rules of the generators that depend on the one bought, so ticks
+    and purchases cost the same for any catalog size. Milestones are checked
+    against the top of their metric's threshold heap, so ticks also cost the
+    same for any number of milestones.
+    """
+
+    __slots__ = ("catalog", "base_costs", "rates", "counts", "unlocked", "costs",
+                 "bytes", "total_bytes", "clicks", "game_start", "last_save", "last_update",
+                 "buy_amount", "tick_ms", "milestones", "_production", "_click_power", "_views", "_view_tokens",
+                 "_dirty", "_stale_above", "_stale_below")
+
+    def __init__(self, catalog=CATALOG, now=None, tick_ms=TICK_MS):
+        self.catalog = catalog if isinstance(catalog, Catalog) else Catalog(catalog)
+        self.base_costs = array('d', (gen["base_cost"] for gen in self.catalog))
+        # Production per unit, including multipliers
+        self.rates = array('d', (gen["base_production"] * gen["multiplier"] for gen in self.catalog))
+        self.tick_ms = tick_ms
+        self.buy_amount = 1
+        self.milestones = MilestoneTracker(self.catalog.milestones)
+        self.reset(now)
+
+    def reset(self, now=None):
+        """Start a new game"""
+        now = now_ms() if now is None else now
+        size = len(self.catalog)
+        self.counts = array('q', bytes(8 * size))
+        self.unlocked = bytearray(size)
+        self.costs = [BigNum(cost) for cost in self.base_costs]
+        self.bytes = ZERO
+        self.total_bytes = ZERO
+        self.clicks = 0
+        self.game_start = now
+        self.last_save = now
+        self.last_update = now
+        self._production = 0.0
+        self._view_tokens = [0] * size
+        self._invalidate_views()
+        self._update_click_power()
+        self.check_unlocks()
+        self.milestones.reset()
+        self.check_milestones()
+
+    def load_state(self, state):
+        """Take over a full game state as produced by save_format.decode"""
+        self.reset(state.get("last_update", state.get("last_save")))
+        for index, gen in enumerate(state.get("generators", [])[:len(self.catalog)]):
+            self.counts[index] = int(gen.get("count", 0))
+            self.unlocked[index] = bool(gen.get("unlocked", False))
+            self.costs[index] = generator_cost(self.base_costs[index], self.counts[index])
+        self.bytes = BigNum.from_json(state.get("bytes", 0))
+        self.total_bytes = BigNum.from_json(state.get("total_bytes", 0))
+        self.clicks = int(state.get("clicks", 0))
+        self.game_start = state.get("game_start", self.game_start)
+        self.last_save = state.get("last_save", self.last_save)
+        self._production = sum(count * rate for count, rate in zip(self.counts, self.rates))
+        self._update_click_power()
+        self.check_unlocks()
+        self.milestones.reset(state.get("milestones", []))
+        self.check_milestones()
+
+    def to_state(self):
+        """Full game state in the shape the save format encodes"""
+        generators = []
+        for index, static in enumerate(self.catalog):
+            gen = dict(static)
+            gen["count"] = self.counts[index]
+            gen["cost"] = self.costs[index]
+            gen["unlocked"] = bool(self.unlocked[index])
+            generators.append(gen)
+        return {
+            "bytes": self.bytes,
+            "total_bytes": self.total_bytes,
+            "clicks": self.clicks,
+            "generators": generators,
+            "last_save": self.last_save,
+            "game_start": self.game_start,
+            "last_update": self.last_update,
+            "milestones": self.milestones.to_state(),
+        }
+
+    def bytes_per_second(self):
+        return BigNum(self._production)
+
+    def click_power(self):
+        return self._click_power
+
+    def _update_click_power(self):
+        rule = self.catalog.click_power
+        count = self.counts[rule["generator"]] if len(self.catalog) else 0
+        self._click_power = rule["base"] + count // rule["every"] * rule["bonus"]
+
+    def set_multiplier(self, index, multiplier):
+        """Change a generator's production multiplier, e.g. from an upgrade"""
+        rate = self.catalog[index]["base_production"] * multiplier
+        self._production += self.counts[index] * (rate - self.rates[index])
+        self.rates[index] = rate
+        self._invalidate_view(index)
+
+    def click(self, count=1):
+        """Register count clicks on the click area"""
+        earned = BigNum(self._click_power * count)
+        self.bytes = self.bytes + earned
+        self.total_bytes = self.total_bytes + earned
+        self.clicks += count
+        self.milestones.check("clicks", self.clicks, self.last_update)
+        self.milestones.check("total_bytes", self.total_bytes, self.last_update)
+
+    def set_buy_amount(self, amount):
+        if amount not in BUY_AMOUNTS:
+            raise ValueError(f"Unknown buy amount {amount!r}")
+        if amount != self.buy_amount:
+            self.buy_amount = amount
+            self._invalidate_views()
+
+    def purchase_amount(self, index):
+        """Units the next purchase of a generator will buy"""
+        if self.buy_amount == "max":
+            return max(1, max_affordable(self.base_costs[index], self.counts[index], self.bytes))
+        return self.buy_amount
+
+    def purchase_cost(self, index, amount):
+        if amount == 1:
+            return self.costs[index]
+        return bulk_cost(self.base_costs[index], self.counts[index], amount)
+
+    def buy(self, index):
+        """Buy the selected amount of a generator; returns whether it was bought"""
+        if not self.unlocked[index]:
+            return False
+        amount = self.purchase_amount(index)
+        cost = self.purchase_cost(index, amount)
+        if self.bytes < cost:
+            return False
+        self.apply_purchase(index, amount, cost)
+        return True
+
+    def apply_purchase(self, index, amount, cost=None):
+        """Add units of a generator and pay for them, without the checks buy() makes
+
+        Used to replay purchases from the journal, where rounding in the
+        replayed production must not turn a purchase down.
+        """
+        if cost is None:
+            cost = self.purchase_cost(index, amount)
+        self.bytes = self.bytes - cost if self.bytes >= cost else ZERO
+        self.unlocked[index] = 1
+        self.counts[index] += amount
+        self.costs[index] = generator_cost(self.base_costs[index], self.counts[index])
+        self._production += amount * self.rates[index]
+        self._invalidate_view(index)
+        if index == self.catalog.click_power["generator"]:
+            self._update_click_power()
+        self.check_unlocks(index)
+        self.milestones.check(index, self.counts[index], self.last_update)
+
+    def check_milestones(self):
+        """Unlock every milestone whose threshold the current state has reached"""
+        time = self.last_update
+        self.milestones.check("total_bytes", self.total_bytes, time)
+        self.milestones.check("clicks", self.clicks, time)
+        self.milestones.check("play_seconds", (time - self.game_start) / 1000, time)
+        for index, count in enumerate(self.counts):
+            self.milestones.check(index, count, time)
+
+    def check_unlocks(self, changed=None):
+        """Unlock generators whose requirements are met
+
+        With changed set, only the generators that depend on it are checked.
+        """
+        candidates = range(len(self.catalog)) if changed is None else self.catalog.dependents[changed]
+        for index in candidates:
+            if not self.unlocked[index] and all(self.counts[required] >= count
+                                                for required, count in self.catalog.requirements[index]):
+                self.unlocked[index] = 1
+                self._invalidate_view(index)
+
+    def tick(self, steps=1):
+        """Advance the simulation by whole time steps"""
+        if steps <= 0:
+            return
+        self.last_update += self.tick_ms * steps
+        if self._production:
+            earned = BigNum(self._production * self.tick_ms / 1000 * steps)
+            self.bytes = self.bytes + earned
+            self.total_bytes = self.total_bytes + earned
+            self.milestones.check("total_bytes", self.total_bytes, self.last_update)
+        self.milestones.check("play_seconds", (self.last_update - self.game_start) / 1000, self.last_update)
+
+    def skip_to(self, time, credited_seconds):
+        """Jump to an engine time without ticking, crediting credited_seconds of production
+
+        Used for time the game was closed, which offline.py credits in one step.
+        """
+        earned = BigNum(self._production * credited_seconds)
+        self.bytes = self.bytes + earned
+        self.total_bytes = self.total_bytes + earned
+        self.last_update = time
+        self.milestones.check("total_bytes", self.total_bytes, time)
+        self.milestones.check("play_seconds", (time - self.game_start) / 1000, time)
+
+    def advance(self, now):
+        """Run every step that fits before now and return how many ran
+
+        Time left over is carried to the next call, so production does not
+        depend on how regularly the caller's timer fires.
+        """
+        steps = max(0, math.floor((now - self.last_update) / self.tick_ms))
+        self.tick(steps)
+        return steps
+
+    def tick_to(self, time):
+        """Run the steps up to an engine time recorded on the step grid, e.g. in the journal"""
+        self.tick(round((time - self.last_update) / self.tick_ms))
+        self.last_update = time
+
+    def _invalidate_view(self, index):
+        """Rebuild a generator's view before it is next sent"""
+        self._views[index] = None
+        self._dirty.add(index)
+
+    def _invalidate_views(self):
+        size = len(self.catalog)
+        self._views = [None] * size
+        self._dirty = set(range(size))
+        # Min-heaps of (bytes, index, token): a cached view goes stale once
+        # bytes reach its upper bound or fall below its lower bound, which
+        # is stored negated. Entries of rebuilt views are skipped by token.
+        self._stale_above = []
+        self._stale_below = []
+
+    def _expire_views(self):
+        """Invalidate the cached views whose byte bounds the current bytes left"""
+        above, below = self._stale_above, self._stale_below
+        while above and self.bytes >= above[0][0]:
+            _, index, token = heapq.heappop(above)
+            if token == self._view_tokens[index]:
+                self._invalidate_view(index)
+        while below and self.bytes < -below[0][0]:
+            _, index, token = heapq.heappop(below)
+            if token == self._view_tokens[index]:
+                self._invalidate_view(index)
+
+    def _compact_stale_heaps(self):
+        """Drop the heap entries of views that were rebuilt since"""
+        tokens = self._view_tokens
+        self._stale_above = [entry for entry in self._stale_above if entry[2] == tokens[entry[1]]]
+        self._stale_below = [entry for entry in self._stale_below if entry[2] == tokens[entry[1]]]
+        heapq.heapify(self._stale_above)
+        heapq.heapify(self._stale_below)
+
+    def _generator_view(self, index):
+        """View of one generator; cached until it changes or bytes cross its cost"""
+        view = self._views[index]
+        if view is not None:
+            return view
+        unlocked = bool(self.unlocked[index])
+        # The bytes range the view stays valid for: its affordability and,
+        # buying "max", its amount only change outside of it
+        low = high = None
+        if self.buy_amount == "max":
+            affordable = max_affordable(self.base_costs[index], self.counts[index], self.bytes)
+            amount = max(1, affordable)
+            cost = self.purchase_cost(index, amount)
+            high = self.purchase_cost(index, affordable + 1)
+            if affordable:
+                low = cost
+        else:
+            amount = self.buy_amount
+            cost = self.purchase_cost(index, amount)
+            if unlocked:
+                if self.bytes >= cost:
+                    low = cost
+                else:
+                    high = cost
+        view = self._views[index] = {
+            "name": self.catalog[index]["name"],
+            "count": self.counts[index],
+            "unlocked": unlocked,
+            "unlock_text": self.catalog.unlock_text(index),
+            "amount": amount,
+            "cost": cost.to_json(),
+            "production": BigNum(self.counts[index] * self.rates[index]).to_json(),
+            "affordable": unlocked and self.bytes >= cost,
+        }
+        token = self._view_tokens[index] = self._view_tokens[index] + 1
+        if high is not None:
+            heapq.heappush(self._stale_above, (high, index, token))
+        if low is not None:
+            heapq.heappush(self._stale_below, (-low, index, token))
+        if len(self._stale_above) + len(self._stale_below) > 4 * len(self.catalog) + 64:
+            self._compact_stale_heaps()
+        return view
+
+    def _view_fields(self):
+        return {
+            "bytes": self.bytes.to_json(),
+            "total_bytes": self.total_bytes.to_json(),
+            "bytes_per_second": self.bytes_per_second().to_json(),
+            "clicks": self.clicks,
+            "click_power": self._click_power,
+            "game_start": self.game_start,
+            "buy_amount": self.buy_amount,
+            "milestones": self.milestones.view(),
+        }
+
+    def view_state(self):
+        """JSON-ready state for the page to render"""
+        self._expire_views()
+        view = self._view_fields()
+        view["generators"] = [self._generator_view(index) for index in range(len(self.catalog))]
+        return view
+
+    def view_delta(self):
+        """View state without its generators, and {index: view} for the generators changed since the last call
+
+        Only generators that were bought, unlocked or re-priced, or whose
+        affordability or "max" amount the current bytes changed, are
+        rebuilt and returned, so the cost does not grow with the catalog.
+        """
+        self._expire_views()
+        dirty, self._dirty = self._dirty, set()
+        return self._view_fields(), {index: self._generator_view(index) for index in sorted(dirty)}
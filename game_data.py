@@ -0,0 +1,196 @@
+"""Static game data shared by the save format and the game logic"""
+
+import json
+import math
+import os
+
+from bignum import BigNum, ZERO, PRECISION_DIGITS
+
+# Each purchase multiplies a generator's cost by this factor
+COST_GROWTH = 1.15
+# Costs below this are whole numbers of bytes; above it a double has no
+# fractional part left to round
+EXACT_COST_LIMIT = 2 ** 53
+
+# Generators and rules are read from this file at import time
+CATALOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalog.json")
+# Unlock rule for generators that do not list their own requirements
+DEFAULT_UNLOCK_COUNT = 5
+# Game metrics a milestone can be set on; "generator" is the count of one generator
+MILESTONE_METRICS = ("total_bytes", "clicks", "play_seconds", "generator")
+
+
+class CatalogError(ValueError):
+    """Raised when a catalog file is malformed"""
+
+
+class Catalog:
+    """Generators, unlock rules, click power and milestones loaded from a catalog
+
+    Unlock requirements are indexed by the generator they depend on, so a
+    purchase only has to check the generators that list it as a requirement.
+    Saves store generators and milestones by position, so entries must not
+    be reordered or removed once released.
+    """
+
+    __slots__ = ("generators", "requirements", "dependents", "click_power", "milestones")
+
+    def __init__(self, generators, click_power=None, milestones=None):
+        entries = []
+        for index, gen in enumerate(generators):
+            if gen.get("id", index) != index:
+                raise CatalogError(f"Generator {gen.get('name')!r} has id {gen.get('id')}, expected {index}")
+            for key in ("name", "base_cost", "base_production"):
+                if key not in gen:
+                    raise CatalogError(f"Generator {index} is missing {key!r}")
+            if gen["base_cost"] <= 0 or gen["base_production"] <= 0:
+                raise CatalogError(f"Generator {index} needs a positive cost and production")
+            entry = dict(gen, id=index)
+            entry.setdefault("multiplier", 1.0)
+            if "requires" not in entry:
+                entry["requires"] = [{"generator": index - 1, "count": DEFAULT_UNLOCK_COUNT}] if index else []
+            entries.append(entry)
+        self.generators = tuple(entries)
+
+        self.requirements = []
+        dependents = [[] for _ in entries]
+        for index, gen in enumerate(entries):
+            needs = []
+            for requirement in gen["requires"]:
+                required = requirement.get("generator")
+                if not isinstance(required, int) or not 0 <= required < len(entries) or required == index:
+                    raise CatalogError(f"Generator {index} requires unknown generator {required!r}")
+                needs.append((required, int(requirement.get("count", 1))))
+                dependents[required].append(index)
+            self.requirements.append(tuple(needs))
+        self.requirements = tuple(self.requirements)
+        self.dependents = tuple(tuple(sorted(set(found))) for found in dependents)
+
+        self.click_power = dict({"base": 1, "generator": 0, "every": 10, "bonus": 0.1}, **(click_power or {}))
+        if entries and not 0 <= self.click_power["generator"] < len(entries):
+            raise CatalogError("click_power refers to an unknown generator")
+
+        entries = []
+        for index, milestone in enumerate(milestones or []):
+            for key in ("name", "metric", "threshold"):
+                if key not in milestone:
+                    raise CatalogError(f"Milestone {index} is missing {key!r}")
+            metric = milestone["metric"]
+            if metric not in MILESTONE_METRICS:
+                raise CatalogError(f"Milestone {index} has unknown metric {metric!r}")
+            entry = dict(milestone, id=index)
+            entry.setdefault("description", "")
+            if metric == "generator":
+                if not 0 <= milestone.get("generator", -1) < len(self.generators):
+                    raise CatalogError(f"Milestone {index} refers to an unknown generator")
+                # Generator counts are tracked per generator
+                entry["key"] = milestone["generator"]
+            else:
+                entry["key"] = metric
+            entry["threshold"] = BigNum(milestone["threshold"]) if metric == "total_bytes" else milestone["threshold"]
+            entries.append(entry)
+        self.milestones = tuple(entries)
+
+    def __len__(self):
+        return len(self.generators)
+
+    def __iter__(self):
+        return iter(self.generators)
+
+    def __getitem__(self, index):
+        return self.generators[index]
+
+    def unlock_text(self, index):
+        """Describe what unlocks a generator, for the page"""
+        parts = [f"{count} {self.generators[required]['name']}" for required, count in self.requirements[index]]
+        return "Unlock by buying " + " and ".join(parts) if parts else ""
+
+
+def load_catalog(path=CATALOG_FILE):
+    """Read a catalog file"""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except ValueError as e:
+        raise CatalogError(f"Unreadable catalog {path}: {e}")
+    if not isinstance(data, dict) or not data.get("generators"):
+        raise CatalogError(f"Catalog {path} has no generators")
+    return Catalog(data["generators"], data.get("click_power"), data.get("milestones"))
+
+
+CATALOG = load_catalog()
+GENERATORS = CATALOG.generators
+
+
+def generator_cost(base_cost, count):
+    """Cost of the next unit of a generator that already has count units"""
+    log_cost = math.log10(base_cost) + count * math.log10(COST_GROWTH)
+    if log_cost < math.log10(EXACT_COST_LIMIT):
+        return BigNum(math.ceil(base_cost * math.pow(COST_GROWTH, count)))
+    return BigNum.from_log10(log_cost)
+
+
+LOG_COST_GROWTH = math.log10(COST_GROWTH)
+LOG_EXACT_COST_LIMIT = math.log10(EXACT_COST_LIMIT)
+
+# Prefix sums of rounded unit costs keyed by base cost, extended on demand
+_cost_prefix = {}
+
+
+def exact_units(base_cost):
+    """Number of units whose cost is still rounded to whole bytes"""
+    return max(0, math.ceil((LOG_EXACT_COST_LIMIT - math.log10(base_cost)) / LOG_COST_GROWTH))
+
+
+def cost_prefix_sum(base_cost, count):
+    """Total rounded cost of the first count units (below exact_units only)"""
+    table = _cost_prefix.setdefault(base_cost, [0])
+    while len(table) <= count:
+        n = len(table) - 1
+        table.append(table[n] + math.ceil(base_cost * math.pow(COST_GROWTH, n)))
+    return table[count]
+
+
+def geometric_cost(base_cost, start, end):
+    """base_cost * r**start * (r**n - 1) / (r - 1), evaluated in log space"""
+    log_growth = (end - start) * LOG_COST_GROWTH
+    if log_growth > PRECISION_DIGITS:
+        log_series = log_growth
+    else:
+        log_series = math.log10(math.pow(COST_GROWTH, end - start) - 1)
+    return BigNum.from_log10(math.log10(base_cost) + start * LOG_COST_GROWTH +
+                             log_series - math.log10(COST_GROWTH - 1))
+
+
+def bulk_cost(base_cost, count, amount):
+    """Cost of buying amount units one at a time, starting from count"""
+    if amount <= 0:
+        return ZERO
+    split = exact_units(base_cost)
+    end = count + amount
+    total = ZERO
+    if count < split:
+        total = BigNum(cost_prefix_sum(base_cost, min(end, split)) - cost_prefix_sum(base_cost, count))
+    if end > split:
+        total = total + geometric_cost(base_cost, max(count, split), end)
+    return total
+
+
+def max_affordable(base_cost, count, bytes_):
+    """Largest number of units that bytes_ can pay for, starting from count"""
+    # Invert the geometric series sum for an estimate, then correct for
+    # the per-unit rounding with the exact prefix sums
+    log_ratio = (BigNum.from_json(bytes_).log10() + math.log10(COST_GROWTH - 1) -
+                 (math.log10(base_cost) + count * LOG_COST_GROWTH))
+    if log_ratio == float("-inf"):
+        return 0
+    if log_ratio > PRECISION_DIGITS:
+        amount = log_ratio / LOG_COST_GROWTH
+    else:
+        amount = math.log10(math.pow(10, log_ratio) + 1) / LOG_COST_GROWTH
+    amount = max(0, math.floor(amount))
+    while amount > 0 and bulk_cost(base_cost, count, amount) > bytes_:
+        amount -= 1
+    while bytes_ >= bulk_cost(base_cost, count, amount + 1):
+        amount += 1
+    return amount
@@ -0,0 +1,182 @@
+"""Append-only journal of game events between save snapshots
+
+Every click batch, purchase, buy amount change and new game, and the
+offline production credited on load, is appended as a fixed-size binary record, tagged with a sequence number and the
+engine time it was applied at. Each save snapshot stores the last sequence number it covers,
+so after a crash the records that follow the newest snapshot are replayed
+onto it, and any earlier moment is rebuilt from an older snapshot plus the
+records after it.
+
+Appends are a single unbuffered write to a file opened for appending and
+are not fsynced: a crash of the game loses no events, a power failure can
+lose the ones since the last snapshot. Compaction runs on the save writer
+thread and only holds the journal's lock to copy the records appended
+while it ran and swap the files, so appends never wait for a full rewrite.
+"""
+
+import os
+import struct
+import threading
+import zlib
+
+from save_writer import fsync_directory
+
+# seq, engine time in ms, op and two arguments, followed by their CRC32
+BODY = struct.Struct("<QdBqq")
+CRC = struct.Struct("<I")
+RECORD_SIZE = BODY.size + CRC.size
+OP_CLICK = 1  # a: clicks
+OP_BUY = 2  # a: generator index, b: units bought
+OP_NEW_GAME = 3
+OP_SET_BUY_AMOUNT = 4  # a: units per purchase, 0 for "max"
+# The game was closed from engine time b (ms) until the record's time;
+# a: milliseconds of production credited for it
+OP_OFFLINE = 5
+OP_NAMES = {OP_CLICK: "click", OP_BUY: "buy", OP_NEW_GAME: "new_game", OP_SET_BUY_AMOUNT: "set_buy_amount",
+            OP_OFFLINE: "offline"}
+# Journals larger than this are compacted after a save, once they have
+# also grown to COMPACT_GROWTH times their size after the last compaction
+COMPACT_BYTES = 256 * 1024
+COMPACT_GROWTH = 2
+
+
+class JournalError(ValueError):
+    """Raised when a requested point in time is not covered by the journal"""
+
+
+def pack(seq, time, op, a=0, b=0):
+    body = BODY.pack(seq, time, op, a, b)
+    return body + CRC.pack(zlib.crc32(body))
+
+
+def unpack_all(data):
+    """Decode records up to the first torn or corrupt one, e.g. from a crash mid-write"""
+    records = []
+    for offset in range(0, len(data) - RECORD_SIZE + 1, RECORD_SIZE):
+        body = data[offset:offset + BODY.size]
+        if zlib.crc32(body) != CRC.unpack_from(data, offset + BODY.size)[0]:
+            break
+        records.append(BODY.unpack(body))
+    return records
+
+
+class Journal:
+    """The event journal of one save slot"""
+
+    def __init__(self, path, start_seq=0):
+        self.path = path
+        records = self.read()
+        # Cut off a torn record so new appends stay aligned
+        valid_size = len(records) * RECORD_SIZE
+        if os.path.exists(path) and os.path.getsize(path) != valid_size:
+            with open(path, 'r+b') as f:
+                f.truncate(valid_size)
+        self.seq = max(start_seq, records[-1][0] if records else 0)
+        self.size = valid_size
+        # Size right after the last compaction
+        self.compacted_size = 0
+        self._lock = threading.Lock()
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def append(self, time, op, a=0, b=0):
+        """Append one event and return its sequence number"""
+        with self._lock:
+            self.seq += 1
+            os.write(self._fd, pack(self.seq, time, op, a, b))
+            self.size += RECORD_SIZE
+            return self.seq
+
+    def read(self):
+        """Every intact record as (seq, time, op, a, b) tuples"""
+        try:
+            with open(self.path, 'rb') as f:
+                return unpack_all(f.read())
+        except FileNotFoundError:
+            return []
+
+    def records(self, after=0):
+        """Records with a sequence number above after, oldest first"""
+        return [record for record in self.read() if record[0] > after]
+
+    def needs_compaction(self):
+        return self.size >= max(COMPACT_BYTES, COMPACT_GROWTH * self.compacted_size)
+
+    def compact(self, keep_after):
+        """Drop the records every kept snapshot already covers; returns how many are kept
+
+        The kept records are written to a temporary file without the lock;
+        records appended meanwhile are copied over under it before the
+        file replaces the journal.
+        """
+        with self._lock:
+            if self._fd is None:
+                return 0
+            size = self.size
+        with open(self.path, 'rb') as f:
+            records = [record for record in unpack_all(f.read(size)) if record[0] > keep_after]
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'wb') as tmp:
+            tmp.write(b"".join(pack(*record) for record in records))
+            with self._lock:
+                if self._fd is None:
+                    os.remove(tmp_path)
+                    return 0
+                with open(self.path, 'rb') as f:
+                    f.seek(size)
+                    tail = f.read(self.size - size)
+                tmp.write(tail)
+                tmp.flush()
+                os.fsync(tmp.fileno())
+                os.close(self._fd)
+                os.replace(tmp_path, self.path)
+                self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                self.size = self.compacted_size = len(records) * RECORD_SIZE + len(tail)
+        fsync_directory(os.path.dirname(os.path.abspath(self.path)))
+        return len(records) + len(tail) // RECORD_SIZE
+
+    def close(self):
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    def delete(self):
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def replay(engine, records, until=None):
+    """Apply journal records to an engine; returns how many were applied
+
+    With until set, records after that engine time are skipped and the
+    engine is advanced to it. Time the game was closed is never ticked
+    through: an offline record credits what the load credited, and a
+    rewind to a moment while the game was closed stops where it closed.
+    """
+    applied = 0
+    for seq, time, op, a, b in records:
+        if until is not None and time > until:
+            if op == OP_OFFLINE:
+                until = min(until, b)
+            break
+        if op == OP_OFFLINE:
+            engine.tick_to(b)
+            engine.skip_to(time, a / 1000)
+            applied += 1
+            continue
+        engine.tick_to(time)
+        if op == OP_CLICK:
+            engine.click(a)
+        elif op == OP_BUY:
+            engine.apply_purchase(a, b)
+        elif op == OP_NEW_GAME:
+            engine.reset(time)
+        elif op == OP_SET_BUY_AMOUNT:
+            engine.set_buy_amount(a or "max")
+        applied += 1
+    if until is not None:
+        engine.advance(until)
+    return applied
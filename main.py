@@ -1,549 +1,137 @@
 import sys
-import os
-import random
-import string
 import json
-from datetime import datetime
-from PyQt6.QtWidgets import QApplication, QMainWindow, QMessageBox
-from PyQt6.QtCore import QUrl, QObject, pyqtSlot, QPoint, QCoreApplication
-from PyQt6.QtWebEngineCore import QWebEngineProfile, QWebEngineScript
-from PyQt6.QtWebEngineWidgets import QWebEngineView
-from PyQt6.QtWebChannel import QWebChannel
-from PyQt6.QtGui import QScreen
+import argparse
+from PyQt6.QtWidgets import QApplication
+from offline import OFFLINE_EFFICIENCY, OFFLINE_CAP_SECONDS
+import save_format
+from session import StartupProfile
+
+def fraction(value):
+    """argparse type for a number from 0 to 1"""
+    number = float(value)
+    if not 0 <= number <= 1:
+        raise argparse.ArgumentTypeError(f"must be between 0 and 1, not {value}")
+    return number
+
+def non_negative(value):
+    """argparse type for a number of 0 or more"""
+    number = float(value)
+    if not number >= 0:
+        raise argparse.ArgumentTypeError(f"must be 0 or more, not {value}")
+    return number
+
+def positive_int(value):
+    """argparse type for a whole number of 1 or more"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be 1 or more, not {value}")
+    return number
+
+def parse_args(argv):
+    """Parse command line options, leaving Qt's own options untouched"""
+    parser = argparse.ArgumentParser(description="Byte Clicker")
+    parser.add_argument("--offline-efficiency", type=fraction, default=OFFLINE_EFFICIENCY,
+                        help="fraction of production credited while the game is closed (0 to 1)")
+    parser.add_argument("--offline-cap-hours", type=non_negative, default=OFFLINE_CAP_SECONDS / 3600,
+                        help="longest absence credited with offline production")
+    parser.add_argument("--convert", nargs=2, metavar=("SOURCE", "DESTINATION"),
+                        help="convert a save between binary and JSON (.json) and exit")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="print startup timings once the first game tick is rendered")
+    parser.add_argument("--telemetry", action="store_true",
+                        help="start with tick and bridge timing instrumentation enabled")
+    parser.add_argument("--telemetry-dump", metavar="PATH",
+                        help="write collected timings to PATH (.csv or .json) on exit")
+    parser.add_argument("--native-ui", action="store_true",
+                        help="use the Qt Widgets front end instead of the web page (no Chromium)")
+    parser.add_argument("--record", metavar="PATH",
+                        help="record input events from the loaded game to PATH until exit")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="replay a recording headless, compare its final state and exit")
+    parser.add_argument("--replay-repeat", type=int, default=1, metavar="N",
+                        help="replay N times and report the fastest run")
+    parser.add_argument("--state-server", type=int, metavar="PORT",
+                        help="stream game state to local dashboards at http://127.0.0.1:PORT (0: any free port)")
+    parser.add_argument("--state-interval", type=int, default=1000, metavar="MS",
+                        help="least time between two streamed states (default 1000)")
+    simulation = parser.add_argument_group("headless simulation")
+    simulation.add_argument("--simulate", action="store_true",
+                            help="simulate games with purchase policies instead of starting the game")
+    simulation.add_argument("--games", type=positive_int, default=10000, help="games to simulate (default 10000)")
+    simulation.add_argument("--hours", type=float, default=24, help="in-game hours per game (default 24)")
+    simulation.add_argument("--policies", nargs="+", default=["cheapest", "payback", "newest"],
+                            help="purchase policies, spread evenly over the games")
+    simulation.add_argument("--clicks-per-second", type=float, default=2.0,
+                            help="average clicking rate of the simulated players")
+    simulation.add_argument("--workers", type=int, help="processes to use (default: one per CPU)")
+    simulation.add_argument("--simulate-output", metavar="PATH",
+                            help="also write the report, including the full curves, as JSON")
+    return parser.parse_known_args(argv[1:])
 
-VERSION = "0.1.0"  # Version constant
-
-class WebBridge(QObject):
-    """Bridge class for JavaScript to Python communication"""
-    
-    def __init__(self):
-        super().__init__()
-        self.save_file = "clicker_save.json"
-    
-    @pyqtSlot(str, result=str)
-    def save_game(self, game_state):
-        """Save game state to file"""
+if __name__ == "__main__":
+    args, qt_args = parse_args(sys.argv)
+    if args.convert:
         try:
-            with open(self.save_file, 'w') as f:
-                f.write(game_state)
-            return "Game saved successfully"
-        except Exception as e:
-            return f"Error saving game: {str(e)}"
-    
-    @pyqtSlot(result=str)
-    def load_game(self):
-        """Load game state from file"""
+            save_format.convert(*args.convert)
+        except (OSError, save_format.SaveFormatError) as e:
+            sys.exit(f"Error converting save: {e}")
+        print(f"Converted {args.convert[0]} to {args.convert[1]}")
+        sys.exit(0)
+    if args.replay:
+        import recording
         try:
-            if os.path.exists(self.save_file):
-                with open(self.save_file, 'r') as f:
-                    return f.read()
-            return "{}"
-        except Exception as e:
-            return "{}"
-            
-    @pyqtSlot()
-    def show_about(self):
-        """Show the About dialog"""
-        msg = QMessageBox()
-        msg.setWindowTitle("About Byte Clicker")
-        msg.setText(f"Byte Clicker v{VERSION}")
-        msg.setInformativeText("A fun incremental game about collecting bytes!\n\n"
-                              "Click to generate bytes and buy generators to automate your byte production.\n\n"
-                              "© 2024 Byte Clicker")
-        msg.setIcon(QMessageBox.Icon.Information)
-        msg.exec()
-        
-    @pyqtSlot()
-    def exit_app(self):
-        """Exit the application with confirmation"""
-        reply = QMessageBox.question(None, 'Exit Confirmation',
-                                   'Are you sure you want to exit?\nMake sure to save your game!',
-                                   QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-                                   QMessageBox.StandardButton.No)
-        
-        if reply == QMessageBox.StandardButton.Yes:
-            QCoreApplication.quit()
-
-class WebWindow(QMainWindow):
-    def __init__(self):
-        super().__init__()
-        self.setWindowTitle(f"Byte Clicker v{VERSION}")
-        
-        # Set fixed size 1280x720
-        self.setFixedSize(1280, 720)
-        
-        # Center window on screen
-        self.center_window()
-        
-        # Create WebView
-        self.web_view = QWebEngineView(self)
-        self.setCentralWidget(self.web_view)
-        
-        # Create bridge object
-        self.bridge = WebBridge()
-        
-        # Set up QWebChannel
-        self.setup_web_channel()
-        
-        # Load initial HTML
-        self.load_html()
-    
-    def center_window(self):
-        """Center the window on the screen"""
-        screen = QApplication.primaryScreen().geometry()
-        size = self.geometry()
-        x = (screen.width() - size.width()) // 2
-        y = (screen.height() - size.height()) // 2
-        self.move(x, y)
-    
-    def setup_web_channel(self):
-        """Set up the QWebChannel for JavaScript bridge"""
-        page = self.web_view.page()
-        self.channel = QWebChannel(page)
-        page.setWebChannel(self.channel)
-        
-        script = QWebEngineScript()
-        with open('qwebchannel/qwebchannel.js', 'r') as f:
-            script.setSourceCode(f.read())
-        script.setName("qwebchannel.js")
-        script.setWorldId(QWebEngineScript.ScriptWorldId.MainWorld)
-        script.setInjectionPoint(QWebEngineScript.InjectionPoint.DocumentCreation)
-        script.setRunsOnSubFrames(True)
-        
-        page.scripts().insert(script)
-        self.channel.registerObject("bridge", self.bridge)
-    
-    def load_html(self):
-        """Load the initial HTML content"""
-        html = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Byte Clicker</title>
-            <style>
-                body {
-                    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-                    margin: 0;
-                    padding: 20px;
-                    background-color: #1e1e1e;
-                    color: #ffffff;
-                }
-                .container {
-                    display: grid;
-                    grid-template-columns: 2fr 1fr;
-                    gap: 20px;
-                    max-width: 1200px;
-                    margin: 0 auto;
-                }
-                .main-section {
-                    background-color: #2d2d2d;
-                    padding: 20px;
-                    border-radius: 10px;
-                    box-shadow: 0 4px 6px rgba(0,0,0,0.2);
-                }
-                .stats-section {
-                    background-color: #2d2d2d;
-                    padding: 20px;
-                    border-radius: 10px;
-                    box-shadow: 0 4px 6px rgba(0,0,0,0.2);
-                }
-                .click-area {
-                    width: 200px;
-                    height: 200px;
-                    background-color: #4CAF50;
-                    border-radius: 50%;
-                    margin: 20px auto;
-                    cursor: pointer;
-                    display: flex;
-                    align-items: center;
-                    justify-content: center;
-                    font-size: 24px;
-                    user-select: none;
-                    transition: transform 0.1s;
-                }
-                .click-area:active {
-                    transform: scale(0.95);
-                }
-                .generator {
-                    background-color: #3d3d3d;
-                    padding: 15px;
-                    margin: 10px 0;
-                    border-radius: 5px;
-                    cursor: pointer;
-                    transition: all 0.2s ease;
-                    border: 1px solid #4d4d4d;
-                }
-                .generator:hover:not(.locked) {
-                    background-color: #4d4d4d;
-                    transform: translateY(-2px);
-                    box-shadow: 0 2px 8px rgba(0,0,0,0.2);
-                }
-                .generator:active:not(.locked) {
-                    transform: translateY(0);
-                }
-                .generator.locked {
-                    background-color: #2a2a2a;
-                    color: #666;
-                    cursor: not-allowed;
-                }
-                .generator.affordable {
-                    border-color: #4CAF50;
-                }
-                .generator-name {
-                    font-weight: bold;
-                    font-size: 1.1em;
-                    margin-bottom: 5px;
-                }
-                .generator-cost {
-                    color: #4CAF50;
-                }
-                .generator-production {
-                    color: #888;
-                    font-size: 0.9em;
-                }
-                .generator-unlock-text {
-                    color: #666;
-                    font-style: italic;
-                    font-size: 0.9em;
-                    margin-top: 5px;
-                }
-                .stats {
-                    font-size: 18px;
-                    margin-bottom: 10px;
-                }
-                .progress-bar {
-                    width: 100%;
-                    height: 20px;
-                    background-color: #1e1e1e;
-                    border-radius: 10px;
-                    overflow: hidden;
-                    margin-top: 5px;
-                }
-                .progress-fill {
-                    height: 100%;
-                    background-color: #4CAF50;
-                    width: 0%;
-                    transition: width 0.3s;
-                }
-                .save-button {
-                    padding: 10px 20px;
-                    background-color: #4CAF50;
-                    color: white;
-                    border: none;
-                    border-radius: 5px;
-                    cursor: pointer;
-                    margin: 5px;
-                    min-width: 120px;
-                }
-                .save-button:hover {
-                    background-color: #45a049;
-                }
-                .new-game-button {
-                    padding: 10px 20px;
-                    background-color: #f44336;
-                    color: white;
-                    border: none;
-                    border-radius: 5px;
-                    cursor: pointer;
-                    margin: 5px;
-                    min-width: 120px;
-                }
-                .new-game-button:hover {
-                    background-color: #d32f2f;
-                }
-                .exit-button {
-                    padding: 10px 20px;
-                    background-color: #757575;
-                    color: white;
-                    border: none;
-                    border-radius: 5px;
-                    cursor: pointer;
-                    margin: 5px;
-                    min-width: 120px;
-                }
-                .exit-button:hover {
-                    background-color: #616161;
-                }
-                .about-button {
-                    padding: 10px 20px;
-                    background-color: #2196F3;
-                    color: white;
-                    border: none;
-                    border-radius: 5px;
-                    cursor: pointer;
-                    margin: 5px;
-                    min-width: 120px;
-                }
-                .about-button:hover {
-                    background-color: #1976D2;
-                }
-                .button-container {
-                    display: flex;
-                    justify-content: center;
-                    gap: 10px;
-                    margin-bottom: 20px;
-                }
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="main-section">
-                    <h1>Byte Clicker</h1>
-                    <div class="stats">
-                        Bytes: <span id="bytes">0</span><br>
-                        Bytes per second: <span id="bps">0</span>
-                    </div>
-                    <div class="click-area" onclick="click_byte()">
-                        CLICK
-                    </div>
-                    <div id="generators"></div>
-                </div>
-                <div class="stats-section">
-                    <div class="button-container">
-                        <button class="save-button" onclick="save_game()">Save Game</button>
-                        <button class="new-game-button" onclick="new_game()">New Game</button>
-                        <button class="exit-button" onclick="exit_app()">Exit</button>
-                        <button class="about-button" onclick="show_about()">About</button>
-                    </div>
-                    <h2>Statistics</h2>
-                    <div id="stats"></div>
-                </div>
-            </div>
-            
-            <script>
-                let game_state = {
-                    bytes: 0,
-                    total_bytes: 0,
-                    clicks: 0,
-                    generators: [
-                        { id: 0, name: "Auto Clicker", base_cost: 10, cost: 10, count: 0, base_production: 0.1, unlocked: true },
-                        { id: 1, name: "Byte Compiler", base_cost: 50, cost: 50, count: 0, base_production: 0.5, unlocked: false },
-                        { id: 2, name: "Data Miner", base_cost: 250, cost: 250, count: 0, base_production: 2, unlocked: false },
-                        { id: 3, name: "Quantum Computer", base_cost: 1000, cost: 1000, count: 0, base_production: 10, unlocked: false },
-                        { id: 4, name: "AI Cluster", base_cost: 5000, cost: 5000, count: 0, base_production: 50, unlocked: false },
-                        { id: 5, name: "Quantum Network", base_cost: 25000, cost: 25000, count: 0, base_production: 250, unlocked: false },
-                        { id: 6, name: "Digital Dimension", base_cost: 100000, cost: 100000, count: 0, base_production: 1000, unlocked: false }
-                    ],
-                    last_save: Date.now(),
-                    game_start: Date.now()
-                };
-
-                // Initialize QWebChannel
-                new QWebChannel(qt.webChannelTransport, function(channel) {
-                    window.bridge = channel.objects.bridge;
-                    load_game();
-                });
-
-                function format_number(num) {
-                    if (num >= 1e6) {
-                        return (num / 1e6).toFixed(2) + 'M';
-                    } else if (num >= 1e3) {
-                        return (num / 1e3).toFixed(2) + 'K';
-                    }
-                    return num.toFixed(2);
-                }
-
-                function click_byte() {
-                    game_state.bytes += 1 + get_click_multiplier();
-                    game_state.total_bytes += 1 + get_click_multiplier();
-                    game_state.clicks += 1;
-                    update_display();
-                    check_unlocks();
-                }
-
-                function get_click_multiplier() {
-                    return Math.floor(game_state.generators[0].count / 10) * 0.1;
-                }
-
-                function get_bytes_per_second() {
-                    return game_state.generators.reduce((sum, gen) => 
-                        sum + (gen.count * gen.base_production), 0);
-                }
-
-                function buy_generator(id) {
-                    const generator = game_state.generators[id];
-                    if (game_state.bytes >= generator.cost && generator.unlocked) {
-                        game_state.bytes -= generator.cost;
-                        generator.count += 1;
-                        generator.cost = Math.ceil(generator.base_cost * Math.pow(1.15, generator.count));
-                        
-                        // Visual feedback
-                        const element = document.querySelector(`[data-id="${id}"]`);
-                        if (element) {
-                            element.style.backgroundColor = '#4CAF50';
-                            setTimeout(() => {
-                                element.style.backgroundColor = '';
-                            }, 100);
-                        }
-                        
-                        check_unlocks();
-                        update_display();
-                    }
-                }
-
-                function check_unlocks() {
-                    game_state.generators.forEach((gen, index) => {
-                        if (!gen.unlocked && index > 0) {
-                            const prev_gen = game_state.generators[index - 1];
-                            if (prev_gen.count >= 5) {
-                                gen.unlocked = true;
-                                update_display();
-                            }
-                        }
-                    });
-                }
-
-                function update_display() {
-                    // Update only the text content of existing elements
-                    document.getElementById('bytes').textContent = format_number(game_state.bytes);
-                    document.getElementById('bps').textContent = format_number(get_bytes_per_second());
-                    
-                    // Update stats text
-                    document.getElementById('total-bytes').textContent = format_number(game_state.total_bytes);
-                    document.getElementById('total-clicks').textContent = game_state.clicks;
-                    document.getElementById('click-power').textContent = format_number(1 + get_click_multiplier());
-                    document.getElementById('time-played').textContent = format_time(Date.now() - game_state.game_start);
-                    
-                    // Update generator displays
-                    game_state.generators.forEach((gen, id) => {
-                        const element = document.querySelector(`[data-id="${id}"]`);
-                        if (element) {
-                            const affordable = game_state.bytes >= gen.cost;
-                            element.classList.toggle('affordable', affordable && gen.unlocked);
-                            element.classList.toggle('locked', !gen.unlocked);
-                            
-                            element.querySelector('.generator-name').textContent = `${gen.name} (${gen.count})`;
-                            element.querySelector('.generator-cost').textContent = `Cost: ${format_number(gen.cost)} bytes`;
-                            element.querySelector('.generator-production').textContent = 
-                                `Producing: ${format_number(gen.count * gen.base_production)} bytes/s`;
-                        }
-                    });
-                }
-
-                function format_time(ms) {
-                    const seconds = Math.floor(ms / 1000);
-                    const minutes = Math.floor(seconds / 60);
-                    const hours = Math.floor(minutes / 60);
-                    return `${hours}h ${minutes % 60}m ${seconds % 60}s`;
-                }
-
-                function game_loop() {
-                    const now = Date.now();
-                    const delta = (now - game_state.last_update) / 1000;
-                    game_state.last_update = now;
-                    
-                    const production = get_bytes_per_second() * delta;
-                    game_state.bytes += production;
-                    game_state.total_bytes += production;
-                    
-                    update_display();
-                }
-
-                function new_game() {
-                    if (confirm("Are you sure you want to start a new game? This will erase your current progress.")) {
-                        const now = Date.now();
-                        game_state = {
-                            bytes: 0,
-                            total_bytes: 0,
-                            clicks: 0,
-                            generators: [
-                                { id: 0, name: "Auto Clicker", base_cost: 10, cost: 10, count: 0, base_production: 0.1, unlocked: true },
-                                { id: 1, name: "Byte Compiler", base_cost: 50, cost: 50, count: 0, base_production: 0.5, unlocked: false },
-                                { id: 2, name: "Data Miner", base_cost: 250, cost: 250, count: 0, base_production: 2, unlocked: false },
-                                { id: 3, name: "Quantum Computer", base_cost: 1000, cost: 1000, count: 0, base_production: 10, unlocked: false },
-                                { id: 4, name: "AI Cluster", base_cost: 5000, cost: 5000, count: 0, base_production: 50, unlocked: false },
-                                { id: 5, name: "Quantum Network", base_cost: 25000, cost: 25000, count: 0, base_production: 250, unlocked: false },
-                                { id: 6, name: "Digital Dimension", base_cost: 100000, cost: 100000, count: 0, base_production: 1000, unlocked: false }
-                            ],
-                            last_save: now,
-                            game_start: now,
-                            last_update: now
-                        };
-                        check_unlocks();
-                        update_display();
-                        save_game();  // Save the new game state
-                    }
-                }
-
-                function save_game() {
-                    if (window.bridge) {
-                        game_state.last_save = Date.now();
-                        bridge.save_game(JSON.stringify(game_state))
-                            .then(response => {
-                                // Show save feedback
-                                const saveBtn = document.querySelector('.save-button');
-                                saveBtn.textContent = 'Saved!';
-                                setTimeout(() => {
-                                    saveBtn.textContent = 'Save Game';
-                                }, 1000);
-                            });
-                    }
-                }
-
-                function load_game() {
-                    if (window.bridge) {
-                        bridge.load_game().then(saved_state => {
-                            try {
-                                const loaded_state = JSON.parse(saved_state);
-                                if (Object.keys(loaded_state).length > 0) {
-                                    game_state = loaded_state;
-                                    game_state.last_update = Date.now();
-                                    update_display();
-                                    check_unlocks();
-                                }
-                            } catch (e) {
-                                console.error("Error loading game:", e);
-                            }
-                        });
-                    }
-                }
-
-                function show_about() {
-                    if (window.bridge) {
-                        bridge.show_about();
-                    }
-                }
-
-                function exit_app() {
-                    if (window.bridge) {
-                        bridge.exit_app();
-                    }
-                }
-
-                // Initialize game
-                game_state.last_update = Date.now();
-                
-                // Game loop
-                setInterval(game_loop, 100);  // Update every 100ms
-                setInterval(save_game, 60000);  // Auto-save every minute
-
-                // Initial HTML structure for stats
-                document.getElementById('stats').innerHTML = `
-                    <div>Total Bytes: <span id="total-bytes">0</span></div>
-                    <div>Total Clicks: <span id="total-clicks">0</span></div>
-                    <div>Click Power: <span id="click-power">1.00</span></div>
-                    <div>Time Played: <span id="time-played">0h 0m 0s</span></div>
-                `;
-
-                // Initial HTML structure for generators
-                document.getElementById('generators').innerHTML = game_state.generators.map(gen => `
-                    <div class="generator ${gen.unlocked ? 'affordable' : 'locked'}" data-id="${gen.id}"
-                         onclick="buy_generator(${gen.id})"
-                         title="${gen.unlocked ? 'Click to buy' : 'Unlock by buying 5 of previous generator'}">
-                        <div class="generator-name">${gen.name} (${gen.count})</div>
-                        <div class="generator-cost">Cost: ${format_number(gen.cost)} bytes</div>
-                        <div class="generator-production">Producing: ${format_number(gen.count * gen.base_production)} bytes/s</div>
-                        ${gen.unlocked ? '' : '<div class="generator-unlock-text">Unlock by buying 5 of previous generator</div>'}
-                    </div>
-                `).join('');
-            </script>
-        </body>
-        </html>
-        """
-        self.web_view.setHtml(html, QUrl("about:blank"))
-
-if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    window = WebWindow()
+            report = recording.replay_file(args.replay, args.replay_repeat)
+        except (OSError, save_format.SaveFormatError) as e:
+            sys.exit(f"Error replaying {args.replay}: {e}")
+        print(recording.format_report(report))
+        sys.exit(1 if report["differences"] else 0)
+    if args.simulate:
+        # NumPy is only needed for the simulator
+        import simulate
+        try:
+            report = simulate.run_simulation(args.policies, args.games, args.hours,
+                                             args.clicks_per_second, workers=args.workers)
+        except ValueError as e:
+            sys.exit(f"Error: {e}")
+        print(simulate.format_report(report))
+        if args.simulate_output:
+            with open(args.simulate_output, 'w') as f:
+                json.dump(report, f, indent=2)
+        sys.exit(0)
+    # Only the chosen front end is imported, so --native-ui never loads QtWebEngine
+    if args.native_ui:
+        from native_ui import NativeWindow
+    else:
+        from web_ui import WebWindow, register_app_scheme
+        register_app_scheme()
+    startup_profile = StartupProfile()
+    app = QApplication(sys.argv[:1] + qt_args)
+    app.setApplicationName("ByteClicker")
+    startup_profile.mark("app_created")
+    window = NativeWindow(startup_profile) if args.native_ui else WebWindow(startup_profile)
+    startup_profile.mark("window_created")
+    session = window.session if args.native_ui else window.bridge.session
+    session.offline_efficiency = args.offline_efficiency
+    session.offline_cap_seconds = args.offline_cap_hours * 3600
+    session.telemetry_enabled = args.telemetry
+    session.record_path = args.record
+    app.aboutToQuit.connect(session.shutdown)
+    if args.telemetry_dump:
+        app.aboutToQuit.connect(lambda: session.telemetry.dump(args.telemetry_dump))
+    if args.state_server is not None:
+        from state_server import StateServer
+        try:
+            state_server = StateServer(args.state_server, interval_ms=args.state_interval)
+        except OSError as e:
+            sys.exit(f"Error starting state server: {e}")
+        state_server.attach(session)
+        app.aboutToQuit.connect(state_server.close)
+        print(f"Streaming game state at {state_server.url}/events", flush=True)
+    if args.startup_profile:
+        complete = window.startup_complete if args.native_ui else window.bridge.startup_complete
+        complete.connect(lambda: print(startup_profile.report(), flush=True))
     window.show()
+    startup_profile.mark("window_shown")
+    if args.native_ui:
+        window.start()
     sys.exit(app.exec())
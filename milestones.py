@@ -0,0 +1,64 @@
+"""Milestones unlocked when a game metric reaches a threshold
+
+Pending milestones are kept in one min-heap per metric, ordered by
+threshold. Every metric only grows, so checking one compares its value
+with the top of a single heap: a tick costs the same for any number of
+milestones, and work is only done when a threshold is crossed.
+"""
+
+import heapq
+
+
+class MilestoneTracker:
+    """Pending and unlocked milestones of one game"""
+
+    __slots__ = ("milestones", "pending", "unlocked", "latest")
+
+    def __init__(self, milestones):
+        self.milestones = milestones
+        self.reset()
+
+    def reset(self, unlocked=()):
+        """Start over with only the given (index, unlocked_at) pairs unlocked"""
+        self.unlocked = {}
+        for index, unlocked_at in unlocked:
+            if 0 <= index < len(self.milestones):
+                self.unlocked[int(index)] = unlocked_at
+        # Heaps of (threshold, index) keyed by metric, or by generator index
+        self.pending = {}
+        for index, milestone in enumerate(self.milestones):
+            if index not in self.unlocked:
+                self.pending.setdefault(milestone["key"], []).append((milestone["threshold"], index))
+        for heap in self.pending.values():
+            heapq.heapify(heap)
+        self.latest = max(self.unlocked, key=self.unlocked.get) if self.unlocked else None
+
+    def check(self, key, value, time):
+        """Unlock the milestones of a metric that value reached; returns whether any were"""
+        heap = self.pending.get(key)
+        if not heap or value < heap[0][0]:
+            return False
+        while heap and heap[0][0] <= value:
+            index = heapq.heappop(heap)[1]
+            self.unlocked[index] = time
+            self.latest = index
+        return True
+
+    def to_state(self):
+        """Unlocked milestones as [index, unlocked_at] pairs, in unlock order"""
+        return [[index, unlocked_at] for index, unlocked_at in self.unlocked.items()]
+
+    def view(self):
+        latest = self.milestones[self.latest] if self.latest is not None else None
+        return {
+            "unlocked": len(self.unlocked),
+            "total": len(self.milestones),
+            "latest": latest["name"] if latest else "",
+            "latest_description": latest["description"] if latest else "",
+        }
+
+    def list(self):
+        """Every milestone with its unlock time, or None while it is pending"""
+        return [{"name": milestone["name"], "description": milestone["description"],
+                 "unlocked_at": self.unlocked.get(index)}
+                for index, milestone in enumerate(self.milestones)]
@@ -0,0 +1,246 @@
+"""Native front end: the game drawn with plain Qt widgets, without Chromium
+
+It plays the same GameSession as the web front end, so the rules, the
+save files and offline progress are shared between the two.
+"""
+
+import time
+
+from PyQt6.QtCore import Qt, QEvent, QTimer, pyqtSignal
+from PyQt6.QtWidgets import (QButtonGroup, QGridLayout, QHBoxLayout, QLabel,
+                             QMainWindow, QMessageBox, QPushButton, QScrollArea, QVBoxLayout,
+                             QWidget)
+
+from bignum import BigNum, format_number
+from session import VERSION, GameSession
+
+AUTOSAVE_INTERVAL_MS = 60000
+# How long the offline progress notice stays in the status bar
+OFFLINE_NOTICE_MS = 10000
+MILESTONE_NOTICE_MS = 5000
+
+
+def format_bytes(value):
+    """format_number for the {"m", "e"} values of the engine's view state"""
+    return format_number(BigNum.from_json(value))
+
+
+def format_time(ms):
+    seconds = int(ms // 1000)
+    return f"{seconds // 3600}h {seconds // 60 % 60}m {seconds % 60}s"
+
+
+class NativeWindow(QMainWindow):
+    """Game window built from labels and buttons"""
+
+    # Emitted once the first engine tick has been rendered
+    startup_complete = pyqtSignal()
+
+    def __init__(self, startup_profile=None):
+        super().__init__()
+        self.setWindowTitle(f"Byte Clicker v{VERSION}")
+        self.startup_profile = startup_profile
+        self.session = GameSession(self)
+        self.engine = self.session.engine
+        # Last text set on each label, so unchanged labels are not redrawn
+        self._last = {}
+        self._first_tick_reported = False
+        # Unlocked milestone count last rendered, to announce new ones
+        self._shown_milestones = 0
+
+        self.build()
+        self.session.ticked.connect(self.render)
+        self.autosave_timer = QTimer(self)
+        self.autosave_timer.setInterval(AUTOSAVE_INTERVAL_MS)
+        self.autosave_timer.timeout.connect(self.session.save)
+
+    def build(self):
+        """Create the widgets for the stats, controls and generators"""
+        main_section = QVBoxLayout()
+        title = QLabel("Byte Clicker")
+        title.setStyleSheet("font-size: 24px; font-weight: bold;")
+        main_section.addWidget(title)
+        self.bytes_label = QLabel()
+        self.bps_label = QLabel()
+        main_section.addWidget(self.bytes_label)
+        main_section.addWidget(self.bps_label)
+
+        self.click_button = QPushButton("CLICK")
+        self.click_button.setMinimumHeight(80)
+        self.click_button.clicked.connect(self.click)
+        main_section.addWidget(self.click_button)
+
+        amounts = QHBoxLayout()
+        self.amount_group = QButtonGroup(self)
+        for amount, label in ((1, "x1"), (10, "x10"), (100, "x100"), ("max", "Max")):
+            button = QPushButton(label)
+            button.setCheckable(True)
+            button.setChecked(amount == 1)
+            button.clicked.connect(lambda checked, amount=amount: self.set_buy_amount(amount))
+            self.amount_group.addButton(button)
+            amounts.addWidget(button)
+        main_section.addLayout(amounts)
+
+        generators = QWidget()
+        self.generator_layout = QVBoxLayout(generators)
+        self.generator_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
+        self.generator_buttons = []
+        scroll = QScrollArea()
+        scroll.setWidgetResizable(True)
+        scroll.setWidget(generators)
+        main_section.addWidget(scroll, 1)
+
+        stats_section = QVBoxLayout()
+        buttons = QGridLayout()
+        for column, (label, handler) in enumerate((("Save Game", self.save_game),
+                                                   ("New Game", self.new_game),
+                                                   ("Exit", self.close),
+                                                   ("About", self.show_about))):
+            button = QPushButton(label)
+            button.clicked.connect(handler)
+            buttons.addWidget(button, column // 2, column % 2)
+        self.save_button = buttons.itemAtPosition(0, 0).widget()
+        stats_section.addLayout(buttons)
+        stats_title = QLabel("Statistics")
+        stats_title.setStyleSheet("font-size: 18px; font-weight: bold;")
+        stats_section.addWidget(stats_title)
+        self.total_bytes_label = QLabel()
+        self.clicks_label = QLabel()
+        self.click_power_label = QLabel()
+        self.time_played_label = QLabel()
+        self.milestones_label = QLabel()
+        for label in (self.total_bytes_label, self.clicks_label, self.click_power_label,
+                      self.time_played_label, self.milestones_label):
+            stats_section.addWidget(label)
+        stats_section.addStretch(1)
+
+        central = QWidget()
+        layout = QHBoxLayout(central)
+        layout.addLayout(main_section, 2)
+        layout.addLayout(stats_section, 1)
+        self.setCentralWidget(central)
+        self.resize(900, 640)
+
+    def build_generators(self, count):
+        """Create one button per generator"""
+        for button in self.generator_buttons:
+            button.deleteLater()
+        self.generator_buttons = []
+        for index in range(count):
+            button = QPushButton()
+            button.setMinimumHeight(60)
+            button.clicked.connect(lambda checked, index=index: self.buy(index))
+            self.generator_layout.addWidget(button)
+            self.generator_buttons.append(button)
+
+    def start(self):
+        """Load the save, start ticking and show any offline progress"""
+        self.session.load()
+        for message in self.session.take_load_errors():
+            QMessageBox.warning(self, "Byte Clicker", message)
+        self._shown_milestones = len(self.engine.milestones.unlocked)
+        self.autosave_timer.start()
+        self.render()
+        summary = self.session.offline_summary
+        if summary and summary["bytes_earned"] > 0:
+            text = (f"While you were away for {format_time(summary['elapsed_seconds'] * 1000)} "
+                    f"you earned {format_number(summary['bytes_earned'])} bytes")
+            if summary["capped"]:
+                text += f" (capped at {format_time(summary['credited_seconds'] * 1000)})"
+            self.statusBar().showMessage(text, OFFLINE_NOTICE_MS)
+
+    def set_text(self, label, text):
+        # Only touch the widget when the text changed
+        if self._last.get(label) != text:
+            self._last[label] = text
+            label.setText(text)
+
+    def render(self):
+        """Show the engine's current view state"""
+        view, generators = self.engine.view_delta()
+        if len(self.generator_buttons) != len(self.engine.catalog):
+            self.build_generators(len(self.engine.catalog))
+            generators = dict(enumerate(self.engine.view_state()["generators"]))
+        self.set_text(self.bytes_label, f"Bytes: {format_bytes(view['bytes'])}")
+        self.set_text(self.bps_label, f"Bytes per second: {format_bytes(view['bytes_per_second'])}")
+        self.set_text(self.total_bytes_label, f"Total Bytes: {format_bytes(view['total_bytes'])}")
+        self.set_text(self.clicks_label, f"Total Clicks: {view['clicks']}")
+        self.set_text(self.click_power_label, f"Click Power: {format_bytes(view['click_power'])}")
+        self.set_text(self.time_played_label,
+                      f"Time Played: {format_time(time.time() * 1000 - view['game_start'])}")
+        milestones = view["milestones"]
+        self.set_text(self.milestones_label, f"Milestones: {milestones['unlocked']} / {milestones['total']}")
+        if milestones["unlocked"] > self._shown_milestones:
+            self.statusBar().showMessage(f"Milestone unlocked: {milestones['latest']} - "
+                                         f"{milestones['latest_description']}", MILESTONE_NOTICE_MS)
+        self._shown_milestones = milestones["unlocked"]
+
+        # Only the generators that changed since the last render
+        for index, gen in generators.items():
+            button = self.generator_buttons[index]
+            if gen["unlocked"]:
+                label = "Cost" if gen["amount"] == 1 else f"Cost (x{gen['amount']})"
+                text = (f"{gen['name']} ({gen['count']})\n"
+                        f"{label}: {format_bytes(gen['cost'])} bytes\n"
+                        f"Producing: {format_bytes(gen['production'])} bytes/s")
+            else:
+                text = f"{gen['name']}\n{gen['unlock_text']}"
+            self.set_text(button, text)
+            button.setEnabled(gen["affordable"])
+
+        if not self._first_tick_reported:
+            # The first rendered engine tick completes startup
+            self._first_tick_reported = True
+            if self.startup_profile is not None:
+                self.startup_profile.mark("first_tick")
+            self.startup_complete.emit()
+
+    def click(self):
+        self.session.click()
+        self.render()
+
+    def set_buy_amount(self, amount):
+        self.session.set_buy_amount(amount)
+        self.render()
+
+    def buy(self, index):
+        self.session.buy(index)
+        self.render()
+
+    def save_game(self):
+        self.session.save()
+        self.save_button.setText("Saved!")
+        QTimer.singleShot(1000, lambda: self.save_button.setText("Save Game"))
+
+    def new_game(self):
+        reply = QMessageBox.question(self, "New Game",
+                                     "Are you sure you want to start a new game? "
+                                     "This will erase your current progress.")
+        if reply == QMessageBox.StandardButton.Yes:
+            self.session.new_game()
+            self.session.save()
+            self.render()
+
+    def show_about(self):
+        QMessageBox.about(self, "About Byte Clicker",
+                          f"Byte Clicker v{VERSION}\n\n"
+                          "A fun incremental game about collecting bytes!\n\n"
+                          "Click to generate bytes and buy generators to automate your byte production.\n\n"
+                          "© 2024 Byte Clicker")
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.WindowStateChange:
+            self.update_activity()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.update_activity()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.update_activity()
+
+    def update_activity(self):
+        """Pause the engine while the game cannot be seen"""
+        self.session.set_window_active(self.isVisible() and not self.isMinimized())
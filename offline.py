@@ -0,0 +1,49 @@
+"""Closed-form production catch-up for time spent away from the game"""
+
+import time
+
+from bignum import BigNum, ZERO
+
+# Fraction of normal production credited while the game was closed
+OFFLINE_EFFICIENCY = 1.0
+# Longest absence that is credited, in seconds
+OFFLINE_CAP_SECONDS = 7 * 24 * 60 * 60
+
+
+def bytes_per_second(state):
+    """Total generator production of a saved game state"""
+    total = ZERO
+    for gen in state.get("generators", []):
+        total = total + BigNum(gen.get("count", 0)) * (gen.get("base_production", 0) *
+                                                        gen.get("multiplier", 1))
+    return total
+
+
+def apply_offline_progress(state, now_ms=None, efficiency=OFFLINE_EFFICIENCY,
+                           cap_seconds=OFFLINE_CAP_SECONDS):
+    """Credit production accrued since the state was last updated
+
+    Production is constant while the game is closed, so the catch-up is a
+    single multiplication per generator instead of replaying game ticks.
+    The state is updated in place and a summary of the credit is returned.
+    """
+    if now_ms is None:
+        now_ms = time.time() * 1000
+    last_seen = state.get("last_update", state.get("last_save", now_ms))
+    elapsed = max(0.0, (now_ms - last_seen) / 1000)
+    credited = min(elapsed, cap_seconds)
+    production = bytes_per_second(state)
+    earned = production * credited * efficiency
+
+    state["bytes"] = BigNum.from_json(state.get("bytes", 0)) + earned
+    state["total_bytes"] = BigNum.from_json(state.get("total_bytes", 0)) + earned
+    state["last_update"] = now_ms
+
+    return {
+        "elapsed_seconds": elapsed,
+        "credited_seconds": credited,
+        "capped": elapsed > cap_seconds,
+        "efficiency": efficiency,
+        "bytes_per_second": production,
+        "bytes_earned": earned,
+    }
@@ -0,0 +1,195 @@
+"""Input recordings and their deterministic headless replay
+
+A recording holds the game state it started from, every input event in
+the journal's record format (journal.py) and the state it ended with:
+
+    magic (4s) | version (H) | start state length (I) | start state
+    | event records ... | end record (a: final state length) | final state
+
+Events carry the engine time they were applied at, so a replay needs no
+wall clock: the engine is stepped to each event's time and the event is
+applied, as fast as the engine runs. Replaying the same recording always
+gives the same state, so a recording from an older version of the game
+checks that a rules change keeps old behavior. Fed through a WebBridge
+on a ReplayClock, a recording is also a repeatable load for the bridge
+and the page.
+"""
+
+import json
+import math
+import struct
+import time
+
+import save_format
+from bignum import BigNum
+from engine import GameEngine
+from journal import OP_BUY, OP_CLICK, OP_NAMES, OP_SET_BUY_AMOUNT, RECORD_SIZE, pack, replay, unpack_all
+
+MAGIC = b"BCRC"
+RECORDING_VERSION = 1
+HEADER = struct.Struct("<4sHI")
+OP_END = 255
+# Difference in log10 allowed between recorded and replayed byte counts;
+# production added in differently sized tick batches rounds differently
+BYTES_TOLERANCE = 1e-9
+
+
+class Recorder:
+    """Writes the input events of a running game to a recording file"""
+
+    def __init__(self, path, start_state):
+        self.path = path
+        self.events = 0
+        self._file = open(path, 'wb')
+        start = save_format.encode(start_state)
+        self._file.write(HEADER.pack(MAGIC, RECORDING_VERSION, len(start)) + start)
+
+    def append(self, time, op, a=0, b=0):
+        """Append one event, like Journal.append"""
+        self.events += 1
+        self._file.write(pack(self.events, time, op, a, b))
+
+    def close(self, final_state):
+        """Write the final state and close the file; returns a summary"""
+        final = save_format.encode(final_state)
+        self._file.write(pack(self.events + 1, final_state["last_update"], OP_END, len(final)) + final)
+        self._file.close()
+        return {"path": self.path, "events": self.events}
+
+
+class Recording:
+    """A recording read back from a file"""
+
+    def __init__(self, start_state, events, final_state):
+        self.start_state = start_state
+        self.events = events
+        self.final_state = final_state
+
+    @property
+    def duration_ms(self):
+        return self.final_state["last_update"] - self.start_state["last_update"]
+
+
+def read_recording(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < HEADER.size or not data.startswith(MAGIC):
+        raise save_format.SaveFormatError(f"{path} is not a recording")
+    _, version, start_length = HEADER.unpack_from(data, 0)
+    if version != RECORDING_VERSION:
+        raise save_format.SaveFormatError(f"Unknown recording version {version}")
+    offset = HEADER.size + start_length
+    start_state = save_format.decode(data[HEADER.size:offset])
+    events = []
+    for record in unpack_all(data[offset:]):
+        if record[2] == OP_END:
+            final_start = offset + (len(events) + 1) * RECORD_SIZE
+            final_state = save_format.decode(data[final_start:final_start + record[3]])
+            return Recording(start_state, events, final_state)
+        events.append(record)
+    raise save_format.SaveFormatError(f"Recording {path} has no end record; was the game stopped cleanly?")
+
+
+def replay_recording(recording, engine=None):
+    """Replay a recording into a new engine (or the one given) and return it"""
+    if engine is None:
+        engine = GameEngine(now=recording.start_state["last_update"])
+    engine.load_state(recording.start_state)
+    replay(engine, recording.events)
+    engine.tick_to(recording.final_state["last_update"])
+    return engine
+
+
+class ReplayClock:
+    """A clock for GameSession that only moves when a replay sets it"""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def replay_through_bridge(recording, bridge, clock, on_event=None):
+    """Feed a recording through a WebBridge as the page would and return the final state
+
+    The bridge's session must run on clock. Before each event the clock is
+    set just past the event's time and the session ticks, which sends the
+    view delta; the event then goes through batch(). on_event(index) is
+    called after each one, e.g. to let Qt deliver the deltas to the page.
+    """
+    session = bridge.session
+    half_step = session.engine.tick_ms / 2
+    clock.now = recording.start_state["last_update"]
+    session.engine.load_state(recording.start_state)
+    for index, record in enumerate(recording.events):
+        clock.now = record[1] + half_step
+        session.tick()
+        bridge.batch(json.dumps([batch_operation(record)]))
+        if on_event is not None:
+            on_event(index)
+    clock.now = recording.final_state["last_update"] + half_step
+    session.tick()
+    return session.engine.to_state()
+
+
+def batch_operation(record):
+    """The WebBridge batch operation that applies an event record"""
+    seq, time, op, a, b = record
+    if op == OP_CLICK:
+        return {"op": "click", "args": [a]}
+    if op == OP_BUY:
+        return {"op": "buy", "args": [a]}
+    if op == OP_SET_BUY_AMOUNT:
+        return {"op": "set_buy_amount", "args": [a or "max"]}
+    return {"op": OP_NAMES[op], "args": []}
+
+
+def compare_states(expected, actual):
+    """Differences between two full game states, as printable lines"""
+    differences = []
+    for key in ("bytes", "total_bytes"):
+        want, got = BigNum.from_json(expected[key]), BigNum.from_json(actual[key])
+        if want != got and not (want > 0 and got > 0 and abs(want.log10() - got.log10()) <= BYTES_TOLERANCE):
+            differences.append(f"{key}: recorded {want}, replayed {got}")
+    if expected["clicks"] != actual["clicks"]:
+        differences.append(f"clicks: recorded {expected['clicks']}, replayed {actual['clicks']}")
+    for index, (want, got) in enumerate(zip(expected["generators"], actual["generators"])):
+        for key in ("count", "unlocked"):
+            if want[key] != got[key]:
+                differences.append(f"generator {index} {key}: recorded {want[key]}, replayed {got[key]}")
+    want = sorted(index for index, _ in expected.get("milestones", []))
+    got = sorted(index for index, _ in actual.get("milestones", []))
+    if want != got:
+        differences.append(f"milestones: recorded {want}, replayed {got}")
+    return differences
+
+
+def replay_file(path, repeat=1):
+    """Replay a recording repeat times and compare the result with its final state"""
+    recording = read_recording(path)
+    engine = GameEngine(now=recording.start_state["last_update"])
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        replay_recording(recording, engine)
+        timings.append((time.perf_counter() - start) * 1000)
+    replay_ms = min(timings)
+    return {
+        "events": len(recording.events),
+        "recorded_seconds": recording.duration_ms / 1000,
+        "replay_ms": replay_ms,
+        "speedup": recording.duration_ms / replay_ms if replay_ms else math.inf,
+        "differences": compare_states(recording.final_state, engine.to_state()),
+    }
+
+
+def format_report(report):
+    lines = [f"{report['events']} events over {report['recorded_seconds']:.1f} s replayed in "
+             f"{report['replay_ms']:.2f} ms ({report['speedup']:,.0f}x real time)"]
+    if report["differences"]:
+        lines.append("Final state differs from the recording:")
+        lines.extend("  " + line for line in report["differences"])
+    else:
+        lines.append("Final state matches the recording")
+    return "\n".join(lines)
@@ -0,0 +1,283 @@
+"""Compact versioned binary save format with schema migrations
+
+A save file is a fixed header followed by a zlib-compressed payload:
+
+    magic (4s) | schema version (H) | payload length (I) | crc32 (I) | payload
+
+Only dynamic fields are stored. Generator names, base costs and production
+come from game_data when the state is expanded, and costs are recomputed
+from the stored counts. Byte counts are stored as BigNum mantissa/exponent
+pairs. Legacy saves written as the full JSON game state are schema version 0
+and are upgraded through the migration registry.
+"""
+
+import json
+import struct
+import zlib
+
+from bignum import BigNum, json_default
+from game_data import GENERATORS, generator_cost
+
+MAGIC = b"BCSV"
+SCHEMA_VERSION = 3
+
+HEADER = struct.Struct("<4sHII")
+STATE_V1 = struct.Struct("<ddQdddH")
+STATE_V2 = struct.Struct("<didiQdddH")
+GENERATOR_V1 = struct.Struct("<IB")
+MILESTONE_COUNT_V3 = struct.Struct("<I")
+MILESTONE_V3 = struct.Struct("<Id")
+
+# Upgrade functions keyed by the schema version they upgrade from
+MIGRATIONS = {}
+# Payload decoders keyed by the schema version they read
+PAYLOAD_DECODERS = {}
+
+
+class SaveFormatError(ValueError):
+    """Raised when save data is corrupt or uses an unknown schema"""
+
+
+def migration(from_version):
+    """Register a function that upgrades a state dict to from_version + 1"""
+    def register(func):
+        MIGRATIONS[from_version] = func
+        return func
+    return register
+
+
+def payload_decoder(version):
+    """Register a function that unpacks a payload of the given schema version"""
+    def register(func):
+        PAYLOAD_DECODERS[version] = func
+        return func
+    return register
+
+
+def migrate(state, version):
+    """Upgrade a state dict from version to SCHEMA_VERSION"""
+    while version < SCHEMA_VERSION:
+        if version not in MIGRATIONS:
+            raise SaveFormatError(f"No migration from save schema {version}")
+        state = MIGRATIONS[version](state)
+        version += 1
+    return state
+
+
+@migration(0)
+def _compact_legacy_json(state):
+    """Schema 0 -> 1: drop static generator data from a full JSON game state"""
+    now = state.get("last_save", 0)
+    return {
+        "bytes": float(state.get("bytes", 0)),
+        "total_bytes": float(state.get("total_bytes", 0)),
+        "clicks": int(state.get("clicks", 0)),
+        "last_save": float(now),
+        "game_start": float(state.get("game_start", now)),
+        "last_update": float(state.get("last_update", now)),
+        "generators": [(int(gen.get("count", 0)), bool(gen.get("unlocked", False)))
+                       for gen in state.get("generators", [])],
+    }
+
+
+@migration(1)
+def _bytes_to_bignum(state):
+    """Schema 1 -> 2: store byte counts as mantissa/exponent pairs"""
+    state = dict(state)
+    state["bytes"] = BigNum(state["bytes"])
+    state["total_bytes"] = BigNum(state["total_bytes"])
+    return state
+
+
+@migration(2)
+def _add_milestones(state):
+    """Schema 2 -> 3: add unlocked milestones; the engine unlocks the ones already reached on load"""
+    return dict(state, milestones=[])
+
+
+def compact_state(state):
+    """Reduce a full game state from the page to a current-schema compact state"""
+    now = float(state.get("last_save", 0))
+    return {
+        "bytes": BigNum.from_json(state.get("bytes", 0)),
+        "total_bytes": BigNum.from_json(state.get("total_bytes", 0)),
+        "clicks": int(state.get("clicks", 0)),
+        "last_save": now,
+        "game_start": float(state.get("game_start", now)),
+        "last_update": float(state.get("last_update", now)),
+        "generators": [(int(gen.get("count", 0)), bool(gen.get("unlocked", False)))
+                       for gen in state.get("generators", [])],
+        "milestones": [(int(index), float(unlocked_at)) for index, unlocked_at in state.get("milestones", [])],
+    }
+
+
+@payload_decoder(1)
+def _unpack_v1(payload):
+    """Read a schema 1 payload into a compact state dict"""
+    (bytes_, total_bytes, clicks, last_save, game_start, last_update,
+     count) = STATE_V1.unpack_from(payload, 0)
+    offset = STATE_V1.size
+    if len(payload) != offset + count * GENERATOR_V1.size:
+        raise SaveFormatError("Save payload has the wrong length")
+    return {
+        "bytes": bytes_,
+        "total_bytes": total_bytes,
+        "clicks": clicks,
+        "last_save": last_save,
+        "game_start": game_start,
+        "last_update": last_update,
+        "generators": _unpack_generators(payload, offset, count),
+    }
+
+
+@payload_decoder(2)
+def _unpack_v2(payload):
+    """Read a schema 2 payload into a compact state dict"""
+    (bytes_m, bytes_e, total_m, total_e, clicks, last_save, game_start,
+     last_update, count) = STATE_V2.unpack_from(payload, 0)
+    offset = STATE_V2.size
+    if len(payload) != offset + count * GENERATOR_V1.size:
+        raise SaveFormatError("Save payload has the wrong length")
+    return {
+        "bytes": BigNum(bytes_m, bytes_e),
+        "total_bytes": BigNum(total_m, total_e),
+        "clicks": clicks,
+        "last_save": last_save,
+        "game_start": game_start,
+        "last_update": last_update,
+        "generators": _unpack_generators(payload, offset, count),
+    }
+
+
+@payload_decoder(3)
+def _unpack_v3(payload):
+    """Read a schema 3 payload into a compact state dict"""
+    (bytes_m, bytes_e, total_m, total_e, clicks, last_save, game_start,
+     last_update, count) = STATE_V2.unpack_from(payload, 0)
+    offset = STATE_V2.size
+    generators = _unpack_generators(payload, offset, count)
+    offset += count * GENERATOR_V1.size
+    (milestone_count,) = MILESTONE_COUNT_V3.unpack_from(payload, offset)
+    offset += MILESTONE_COUNT_V3.size
+    if len(payload) != offset + milestone_count * MILESTONE_V3.size:
+        raise SaveFormatError("Save payload has the wrong length")
+    milestones = [MILESTONE_V3.unpack_from(payload, offset + i * MILESTONE_V3.size)
+                  for i in range(milestone_count)]
+    return {
+        "bytes": BigNum(bytes_m, bytes_e),
+        "total_bytes": BigNum(total_m, total_e),
+        "clicks": clicks,
+        "last_save": last_save,
+        "game_start": game_start,
+        "last_update": last_update,
+        "generators": generators,
+        "milestones": milestones,
+    }
+
+
+def _unpack_generators(payload, offset, count):
+    """Read count (count, unlocked) generator records starting at offset"""
+    generators = []
+    for _ in range(count):
+        gen_count, unlocked = GENERATOR_V1.unpack_from(payload, offset)
+        generators.append((gen_count, bool(unlocked)))
+        offset += GENERATOR_V1.size
+    return generators
+
+
+def _pack_v3(compact):
+    """Write a compact state dict as a schema 3 payload"""
+    bytes_, total_bytes = compact["bytes"], compact["total_bytes"]
+    parts = [STATE_V2.pack(bytes_.m, bytes_.e, total_bytes.m, total_bytes.e,
+                           compact["clicks"], compact["last_save"], compact["game_start"],
+                           compact["last_update"], len(compact["generators"]))]
+    for count, unlocked in compact["generators"]:
+        parts.append(GENERATOR_V1.pack(count, unlocked))
+    parts.append(MILESTONE_COUNT_V3.pack(len(compact["milestones"])))
+    for index, unlocked_at in compact["milestones"]:
+        parts.append(MILESTONE_V3.pack(index, unlocked_at))
+    return b"".join(parts)
+
+
+def expand_state(compact):
+    """Rebuild the full game state the page expects from a compact state"""
+    generators = []
+    for static, (count, unlocked) in zip(GENERATORS, compact["generators"]):
+        gen = dict(static)
+        gen["count"] = count
+        gen["cost"] = generator_cost(static["base_cost"], count)
+        gen["unlocked"] = unlocked
+        generators.append(gen)
+    # Generators added since the save was written start fresh
+    for static in GENERATORS[len(generators):]:
+        gen = dict(static)
+        gen["count"] = 0
+        gen["cost"] = BigNum(static["base_cost"])
+        gen["unlocked"] = not static["requires"]
+        generators.append(gen)
+    return {
+        "bytes": compact["bytes"],
+        "total_bytes": compact["total_bytes"],
+        "clicks": compact["clicks"],
+        "generators": generators,
+        "last_save": compact["last_save"],
+        "game_start": compact["game_start"],
+        "last_update": compact["last_update"],
+        "milestones": compact["milestones"],
+    }
+
+
+def encode(state):
+    """Encode a full game state dict as a binary save"""
+    payload = zlib.compress(_pack_v3(compact_state(state)), 1)
+    header = HEADER.pack(MAGIC, SCHEMA_VERSION, len(payload), zlib.crc32(payload))
+    return header + payload
+
+
+def decode(data):
+    """Decode a binary or legacy JSON save into a full game state dict"""
+    if not data.startswith(MAGIC):
+        try:
+            state = json.loads(data.decode('utf-8'))
+        except (UnicodeDecodeError, ValueError) as e:
+            raise SaveFormatError(f"Unreadable save data: {e}")
+        if not isinstance(state, dict) or not state:
+            raise SaveFormatError("Save data is empty")
+        # JSON written by convert() is tagged with its schema; untagged JSON
+        # is a legacy save from before the binary format
+        if "schema" in state:
+            return expand_state(compact_state(state))
+        return expand_state(migrate(state, 0))
+
+    if len(data) < HEADER.size:
+        raise SaveFormatError("Save header is truncated")
+    _, version, length, checksum = HEADER.unpack_from(data, 0)
+    payload = data[HEADER.size:]
+    if len(payload) != length or zlib.crc32(payload) != checksum:
+        raise SaveFormatError("Save checksum does not match")
+    if version not in PAYLOAD_DECODERS:
+        raise SaveFormatError(f"Unknown save schema {version}")
+    try:
+        compact = PAYLOAD_DECODERS[version](zlib.decompress(payload))
+    except (zlib.error, struct.error) as e:
+        raise SaveFormatError(f"Corrupt save payload: {e}")
+    return expand_state(migrate(compact, version))
+
+
+def convert(source, destination):
+    """Convert a save file between the binary and JSON formats
+
+    The output format follows the destination extension: .json writes the
+    full JSON game state tagged with its schema, anything else writes the
+    binary format.
+    """
+    with open(source, 'rb') as f:
+        state = decode(f.read())
+    if destination.endswith(".json"):
+        tagged = dict(state, schema=SCHEMA_VERSION)
+        data = json.dumps(tagged, indent=2, default=json_default).encode('utf-8')
+    else:
+        data = encode(state)
+    with open(destination, 'wb') as f:
+        f.write(data)
+    return state
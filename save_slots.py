@@ -0,0 +1,184 @@
+"""Save slots in a SQLite database, with summary columns for fast listing
+
+Each slot stores the binary save (save_format.encode) next to a few
+summary columns, so a slot list is read from the table without decoding
+any save. The database runs in WAL mode so reads never wait for a write.
+"""
+
+import json
+import sqlite3
+import threading
+
+from bignum import BigNum
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS slots (
+    name TEXT PRIMARY KEY,
+    total_bytes_log10 REAL NOT NULL,
+    total_bytes TEXT NOT NULL,
+    play_seconds REAL NOT NULL,
+    last_save REAL NOT NULL,
+    generator_counts TEXT NOT NULL,
+    state BLOB NOT NULL,
+    journal_seq INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS slots_by_last_save ON slots (last_save DESC);
+CREATE INDEX IF NOT EXISTS slots_by_total_bytes ON slots (total_bytes_log10 DESC);
+CREATE TABLE IF NOT EXISTS snapshots (
+    slot TEXT NOT NULL,
+    time REAL NOT NULL,
+    journal_seq INTEGER NOT NULL,
+    state BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_by_time ON snapshots (slot, time DESC);
+"""
+SUMMARY_COLUMNS = ("name", "total_bytes", "play_seconds", "last_save", "generator_counts")
+MAX_NAME_LENGTH = 64
+# Snapshots kept per slot for rewinding; one per save, so about two hours of autosaves
+SNAPSHOT_RETENTION = 120
+# Orders a slot list can be sorted in
+SLOT_ORDERS = {
+    "last_save": "last_save DESC",
+    "total_bytes": "total_bytes_log10 DESC",
+    "name": "name",
+}
+
+
+class SlotError(ValueError):
+    """Raised for an unknown, duplicate or invalid slot name"""
+
+
+def summarize(state):
+    """Summary columns of a full game state, as stored next to its save"""
+    total_bytes = BigNum.from_json(state.get("total_bytes", 0))
+    last_save = state.get("last_save", 0)
+    return {
+        "time": state.get("last_update", last_save),
+        "total_bytes_log10": max(total_bytes.log10(), -1.0),
+        "total_bytes": json.dumps(total_bytes.to_json()),
+        "play_seconds": max(0.0, (last_save - state.get("game_start", last_save)) / 1000),
+        "last_save": last_save,
+        "generator_counts": json.dumps([gen.get("count", 0) for gen in state.get("generators", [])]),
+    }
+
+
+def check_name(name):
+    if not isinstance(name, str) or not name.strip() or len(name) > MAX_NAME_LENGTH:
+        raise SlotError(f"Slot names must be 1 to {MAX_NAME_LENGTH} characters")
+    return name.strip()
+
+
+class SlotStore:
+    """One shared SQLite connection to the save slot database
+
+    The connection is used from the GUI thread for reads and from the save
+    writer thread for writes, one statement at a time under a lock.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # Sync every commit, as the atomic file writes did
+        self._db.execute("PRAGMA synchronous=FULL")
+        self._db.executescript(SCHEMA)
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(slots)")]
+        if "journal_seq" not in columns:
+            # Databases from before the event journal
+            self._db.execute("ALTER TABLE slots ADD COLUMN journal_seq INTEGER NOT NULL DEFAULT 0")
+
+    def write(self, name, data, summary, journal_seq=0):
+        """Insert or replace a slot's save and summary and keep it as a snapshot
+
+        journal_seq is the last journal record the save includes. Snapshots
+        beyond SNAPSHOT_RETENTION are dropped in the same transaction.
+        """
+        blob = sqlite3.Binary(data)
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO slots (name, total_bytes_log10, total_bytes, play_seconds,"
+                    " last_save, generator_counts, state, journal_seq) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (name, summary["total_bytes_log10"], summary["total_bytes"], summary["play_seconds"],
+                     summary["last_save"], summary["generator_counts"], blob, journal_seq))
+                self._db.execute("INSERT INTO snapshots (slot, time, journal_seq, state) VALUES (?, ?, ?, ?)",
+                                 (name, summary["time"], journal_seq, blob))
+                self._db.execute(
+                    "DELETE FROM snapshots WHERE slot = ? AND rowid NOT IN (SELECT rowid FROM snapshots"
+                    " WHERE slot = ? ORDER BY time DESC, rowid DESC LIMIT ?)", (name, name, SNAPSHOT_RETENTION))
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def read(self, name):
+        """(binary save, journal_seq) of a slot, or None if there is no such slot"""
+        with self._lock:
+            row = self._db.execute("SELECT state, journal_seq FROM slots WHERE name = ?",
+                                   (name,)).fetchone()
+        return None if row is None else (bytes(row[0]), row[1])
+
+    def snapshot_before(self, name, time):
+        """(binary save, journal_seq) of the newest snapshot taken at or before time, or None"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT state, journal_seq FROM snapshots WHERE slot = ? AND time <= ?"
+                " ORDER BY time DESC, rowid DESC LIMIT 1", (name, time)).fetchone()
+        return None if row is None else (bytes(row[0]), row[1])
+
+    def oldest_snapshot(self, name):
+        """(time, journal_seq) of the oldest snapshot kept for a slot, or None"""
+        with self._lock:
+            return self._db.execute("SELECT time, journal_seq FROM snapshots WHERE slot = ?"
+                                    " ORDER BY time, rowid LIMIT 1", (name,)).fetchone()
+
+    def list(self, order="last_save"):
+        """Summaries of every slot, most recently saved first by default"""
+        if order not in SLOT_ORDERS:
+            raise SlotError(f"Unknown slot order {order!r}; choose from {', '.join(SLOT_ORDERS)}")
+        with self._lock:
+            rows = self._db.execute(f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM slots"
+                                    f" ORDER BY {SLOT_ORDERS[order]}").fetchall()
+        slots = []
+        for row in rows:
+            slot = dict(zip(SUMMARY_COLUMNS, row))
+            slot["total_bytes"] = json.loads(slot["total_bytes"])
+            slot["generator_counts"] = json.loads(slot["generator_counts"])
+            slots.append(slot)
+        return slots
+
+    def latest(self):
+        """Name of the most recently saved slot, or None if there are none"""
+        with self._lock:
+            row = self._db.execute("SELECT name FROM slots ORDER BY last_save DESC LIMIT 1").fetchone()
+        return None if row is None else row[0]
+
+    def delete(self, name):
+        with self._lock:
+            deleted = self._db.execute("DELETE FROM slots WHERE name = ?", (name,)).rowcount
+            self._db.execute("DELETE FROM snapshots WHERE slot = ?", (name,))
+        if not deleted:
+            raise SlotError(f"No save slot named {name!r}")
+
+    def clone(self, source, target):
+        """Copy a slot under a new name without decoding it"""
+        target = check_name(target)
+        with self._lock:
+            try:
+                copied = self._db.execute(
+                    "INSERT INTO slots (name, total_bytes_log10, total_bytes, play_seconds, last_save,"
+                    " generator_counts, state, journal_seq) SELECT ?, total_bytes_log10, total_bytes,"
+                    " play_seconds, last_save, generator_counts, state, journal_seq FROM slots"
+                    " WHERE name = ?",
+                    (target, source)).rowcount
+            except sqlite3.IntegrityError:
+                raise SlotError(f"A save slot named {target!r} already exists")
+        if not copied:
+            raise SlotError(f"No save slot named {source!r}")
+        return target
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,181 @@
+"""Background save writer with request coalescing and atomic file replacement"""
+
+import os
+import threading
+import time
+
+
+def atomic_write(path, data, backup_path=None):
+    """Write data through a fsynced temp file and rename it over path"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+    # Keep the previous good file around until the new one is in place
+    if backup_path and os.path.exists(path):
+        os.replace(path, backup_path)
+    os.replace(tmp_path, path)
+    fsync_directory(os.path.dirname(os.path.abspath(path)))
+
+
+def fsync_directory(directory):
+    """Flush a directory entry so a rename survives a crash (POSIX only)"""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class SaveWriter:
+    """Worker thread that writes only the newest queued save state
+
+    Requests submitted while a write is in progress are merged: the latest
+    payload for a key replaces any older one that has not been written yet,
+    and every merged request is completed by the writes that follow.
+
+    By default payloads are written atomically to path; write(data, key)
+    replaces that, e.g. to store each key in its own save slot.
+    """
+
+    def __init__(self, path, backup_path=None, encode=None, write=None):
+        self.path = path
+        self.backup_path = backup_path
+        self.encode = encode or (lambda payload: payload.encode('utf-8'))
+        self.write = write or (lambda data, key: atomic_write(self.path, data, self.backup_path))
+
+        self._cond = threading.Condition()
+        self._pending = {}
+        self._waiters = []
+        self._next_ticket = 1
+        self._busy = False
+        self._closed = False
+
+        self._requests = 0
+        self._writes = 0
+        self._failures = 0
+        self._coalesced = 0
+        self._last_write_ms = 0.0
+        self._max_write_ms = 0.0
+        self._total_write_ms = 0.0
+        self._last_batch = 0
+        self._last_error = ""
+
+        self._thread = threading.Thread(target=self._run, name="SaveWriter", daemon=True)
+        self._thread.start()
+
+    def submit(self, payload, callback=None, key=None):
+        """Queue a payload for writing under key and return its ticket id
+
+        callback(ticket, ok, message) is called from the writer thread once
+        the write that includes this request has finished.
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Save writer is closed")
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            self._requests += 1
+            self._pending[key] = payload
+            self._waiters.append((ticket, callback))
+            self._cond.notify_all()
+        return ticket
+
+    def flush(self, timeout=None):
+        """Block until every queued request has been written"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._waiters or self._busy:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout=None):
+        """Write any queued state and stop the worker thread"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def stats(self):
+        """Return queue depth and write timing statistics"""
+        with self._cond:
+            return {
+                "queue_depth": len(self._waiters),
+                "busy": self._busy,
+                "requests": self._requests,
+                "writes": self._writes,
+                "coalesced": self._coalesced,
+                "failures": self._failures,
+                "last_batch": self._last_batch,
+                "last_write_ms": round(self._last_write_ms, 3),
+                "max_write_ms": round(self._max_write_ms, 3),
+                "avg_write_ms": round(self._total_write_ms / self._writes, 3) if self._writes else 0.0,
+                "last_error": self._last_error,
+            }
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._waiters and not self._closed:
+                    self._cond.wait()
+                if not self._waiters:
+                    self._cond.notify_all()
+                    return
+                pending = self._pending
+                waiters = self._waiters
+                self._pending = {}
+                self._waiters = []
+                self._busy = True
+
+            start = time.perf_counter()
+            try:
+                for key, payload in pending.items():
+                    self.write(self.encode(payload), key)
+                ok, message = True, "Game saved successfully"
+            except Exception as e:
+                ok, message = False, f"Error saving game: {str(e)}"
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+            with self._cond:
+                self._busy = False
+                self._last_batch = len(waiters)
+                self._coalesced += len(waiters) - len(pending)
+                if ok:
+                    self._writes += 1
+                    self._last_write_ms = elapsed_ms
+                    self._max_write_ms = max(self._max_write_ms, elapsed_ms)
+                    self._total_write_ms += elapsed_ms
+                else:
+                    self._failures += 1
+                    self._last_error = message
+                self._cond.notify_all()
+
+            for ticket, callback in waiters:
+                if callback is not None:
+                    callback(ticket, ok, message)
+
+
+def read_with_fallback(path, backup_path=None, decode=None):
+    """Read the save file, falling back to the backup if it is missing or invalid"""
+    decode = decode or (lambda data: data.decode('utf-8'))
+    last_error = None
+    for candidate in (path, backup_path):
+        if not candidate or not os.path.exists(candidate):
+            continue
+        try:
+            with open(candidate, 'rb') as f:
+                return decode(f.read())
+        except Exception as e:
+            last_error = e
+    if last_error is not None:
+        raise last_error
+    return None
@@ -0,0 +1,361 @@
+"""Game session shared by the web and native front ends
+
+A GameSession owns the engine, its tick timer and the save path, so both
+front ends play the same rules and read and write the same save files.
+Input goes through the session so it is recorded in the slot's journal.
+"""
+
+import hashlib
+import json
+import math
+import os
+import time
+
+from PyQt6.QtCore import QObject, QTimer, Qt, pyqtSignal
+
+import save_format
+from engine import GameEngine, now_ms
+from journal import (Journal, JournalError, OP_BUY, OP_CLICK, OP_NEW_GAME, OP_OFFLINE,
+                     OP_SET_BUY_AMOUNT, replay)
+from offline import apply_offline_progress, OFFLINE_EFFICIENCY, OFFLINE_CAP_SECONDS
+from recording import Recorder
+from save_slots import SlotError, SlotStore, check_name, summarize
+from save_writer import SaveWriter, read_with_fallback
+from telemetry import Telemetry
+
+VERSION = "0.1.0"  # Version constant
+# Slot a new or imported game is saved in
+DEFAULT_SLOT = "default"
+JOURNAL_DIRECTORY = "clicker_journal"
+# Most clicks one click operation may carry: the page's largest exact integer
+MAX_CLICK_COUNT = 2 ** 53 - 1
+
+
+class StartupProfile:
+    """Startup milestones in milliseconds since QApplication creation"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.marks = {}
+
+    def mark(self, name):
+        """Record the first time a milestone is reached"""
+        if name not in self.marks:
+            self.marks[name] = (time.perf_counter() - self.start) * 1000
+
+    def report(self):
+        """Return the milestones as printable lines"""
+        return "\n".join(f"{name:<16} {ms:9.1f} ms" for name, ms in self.marks.items())
+
+
+class GameSession(QObject):
+    """The running game: engine, fixed-timestep ticking, saving and loading"""
+
+    # Emitted on the GUI thread once the write covering a save ticket is done
+    save_finished = pyqtSignal(int, str)
+    # Carries writer thread completions over to the GUI thread
+    _save_written = pyqtSignal(int, str)
+    # Emitted after the engine advanced, on every tick and on restore
+    ticked = pyqtSignal()
+
+    def __init__(self, parent=None, clock=now_ms):
+        super().__init__(parent)
+        # Milliseconds since the epoch; replays pass a clock they control
+        self.clock = clock
+        self.save_database = "clicker_saves.db"
+        self.slots = SlotStore(self.save_database)
+        # Single-file saves from before save slots are imported on first run
+        self.save_file = "clicker_save.dat"
+        self.backup_file = self.save_file + ".bak"
+        self.legacy_save_file = "clicker_save.json"
+        # Saves that could not be read, reported by the next load
+        self.load_errors = []
+        self.import_save_files()
+        # The slot the game is loaded from and saved to
+        self.slot = self.slots.latest() or DEFAULT_SLOT
+        self.journal = self.open_journal(self.slot)
+        self.save_writer = SaveWriter(self.save_database, encode=self._encode_save,
+                                      write=self._write_slot)
+        self.offline_efficiency = OFFLINE_EFFICIENCY
+        self.offline_cap_seconds = OFFLINE_CAP_SECONDS
+        self.offline_summary = None
+        self.telemetry = Telemetry()
+        self.telemetry_enabled = False
+        # Input is recorded to record_path from the next load, see start_recording
+        self.record_path = None
+        self.recorder = None
+        # Authoritative game state, advanced by a fixed-timestep timer
+        self.engine = GameEngine(now=self.clock())
+        self.tick_timer = QTimer(self)
+        self.tick_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.tick_timer.setInterval(self.engine.tick_ms)
+        self.tick_timer.timeout.connect(self.tick)
+        # Whether a game is loaded and the window is on screen; ticking
+        # only runs while both are true
+        self.running = False
+        self.window_active = True
+        self._save_written.connect(self.save_finished, Qt.ConnectionType.QueuedConnection)
+
+    def submit(self, game_state):
+        """Queue a full game state (dict or JSON) for the background writer
+
+        The save becomes a snapshot covering every journal record so far.
+        """
+        return self.save_writer.submit((game_state, self.journal.seq), self._on_save_written,
+                                       key=self.slot)
+
+    def _on_save_written(self, ticket, ok, message):
+        """Forward a finished write from the writer thread"""
+        self._save_written.emit(ticket, message)
+
+    def _encode_save(self, payload):
+        """Encode a game state (dict or JSON), its slot summary and journal position (runs on the writer thread)"""
+        game_state, journal_seq = payload
+        if isinstance(game_state, str):
+            game_state = json.loads(game_state)
+        return save_format.encode(game_state), summarize(game_state), journal_seq
+
+    def _write_slot(self, encoded, slot):
+        """Store a save in its slot, then compact the slot's journal (runs on the writer thread)"""
+        self.slots.write(slot, *encoded)
+        journal = self.journal
+        if journal.path == self.journal_path(slot):
+            self.compact_journal(journal, slot)
+
+    def import_save_files(self):
+        """Copy a single-file save into the default slot if there are no slots yet"""
+        if self.slots.latest() is not None:
+            return
+        try:
+            saved_state = read_with_fallback(self.save_file, self.backup_file, save_format.decode)
+            if saved_state is None:
+                saved_state = read_with_fallback(self.legacy_save_file, decode=save_format.decode)
+        except Exception as e:
+            self.load_errors.append(f"Could not import {self.save_file}: {e}")
+            return
+        if saved_state:
+            self.slots.write(DEFAULT_SLOT, save_format.encode(saved_state), summarize(saved_state))
+
+    def journal_path(self, slot):
+        # Slot names may hold any character, so files are named by a hash
+        digest = hashlib.sha1(slot.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(JOURNAL_DIRECTORY, digest + ".journal")
+
+    def open_journal(self, slot):
+        os.makedirs(JOURNAL_DIRECTORY, exist_ok=True)
+        saved = self.slots.read(slot)
+        return Journal(self.journal_path(slot), saved[1] if saved else 0)
+
+    def compact_journal(self, journal, slot):
+        """Drop journal records older than every kept snapshot once the journal has grown large"""
+        if not journal.needs_compaction():
+            return
+        oldest = self.slots.oldest_snapshot(slot)
+        if oldest is not None:
+            journal.compact(oldest[1])
+
+    def read_save(self):
+        """Read the current slot's save as (state, journal_seq); (None, 0) if there is none"""
+        try:
+            self.save_writer.flush()
+            saved = self.slots.read(self.slot)
+            return (None, 0) if saved is None else (save_format.decode(saved[0]), saved[1])
+        except Exception as e:
+            self.load_errors.append(f"Could not read save slot {self.slot!r}, starting a new game: {e}")
+            return None, 0
+
+    def take_load_errors(self):
+        """Messages for the saves that could not be read since the last call"""
+        errors, self.load_errors = self.load_errors, []
+        return errors
+
+    def list_slots(self, order="last_save"):
+        """Summaries of every save slot, marking the one in use"""
+        slots = self.slots.list(order)
+        for slot in slots:
+            slot["current"] = slot["name"] == self.slot
+        return slots
+
+    def load_slot(self, name):
+        """Save the current game, then switch to a slot; a new slot starts a new game"""
+        name = check_name(name)
+        if self.running:
+            self.save()
+        self.journal.close()
+        self.slot = name
+        self.journal = self.open_journal(name)
+        return self.load()
+
+    def delete_slot(self, name):
+        if name == self.slot:
+            raise SlotError("The save slot in use cannot be deleted")
+        self.save_writer.flush()
+        self.slots.delete(name)
+        Journal(self.journal_path(name)).delete()
+
+    def clone_slot(self, source, target):
+        """Copy a save slot under a new name and return the name"""
+        self.save_writer.flush()
+        return self.slots.clone(source, target)
+
+    def load(self):
+        """Load the save into the engine and start ticking; returns whether a save was found
+
+        Journal records written after the save, e.g. before a crash, are
+        replayed onto it before offline progress is credited. The credit is
+        journaled and saved right away, so neither crash recovery nor a
+        rewind ticks through the time the game was closed.
+        """
+        # A recording covers one continuous game
+        self.stop_recording()
+        saved_state, journal_seq = self.read_save()
+        self.offline_summary = None
+        if saved_state is not None:
+            self.engine.load_state(saved_state)
+            if replay(self.engine, self.journal.records(journal_seq)):
+                saved_state = self.engine.to_state()
+            closed_at = self.engine.last_update
+            self.offline_summary = apply_offline_progress(
+                saved_state, self.clock(), efficiency=self.offline_efficiency,
+                cap_seconds=self.offline_cap_seconds)
+            self.engine.load_state(saved_state)
+            summary = self.offline_summary
+            self._record(OP_OFFLINE, round(summary["credited_seconds"] * summary["efficiency"] * 1000),
+                         math.floor(closed_at))
+            self.save()
+        else:
+            self.engine.reset(self.clock())
+            # A first snapshot, so the journal can be replayed after a crash
+            self.save()
+        self.running = True
+        if self.window_active:
+            self.tick_timer.start()
+        if self.record_path:
+            self.start_recording(self.record_path)
+            self.record_path = None
+        return saved_state is not None
+
+    def save(self):
+        """Queue the engine state for the background writer and return its ticket"""
+        # Catch up first in case ticking is paused
+        self.engine.advance(self.clock())
+        self.engine.last_save = self.clock()
+        return self.submit(self.engine.to_state())
+
+    def _record(self, op, a=0, b=0):
+        """Append an input event to the journal and to the recording, if any"""
+        self.journal.append(self.engine.last_update, op, a, b)
+        if self.recorder is not None:
+            self.recorder.append(self.engine.last_update, op, a, b)
+
+    def click(self, count=1):
+        """Register count clicks; count comes from the page, so it is checked first"""
+        if isinstance(count, bool) or not isinstance(count, int) or not 0 < count <= MAX_CLICK_COUNT:
+            raise ValueError(f"Click count must be a positive integer, not {count!r}")
+        self.engine.click(count)
+        self._record(OP_CLICK, count)
+
+    def buy(self, index):
+        """Buy the selected amount of a generator; returns whether it was bought
+
+        index comes from the page, so it is checked first.
+        """
+        if isinstance(index, bool) or not isinstance(index, int) or not 0 <= index < len(self.engine.catalog):
+            raise ValueError(f"Generator index must be an integer from 0 to {len(self.engine.catalog) - 1}, not {index!r}")
+        amount = self.engine.purchase_amount(index)
+        if not self.engine.buy(index):
+            return False
+        self._record(OP_BUY, index, amount)
+        return True
+
+    def set_buy_amount(self, amount):
+        self.engine.set_buy_amount(amount)
+        self._record(OP_SET_BUY_AMOUNT, 0 if amount == "max" else amount)
+
+    def new_game(self):
+        """Replace the engine state with a new game"""
+        self.engine.reset(self.clock())
+        self._record(OP_NEW_GAME)
+        self.offline_summary = None
+
+    def start_recording(self, path):
+        """Record input events from the current state on to a file (recording.py)"""
+        self.stop_recording()
+        self.engine.advance(self.clock())
+        self.recorder = Recorder(path, self.engine.to_state())
+        return path
+
+    def stop_recording(self):
+        """Finish the recording with the current state; returns its summary, or None"""
+        if self.recorder is None:
+            return None
+        self.engine.advance(self.clock())
+        summary = self.recorder.close(self.engine.to_state())
+        self.recorder = None
+        return summary
+
+    def history(self):
+        """Earliest and latest engine times the game can be rewound to"""
+        oldest = self.slots.oldest_snapshot(self.slot)
+        return {"earliest": oldest[0] if oldest else self.engine.last_update,
+                "latest": self.engine.last_update}
+
+    def rewind(self, time):
+        """Restore the game as it was at an earlier engine time
+
+        The newest snapshot before that time is replayed up to it from the
+        journal. The restored game continues from now, without production
+        for the time skipped, and is saved right away so it is also what a
+        crash recovers.
+        """
+        self.stop_recording()
+        self.save_writer.flush()
+        snapshot = self.slots.snapshot_before(self.slot, time)
+        if snapshot is None:
+            raise JournalError("The game cannot be rewound to before its oldest snapshot")
+        state, journal_seq = snapshot
+        self.engine.load_state(save_format.decode(state))
+        replay(self.engine, self.journal.records(journal_seq), until=time)
+        self.engine.last_update = self.clock()
+        self.offline_summary = None
+        return self.save()
+
+    def tick(self):
+        """Run the engine steps that are due"""
+        start = time.perf_counter()
+        self.engine.advance(self.clock())
+        if self.telemetry_enabled:
+            self.telemetry.record("engine.tick", [(time.perf_counter() - start) * 1000])
+        self.ticked.emit()
+
+    def set_telemetry_enabled(self, enabled):
+        """Turn engine tick timings on or off, e.g. from the page's F3 toggle"""
+        self.telemetry_enabled = bool(enabled)
+
+    def set_window_active(self, active):
+        """Pause the engine while the window is hidden or minimized
+
+        Production is constant between purchases, so on restore the time
+        spent hidden is credited by a single engine.advance call.
+        """
+        if active == self.window_active:
+            return
+        self.window_active = active
+        if not self.running:
+            return
+        if active:
+            self.engine.advance(self.clock())
+            self.tick_timer.start()
+            self.ticked.emit()
+        else:
+            self.tick_timer.stop()
+            self.save()
+
+    def shutdown(self):
+        """Stop the engine and write any pending save before the application exits"""
+        self.running = False
+        self.tick_timer.stop()
+        self.stop_recording()
+        self.save_writer.close()
+        self.slots.close()
+        self.journal.close()
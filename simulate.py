@@ -0,0 +1,239 @@
+"""Headless NumPy simulator for balancing generator costs and production
+
+Each game follows the rules of engine.py with a purchase policy and a
+clicking rate. Production is constant between purchases, so instead of
+ticking, every game jumps straight to the moment it can afford its next
+purchase; the work per game is proportional to the number of purchases,
+not to the simulated time. Games are advanced together as rows of NumPy
+arrays, and large runs are split over a process pool.
+"""
+
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from game_data import CATALOG, COST_GROWTH, EXACT_COST_LIMIT, Catalog
+
+
+def _cheapest(cost, base_production, index):
+    return cost
+
+
+def _payback(cost, base_production, index):
+    # Seconds of the generator's own production needed to repay its cost
+    return cost / base_production
+
+
+def _newest(cost, base_production, index):
+    return np.broadcast_to(-index, cost.shape)
+
+
+# Purchase policies: each game buys the unlocked generator with the lowest
+# score as soon as it can afford it
+POLICIES = {
+    "cheapest": _cheapest,
+    "payback": _payback,
+    "newest": _newest,
+}
+
+
+def unit_costs(base_costs, counts):
+    """Vectorized game_data.generator_cost as plain doubles"""
+    cost = base_costs * np.power(COST_GROWTH, counts)
+    return np.where(cost < EXACT_COST_LIMIT, np.ceil(cost), cost)
+
+
+def unlock_rules_met(counts, rules):
+    """Boolean (games, generators) array of generators whose requirements are met"""
+    required, needed, owner = rules
+    failed = (counts[:, required] < needed).astype(np.int64)
+    # Count failed requirements per generator; none failed means unlocked
+    return failed @ owner == 0
+
+
+def policy_blocks(policy_games):
+    """Slices of the game rows played by each policy, in order"""
+    blocks = []
+    start = 0
+    for games in policy_games:
+        blocks.append(slice(start, start + games))
+        start += games
+    return blocks
+
+
+def simulate_chunk(policy_names, policy_games, hours, clicks_per_second,
+                   sample_minutes, seed, catalog=CATALOG):
+    """Simulate policy_games[i] games with policy i and return the raw results
+
+    Returns (unlock_seconds, curve) where unlock_seconds[g, i] is when game g
+    unlocked generator i (inf if never) and curve[g, s] is the game's total
+    bytes at the s-th sample time.
+    """
+    rng = np.random.default_rng(seed)
+    catalog = catalog if isinstance(catalog, Catalog) else Catalog(catalog)
+    size = len(catalog)
+    games = sum(policy_games)
+    blocks = policy_blocks(policy_games)
+    horizon = hours * 3600.0
+    base_costs = np.array([gen["base_cost"] for gen in catalog], dtype=float)
+    base_production = np.array([gen["base_production"] * gen["multiplier"] for gen in catalog], dtype=float)
+    # One column per unlock requirement: the generator counted, the count
+    # needed and a one-hot row of the generator it unlocks
+    needs = [(index, required, count) for index, reqs in enumerate(catalog.requirements)
+             for required, count in reqs]
+    owner = np.zeros((len(needs), size), dtype=np.int64)
+    owner[np.arange(len(needs)), [need[0] for need in needs]] = 1
+    rules = (np.array([need[1] for need in needs], dtype=np.int64),
+             np.array([need[2] for need in needs], dtype=np.int64), owner)
+    click = catalog.click_power
+    index = np.arange(size, dtype=float)
+    rows = np.arange(games)
+
+    counts = np.zeros((games, size), dtype=np.int64)
+    unlocked = unlock_rules_met(counts, rules)
+    cost = np.broadcast_to(base_costs, (games, size)).copy()
+    unlock_seconds = np.where(unlocked, 0.0, np.inf)
+    bytes_ = np.zeros(games)
+    total = np.zeros(games)
+    now = np.zeros(games)
+    # Each game clicks at its own steady rate around clicks_per_second
+    clicks = clicks_per_second * rng.uniform(0.5, 1.5, games)
+    production = np.zeros(games)
+
+    sample_times = np.arange(0.0, horizon + 1e-9, sample_minutes * 60.0)
+    curve = np.zeros((games, len(sample_times)))
+    next_sample = np.zeros(games, dtype=np.int64)
+    score = np.empty((games, size))
+
+    while True:
+        click_power = click["base"] + counts[:, click["generator"]] // click["every"] * click["bonus"]
+        rate = production + clicks * click_power
+        for name, block in zip(policy_names, blocks):
+            score[block] = POLICIES[name](cost[block], base_production, index)
+        target = np.argmin(np.where(unlocked, score, np.inf), axis=1)
+        target_cost = cost[rows, target]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            wait = np.where(bytes_ >= target_cost, 0.0, (target_cost - bytes_) / rate)
+        wait[np.isnan(wait)] = np.inf
+        buys = (now + wait <= horizon) & (now < horizon)
+        until = np.minimum(now + wait, horizon)
+
+        # Production is linear between purchases, so samples are exact
+        while True:
+            due = next_sample < len(sample_times)
+            due[due] = sample_times[next_sample[due]] <= until[due]
+            if not due.any():
+                break
+            curve[due, next_sample[due]] = (total[due] + rate[due] *
+                                            (sample_times[next_sample[due]] - now[due]))
+            next_sample[due] += 1
+
+        earned = rate * (until - now)
+        bytes_ += earned
+        total += earned
+        now = until
+        if not buys.any():
+            break
+
+        bought = rows[buys]
+        which = target[buys]
+        bytes_[bought] = np.maximum(bytes_[bought] - target_cost[buys], 0.0)
+        counts[bought, which] += 1
+        cost[bought, which] = unit_costs(base_costs[which], counts[bought, which])
+        production[bought] += base_production[which]
+        newly = ~unlocked & unlock_rules_met(counts, rules)
+        if newly.any():
+            unlocked |= newly
+            unlock_seconds = np.where(newly, now[:, None], unlock_seconds)
+
+    return unlock_seconds, curve
+
+
+def run_simulation(policy_names, games, hours, clicks_per_second=2.0, sample_minutes=60,
+                   workers=None, seed=0, catalog=CATALOG):
+    """Simulate games spread evenly over the policies, in parallel
+
+    Returns a report with, per policy, the median time to unlock each
+    generator and the 10th/50th/90th percentile total bytes over time.
+    """
+    for name in policy_names:
+        if name not in POLICIES:
+            raise ValueError(f"Unknown policy {name!r}; choose from {', '.join(POLICIES)}")
+    if games < 1:
+        raise ValueError(f"At least one game must be simulated, not {games}")
+    workers = workers or os.cpu_count() or 1
+    # The games left over by an uneven split go to the first policies, and
+    # policies left without a game are not played
+    policy_games = [games // len(policy_names) + (slot < games % len(policy_names))
+                    for slot in range(len(policy_names))]
+    policy_names = [name for name, count in zip(policy_names, policy_games) if count]
+    policy_games = [count for count in policy_games if count]
+    # A few chunks per worker keep the pool busy when chunks finish unevenly
+    chunks = min(max(policy_games), workers * 4) if workers > 1 else 1
+    chunk_games = [[count // chunks + (i < count % chunks) for count in policy_games]
+                   for i in range(chunks)]
+
+    start = time.perf_counter()
+    args = [(policy_names, sizes, hours, clicks_per_second, sample_minutes, seed + i, catalog)
+            for i, sizes in enumerate(chunk_games)]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(simulate_chunk, *zip(*args)))
+    else:
+        results = [simulate_chunk(*chunk) for chunk in args]
+    elapsed = time.perf_counter() - start
+
+    report = {
+        "games": sum(policy_games),
+        "hours": hours,
+        "clicks_per_second": clicks_per_second,
+        "elapsed_seconds": elapsed,
+        "sample_hours": [minute / 60 for minute in range(0, int(hours * 60) + 1, sample_minutes)],
+        "generators": [gen["name"] for gen in catalog],
+        "policies": {},
+    }
+    for slot, name in enumerate(policy_names):
+        unlocks = []
+        curves = []
+        for (unlock_seconds, curve), sizes in zip(results, chunk_games):
+            block = policy_blocks(sizes)[slot]
+            unlocks.append(unlock_seconds[block])
+            curves.append(curve[block])
+        unlocks = np.concatenate(unlocks)
+        curves = np.concatenate(curves)
+        median_unlock = np.median(unlocks, axis=0) / 3600
+        report["policies"][name] = {
+            "unlock_hours_median": [None if math.isinf(h) else float(h) for h in median_unlock],
+            "unlocked_fraction": (np.isfinite(unlocks).mean(axis=0)).tolist(),
+            "total_bytes": {
+                f"p{pct}": np.percentile(curves, pct, axis=0).tolist() for pct in (10, 50, 90)
+            },
+        }
+    return report
+
+
+def format_report(report):
+    """Return the report as printable tables"""
+    lines = [f"Simulated {report['games']} games x {report['hours']:g} h "
+             f"in {report['elapsed_seconds']:.2f} s"]
+    policies = list(report["policies"])
+    lines.append("")
+    lines.append("Median time to unlock (hours)")
+    lines.append(f"{'generator':<20}" + "".join(f"{name:>12}" for name in policies))
+    for index, generator in enumerate(report["generators"]):
+        cells = []
+        for name in policies:
+            hours = report["policies"][name]["unlock_hours_median"][index]
+            cells.append(f"{'never':>12}" if hours is None else f"{hours:>12.2f}")
+        lines.append(f"{generator:<20}" + "".join(cells))
+    lines.append("")
+    lines.append("Median total bytes")
+    lines.append(f"{'hour':>6}" + "".join(f"{name:>12}" for name in policies))
+    for sample, hour in enumerate(report["sample_hours"]):
+        cells = "".join(f"{report['policies'][name]['total_bytes']['p50'][sample]:>12.4g}"
+                        for name in policies)
+        lines.append(f"{hour:>6g}{cells}")
+    return "\n".join(lines)
@@ -0,0 +1,194 @@
+"""Read-only local HTTP endpoint that streams game state to dashboards
+
+The GUI thread publishes a small dashboard state (bytes, production,
+generator counts) at most once per interval. Each publish is diffed
+against the previous one (state_sync.py) and encoded once into a
+Server-Sent Events frame that every client is sent as is, so the game
+does the same work for any number of clients. The HTTP server and one
+thread per client run outside the GUI thread and only ever read these
+cached frames.
+
+    GET /state    the latest state as JSON: {"version", "state"}
+    GET /events   an event stream: a "snapshot" event with the full
+                  state, then a "delta" event with a patch per change
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from state_sync import diff
+
+# Least time between two published states, in milliseconds
+PUBLISH_INTERVAL_MS = 1000
+# Delta frames kept for clients that fall behind or reconnect with
+# Last-Event-ID; older clients are sent a fresh snapshot instead
+DELTA_HISTORY = 64
+# Seconds between comments sent to idle streams, to notice closed clients
+KEEPALIVE_SECONDS = 15
+
+
+def dashboard_state(session):
+    """The state streamed to dashboards, taken from the session's engine"""
+    engine = session.engine
+    return {
+        "slot": session.slot,
+        "time": engine.last_update,
+        "bytes": engine.bytes.to_json(),
+        "total_bytes": engine.total_bytes.to_json(),
+        "bytes_per_second": engine.bytes_per_second().to_json(),
+        "clicks": engine.clicks,
+        "generators": engine.counts.tolist(),
+        "milestones": len(engine.milestones.unlocked),
+    }
+
+
+def sse_frame(event, version, data):
+    """Encode one Server-Sent Events frame"""
+    return f"id: {version}\nevent: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode('utf-8')
+
+
+class StateServer:
+    """Cached dashboard state and the HTTP server that streams it"""
+
+    def __init__(self, port=0, host="127.0.0.1", interval_ms=PUBLISH_INTERVAL_MS):
+        self.interval_ms = interval_ms
+        self.version = 0
+        self.clients = 0
+        self.publishes = 0
+        self._state = None
+        self._last_publish = None
+        self._cond = threading.Condition()
+        self._deltas = deque(maxlen=DELTA_HISTORY)
+        self._snapshot_frame = None
+        self._snapshot_body = None
+        self._closed = False
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="StateServer", daemon=True)
+        self._thread.start()
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def attach(self, session):
+        """Publish the session's state after its ticks, rate limited"""
+        session.ticked.connect(lambda: self.maybe_publish(session))
+
+    def maybe_publish(self, session):
+        """Publish the session's state if the last publish is an interval old"""
+        now = time.monotonic()
+        if self._last_publish is not None and (now - self._last_publish) * 1000 < self.interval_ms:
+            return False
+        self._last_publish = now
+        return self.publish(dashboard_state(session))
+
+    def publish(self, state):
+        """Make state the current version; returns whether it changed
+
+        Called from one thread only (the GUI thread); the delta is
+        computed and encoded there once, outside the lock.
+        """
+        patch = diff(self._state, state) if self._state is not None else state
+        if not patch:
+            return False
+        frame = sse_frame("delta", self.version + 1, {"version": self.version + 1, "patch": patch})
+        with self._cond:
+            self._state = state
+            self.version += 1
+            self.publishes += 1
+            self._deltas.append((self.version, frame))
+            self._snapshot_frame = None
+            self._snapshot_body = None
+            self._cond.notify_all()
+        return True
+
+    def snapshot(self):
+        """(version, SSE frame, JSON body) of the current state, encoded once per version"""
+        with self._cond:
+            if self._snapshot_frame is None and self._state is not None:
+                data = {"version": self.version, "state": self._state}
+                self._snapshot_frame = sse_frame("snapshot", self.version, data)
+                self._snapshot_body = json.dumps(data, separators=(',', ':')).encode('utf-8')
+            return self.version, self._snapshot_frame, self._snapshot_body
+
+    def frames_after(self, version, timeout):
+        """Wait up to timeout for versions after version; returns (latest version, frames)
+
+        A client too far behind for the kept deltas gets a snapshot.
+        """
+        with self._cond:
+            if self.version == version and not self._closed:
+                self._cond.wait(timeout)
+            if self._closed or self.version == version:
+                return version, []
+            if version <= self.version and self._deltas and self._deltas[0][0] <= version + 1:
+                return self.version, [frame for seq, frame in self._deltas if seq > version]
+        latest, frame, _ = self.snapshot()
+        return latest, [frame] if frame else []
+
+    def close(self):
+        """Stop serving and end every open stream"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/state":
+                    self.send_state()
+                elif self.path == "/events":
+                    self.send_events()
+                else:
+                    self.send_error(404)
+
+            def send_state(self):
+                _, _, body = server.snapshot()
+                if body is None:
+                    self.send_error(503, "No game loaded yet")
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def send_events(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                # A reconnecting client resumes from the last event it saw
+                try:
+                    version = int(self.headers.get("Last-Event-ID", -1))
+                except ValueError:
+                    version = -1
+                with server._cond:
+                    server.clients += 1
+                try:
+                    while not server._closed:
+                        version, frames = server.frames_after(version, KEEPALIVE_SECONDS)
+                        self.wfile.write(b"".join(frames) if frames else b": keepalive\n\n")
+                        self.wfile.flush()
+                except OSError:
+                    pass
+                finally:
+                    with server._cond:
+                        server.clients -= 1
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,110 @@
+"""Versioned state mirror whose changes are sent to the page as patches
+
+A patch is a JSON object holding only the fields that changed. Lists are
+patched by index ({"3": {"count": 5}}), nested objects field by field, and
+everything else, including {"m", "e"} big numbers, is replaced whole. A
+list that got shorter is replaced whole too. Objects are always merged, so
+a patch cannot remove a key: states must never lose one, and diff() raises
+StateShapeError if they do. The page applies patches with the same rules
+in web/game.js.
+"""
+
+import copy
+
+
+def is_atomic(value):
+    """Big numbers and non-container values are replaced, never merged"""
+    if isinstance(value, dict):
+        return set(value) == {"m", "e"}
+    return not isinstance(value, list)
+
+
+class StateShapeError(ValueError):
+    """A state lost an object key, which a patch cannot express"""
+
+
+def diff(old, new):
+    """Return the patch that turns old into new (empty if equal)
+
+    Keys of old that new does not have are only checked below the top
+    level, where new is the whole value; at the top level new may hold
+    just the fields that changed.
+    """
+    patch = {}
+    if isinstance(new, list):
+        items = ((str(index), value) for index, value in enumerate(new))
+        lookup = (lambda key: old[int(key)] if int(key) < len(old) else None)
+    else:
+        items = new.items()
+        lookup = old.get
+    for key, value in items:
+        before = lookup(key)
+        if (before is None or is_atomic(value) or is_atomic(before) or type(before) is not type(value)
+                or isinstance(value, list) and len(value) < len(before)):
+            if before != value:
+                patch[key] = copy.deepcopy(value)
+        else:
+            if isinstance(value, dict) and any(field not in value for field in before):
+                raise StateShapeError(f"{key!r} lost {sorted(set(before) - set(value))}")
+            nested = diff(before, value)
+            if nested:
+                patch[key] = nested
+    return patch
+
+
+def apply_patch(target, patch):
+    """Apply a patch to target in place"""
+    for key, value in patch.items():
+        if isinstance(target, list):
+            index = int(key)
+            if index >= len(target):
+                target.append(copy.deepcopy(value))
+                continue
+            current = target[index]
+        else:
+            current = target.get(key)
+        if isinstance(value, dict) and current is not None and not is_atomic(current):
+            apply_patch(current, value)
+        elif isinstance(target, list):
+            target[index] = copy.deepcopy(value)
+        else:
+            target[key] = copy.deepcopy(value)
+
+
+class StateMirror:
+    """The state last sent to the page and the version it corresponds to"""
+
+    def __init__(self):
+        self.state = {}
+        self.version = 0
+
+    def reset(self, state):
+        """Replace the mirror with a full snapshot"""
+        self.state = copy.deepcopy(state)
+        self.version += 1
+        return self.version
+
+    def update(self, changes, items=None):
+        """Apply changes to the mirror and return (version, patch)
+
+        items maps the key of a list to {index: entry} for only the entries
+        that may have changed, so the rest of the list is not compared.
+        """
+        patch = diff(self.state, changes)
+        for key, entries in (items or {}).items():
+            current = self.state.get(key)
+            if current is None:
+                patch[key] = copy.deepcopy([entries[index] for index in sorted(entries)])
+                continue
+            nested = diff({str(index): current[index] for index in entries if index < len(current)},
+                          {str(index): entries[index] for index in sorted(entries)})
+            if nested:
+                patch[key] = nested
+        if patch:
+            apply_patch(self.state, patch)
+            self.version += 1
+        return self.version, patch
+
+    def snapshot(self):
+        """Return a copy of the state that later patches will not touch"""
+        return copy.deepcopy(self.state)
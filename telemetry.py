@@ -0,0 +1,101 @@
+"""Fixed-size timing buffers and percentile summaries for in-game telemetry"""
+
+import csv
+import json
+import math
+from array import array
+
+# Samples kept per metric; older samples are overwritten
+RING_SIZE = 4096
+PERCENTILES = (50, 95, 99)
+
+
+class RingBuffer:
+    """Fixed-capacity buffer of floats that overwrites its oldest entries"""
+
+    __slots__ = ("_data", "_index", "_count")
+
+    def __init__(self, size=RING_SIZE):
+        self._data = array('d', bytes(8 * size))
+        self._index = 0
+        self._count = 0
+
+    def append(self, value):
+        self._data[self._index] = value
+        self._index = (self._index + 1) % len(self._data)
+        if self._count < len(self._data):
+            self._count += 1
+
+    def extend(self, values):
+        for value in values:
+            self.append(value)
+
+    def values(self):
+        """Return the stored samples, oldest first"""
+        if self._count < len(self._data):
+            return self._data[:self._count].tolist()
+        return (self._data[self._index:] + self._data[:self._index]).tolist()
+
+    def __len__(self):
+        return self._count
+
+
+def percentile(ordered, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class Telemetry:
+    """Timing samples per metric name, in milliseconds"""
+
+    def __init__(self, size=RING_SIZE):
+        self.size = size
+        self.buffers = {}
+        self.total_samples = 0
+
+    def record(self, name, samples):
+        """Add a batch of samples for one metric"""
+        buffer = self.buffers.get(name)
+        if buffer is None:
+            buffer = self.buffers[name] = RingBuffer(self.size)
+        buffer.extend(samples)
+        self.total_samples += len(samples)
+
+    def record_batch(self, batch):
+        """Add samples from a {name: [ms, ...]} mapping"""
+        for name, samples in batch.items():
+            self.record(name, samples)
+
+    def summary(self):
+        """Return count, mean, max and p50/p95/p99 for every metric"""
+        result = {}
+        for name, buffer in sorted(self.buffers.items()):
+            ordered = sorted(buffer.values())
+            stats = {
+                "count": len(ordered),
+                "mean": sum(ordered) / len(ordered) if ordered else 0.0,
+                "max": ordered[-1] if ordered else 0.0,
+            }
+            for pct in PERCENTILES:
+                stats[f"p{pct}"] = percentile(ordered, pct)
+            result[name] = stats
+        return result
+
+    def dump(self, path):
+        """Write the summary and raw samples as JSON, or the samples as CSV"""
+        if path.endswith(".csv"):
+            with open(path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(["metric", "sample", "ms"])
+                for name, buffer in sorted(self.buffers.items()):
+                    for index, value in enumerate(buffer.values()):
+                        writer.writerow([name, index, f"{value:.4f}"])
+        else:
+            with open(path, 'w') as f:
+                json.dump({
+                    "summary": self.summary(),
+                    "samples": {name: buffer.values() for name, buffer in self.buffers.items()},
+                }, f, indent=2)
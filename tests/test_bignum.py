@@ -0,0 +1,24 @@
+"""BigNum hashes agree with its equality against ints, floats and other BigNums"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bignum import BigNum
+
+
+@pytest.mark.parametrize("value", [0, 5, -3, 2.5, 10**6, 1e15, 10**20, 1.5e300])
+def test_equal_numbers_hash_alike(value):
+    number = BigNum(value)
+    assert number == value
+    assert hash(number) == hash(value)
+    assert {number: True}[value]
+
+
+def test_equal_bignums_hash_alike_past_a_double():
+    assert BigNum(2.5, 400) == BigNum(25, 399)
+    assert hash(BigNum(2.5, 400)) == hash(BigNum(25, 399))
+    assert len({BigNum(2.5, 400), BigNum(2.5, 401)}) == 2
@@ -0,0 +1,82 @@
+"""Bulk purchases cost the same as buying one unit at a time"""
+
+import math
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bignum import BigNum, SMALL_LIMIT
+from game_data import (CATALOG, COST_GROWTH, EXACT_COST_LIMIT, bulk_cost, exact_units, generator_cost,
+                       max_affordable)
+
+# Relative difference allowed once costs are summed as mantissa/exponent numbers
+TOLERANCE = 1e-12
+BASE_COSTS = sorted({gen["base_cost"] for gen in CATALOG} | {1, 7.5, 1e10})
+
+
+def single_units_cost(base_cost, count, amount):
+    total = BigNum(0)
+    for offset in range(amount):
+        total = total + generator_cost(base_cost, count + offset)
+    return total
+
+
+def assert_close(expected, actual):
+    if expected < SMALL_LIMIT:
+        # Whole bytes, summed exactly
+        assert expected == actual, (expected, actual)
+    else:
+        assert abs(expected.log10() - actual.log10()) <= TOLERANCE / math.log(10), (expected, actual)
+
+
+def brute_force_affordable(base_cost, count, bytes_):
+    amount = 0
+    while bulk_cost(base_cost, count, amount + 1) <= bytes_:
+        amount += 1
+    return amount
+
+
+def counts_around_limit(base_cost, rng, cases):
+    """Counts below, across and above the last cost rounded to whole bytes"""
+    split = exact_units(base_cost)
+    return [max(0, split + rng.randint(-60, 60)) for _ in range(cases)] + [0, max(0, split - 1), split]
+
+
+def test_exact_cost_limit_split():
+    for base_cost in BASE_COSTS:
+        split = exact_units(base_cost)
+        if split:
+            assert base_cost * COST_GROWTH ** (split - 1) < EXACT_COST_LIMIT
+        assert base_cost * COST_GROWTH ** split >= EXACT_COST_LIMIT
+
+
+def test_bulk_cost_matches_single_purchases():
+    rng = random.Random(0)
+    for base_cost in BASE_COSTS:
+        for count in counts_around_limit(base_cost, rng, 30):
+            for amount in (0, 1, 2, 10, 100, rng.randint(1, 150)):
+                assert_close(single_units_cost(base_cost, count, amount), bulk_cost(base_cost, count, amount))
+
+
+def test_bulk_cost_rounds_each_unit_up():
+    # 10 * 1.15 = 11.5 and 10 * 1.15**2 = 13.225 round up to 12 and 14
+    assert bulk_cost(10, 0, 3) == BigNum(10 + 12 + 14)
+    assert bulk_cost(10, 1, 2) == BigNum(12 + 14)
+
+
+def test_max_affordable_matches_brute_force():
+    rng = random.Random(1)
+    for base_cost in BASE_COSTS:
+        for count in counts_around_limit(base_cost, rng, 20):
+            for amount in (0, 1, 5, rng.randint(1, 120)):
+                exact = bulk_cost(base_cost, count, amount)
+                for bytes_ in (exact, exact * 0.999, exact * 1.001, exact + 1):
+                    assert max_affordable(base_cost, count, bytes_) == brute_force_affordable(base_cost, count, bytes_)
+
+
+def test_max_affordable_with_no_bytes():
+    assert max_affordable(10, 0, BigNum(0)) == 0
+    assert max_affordable(10, 0, BigNum(9)) == 0
+    assert max_affordable(10, 0, BigNum(10)) == 1
@@ -0,0 +1,138 @@
+"""Crash recovery and rewind across a capped offline gap, journal compaction and input checks"""
+
+import os
+import sqlite3
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from PyQt6.QtCore import QCoreApplication
+
+from bignum import BigNum
+from journal import COMPACT_BYTES, OP_CLICK, RECORD_SIZE, Journal
+from recording import ReplayClock
+from save_slots import SlotStore
+from session import DEFAULT_SLOT, GameSession
+
+DAY_MS = 24 * 60 * 60 * 1000
+CAP_SECONDS = 60
+
+
+@pytest.fixture
+def clock(tmp_path, monkeypatch):
+    # Sessions keep their saves and journals in the working directory
+    monkeypatch.chdir(tmp_path)
+    QCoreApplication.instance() or QCoreApplication([])
+    return ReplayClock(1.7e12)
+
+
+def open_session(clock):
+    session = GameSession(clock=clock)
+    session.offline_cap_seconds = CAP_SECONDS
+    session.window_active = False
+    session.load()
+    return session
+
+
+def crash(session):
+    """Stop a session the way a crash would: the journal stays, nothing more is saved"""
+    session.save_writer.flush()
+    session.journal.close()
+    session.slots.close()
+
+
+def play_then_close(clock):
+    """A game with some production, saved and closed; returns its bytes"""
+    session = open_session(clock)
+    session.click(1000)
+    for _ in range(20):
+        session.buy(0)
+    clock.now += 10_000
+    session.save()
+    bytes_ = session.engine.bytes
+    session.shutdown()
+    return bytes_
+
+
+def test_crash_after_load_recovers_the_capped_credit(clock):
+    closed_bytes = play_then_close(clock)
+    clock.now += DAY_MS
+    session = open_session(clock)
+    production = session.engine.bytes_per_second()
+    assert session.offline_summary["capped"]
+    assert session.engine.bytes == closed_bytes + production * CAP_SECONDS
+    session.click(1)
+    expected = session.engine.to_state()
+    crash(session)
+
+    recovered = open_session(clock)
+    assert recovered.engine.bytes == BigNum.from_json(expected["bytes"])
+    assert recovered.engine.clicks == expected["clicks"]
+    recovered.shutdown()
+
+
+def test_replaying_the_journal_credits_the_gap_once(clock):
+    play_then_close(clock)
+    closed_at = clock.now
+    clock.now += DAY_MS
+    session = open_session(clock)
+    session.click(1)
+    expected = session.engine.bytes
+    crash(session)
+
+    # Lose the snapshot the load saved, so only the journal covers the gap
+    store = SlotStore("clicker_saves.db")
+    state, journal_seq = store.snapshot_before(DEFAULT_SLOT, closed_at)
+    store.close()
+    db = sqlite3.connect("clicker_saves.db")
+    db.execute("UPDATE slots SET state = ?, journal_seq = ?", (state, journal_seq))
+    db.execute("DELETE FROM snapshots WHERE time > ?", (closed_at,))
+    db.commit()
+    db.close()
+
+    recovered = open_session(clock)
+    assert abs(recovered.engine.bytes.log10() - expected.log10()) < 1e-9
+    recovered.shutdown()
+
+
+def test_rewind_into_the_gap_stops_where_the_game_closed(clock):
+    closed_bytes = play_then_close(clock)
+    closed_at = clock.now
+    clock.now += DAY_MS
+    session = open_session(clock)
+    session.rewind(closed_at + DAY_MS / 2)
+    assert session.engine.bytes == closed_bytes
+    session.shutdown()
+
+
+def test_compaction_keeps_appends_made_while_it_runs(tmp_path):
+    journal = Journal(str(tmp_path / "slot.journal"))
+    for i in range(COMPACT_BYTES // RECORD_SIZE + 1):
+        journal.append(i, OP_CLICK, 1)
+    assert journal.needs_compaction()
+    keep_after = journal.seq // 2
+    writer = threading.Thread(target=lambda: [journal.append(i, OP_CLICK, 1) for i in range(2000)])
+    writer.start()
+    journal.compact(keep_after)
+    writer.join()
+    seqs = [record[0] for record in journal.records()]
+    assert seqs == list(range(keep_after + 1, journal.seq + 1))
+    assert journal.size == len(seqs) * RECORD_SIZE
+    # The next compaction waits for the journal to double again
+    assert not journal.needs_compaction()
+    journal.close()
+
+
+@pytest.mark.parametrize("index", [-1, 10**6, 1.0, "0", True, None])
+def test_buy_rejects_bad_indexes_before_the_journal(clock, index):
+    session = open_session(clock)
+    session.click(10**6)
+    seq = session.journal.seq
+    with pytest.raises(ValueError):
+        session.buy(index)
+    assert session.journal.seq == seq
+    assert not any(session.engine.counts)
+    session.shutdown()
@@ -0,0 +1,115 @@
+"""The state streaming endpoint: /state, /events and resuming with Last-Event-ID"""
+
+import http.client
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from state_server import DELTA_HISTORY, StateServer
+from state_sync import apply_patch
+
+
+@pytest.fixture
+def server():
+    server = StateServer(0)
+    yield server
+    server.close()
+
+
+def connect(server):
+    host, port = server.url.rsplit("/", 1)[1].split(":")
+    return http.client.HTTPConnection(host, int(port), timeout=5)
+
+
+def get(server, path, headers=None):
+    connection = connect(server)
+    connection.request("GET", path, headers=headers or {})
+    response = connection.getresponse()
+    return connection, response
+
+
+def read_events(response, count):
+    """The next count events of a stream as (id, event, data) tuples"""
+    events = []
+    fields = {}
+    while len(events) < count:
+        line = response.readline().decode('utf-8').rstrip("\n")
+        if not line:
+            if "data" in fields:
+                events.append((int(fields["id"]), fields["event"], json.loads(fields["data"])))
+            fields = {}
+        elif not line.startswith(":"):
+            name, value = line.split(": ", 1)
+            fields[name] = value
+    return events
+
+
+def state(value):
+    return {"bytes": value, "generators": [value, 0, 0]}
+
+
+def test_state_is_unavailable_until_published(server):
+    connection, response = get(server, "/state")
+    assert response.status == 503
+    connection.close()
+
+
+def test_unknown_paths_are_not_found(server):
+    server.publish(state(1))
+    connection, response = get(server, "/nope")
+    assert response.status == 404
+    connection.close()
+
+
+def test_state_returns_the_latest_version(server):
+    server.publish(state(1))
+    server.publish(state(2))
+    connection, response = get(server, "/state")
+    assert response.status == 200
+    assert json.loads(response.read()) == {"version": 2, "state": state(2)}
+    connection.close()
+
+
+def test_events_rebuild_the_state_from_a_snapshot_and_deltas(server):
+    server.publish(state(1))
+    connection, response = get(server, "/events")
+    assert response.getheader("Content-Type") == "text/event-stream"
+    (version, event, data), = read_events(response, 1)
+    assert (version, event, data) == (1, "snapshot", {"version": 1, "state": state(1)})
+    rebuilt = data["state"]
+    for value in (2, 3, 4):
+        server.publish(state(value))
+        (version, event, data), = read_events(response, 1)
+        assert event == "delta"
+        apply_patch(rebuilt, data["patch"])
+    assert version == server.version == 4
+    assert rebuilt == state(4)
+    connection.close()
+
+
+def test_last_event_id_resumes_with_the_missed_deltas(server):
+    server.publish(state(1))
+    server.publish(state(2))
+    server.publish(state(3))
+    connection, response = get(server, "/events", {"Last-Event-ID": "1"})
+    events = read_events(response, 2)
+    assert [(version, event) for version, event, _ in events] == [(2, "delta"), (3, "delta")]
+    rebuilt = state(1)
+    for _, _, data in events:
+        apply_patch(rebuilt, data["patch"])
+    assert rebuilt == state(3)
+    connection.close()
+
+
+def test_last_event_id_too_old_gets_a_snapshot(server):
+    for value in range(DELTA_HISTORY + 2):
+        server.publish(state(value + 1))
+    connection, response = get(server, "/events", {"Last-Event-ID": "1"})
+    (version, event, data), = read_events(response, 1)
+    assert (version, event) == (server.version, "snapshot")
+    assert data["state"] == state(DELTA_HISTORY + 2)
+    connection.close()
@@ -0,0 +1,688 @@
+// The page is a view of the Python GameEngine (engine.py). It renders the
+// view state Python sends as versioned patches and forwards input; the game
+// rules, timing and saving all run in Python.
+let game_state = null;
+
+// Save requests waiting for the background writer, keyed by ticket
+const pending_saves = {};
+const finished_saves = {};
+
+// Initialize QWebChannel
+new QWebChannel(qt.webChannelTransport, function(channel) {
+    window.bridge = channel.objects.bridge;
+    bridge.mark_startup('bridge_ready');
+    bridge.save_finished.connect(on_save_finished);
+    // Looked up on every call so telemetry can wrap it
+    bridge.state_delta.connect((version, patch_json) => on_state_delta(version, patch_json));
+    // Queued in the same task, so these go to Python as a single batch
+    bridge_call('get_telemetry_enabled').then(set_telemetry);
+    load_game();
+});
+
+// Bridge operations queued within BRIDGE_BATCH_DELAY are sent to Python as
+// one batch() call, with at most one batch in flight. Python keeps the view
+// state in a versioned mirror and sends only the fields that changed
+// through state_delta.
+const BRIDGE_BATCH_DELAY = 16;
+const bridge_queue = [];
+let bridge_flush_timer = null;
+let bridge_in_flight = false;
+const state_sync = { version: 0, requested: false };
+
+function bridge_call(op, args = []) {
+    // Clicks counted so far go first, so e.g. a purchase sees their bytes
+    queue_pending_clicks();
+    return new Promise((resolve, reject) => {
+        bridge_queue.push({ op: op, args: args, resolve: resolve, reject: reject });
+        schedule_bridge_flush();
+    });
+}
+
+function schedule_bridge_flush() {
+    if (bridge_flush_timer === null && !bridge_in_flight) {
+        bridge_flush_timer = setTimeout(flush_bridge_queue, BRIDGE_BATCH_DELAY);
+    }
+}
+
+function flush_bridge_queue() {
+    bridge_flush_timer = null;
+    if (!window.bridge || bridge_queue.length === 0) {
+        return;
+    }
+    const entries = bridge_queue.splice(0);
+    bridge_in_flight = true;
+    const ops = entries.map(entry => ({ op: entry.op, args: entry.args }));
+    bridge.batch(JSON.stringify(ops)).then(response_json => {
+        const response = JSON.parse(response_json);
+        if (response.error) {
+            entries.forEach(entry => entry.reject(new Error(response.error)));
+        }
+        (response.results || []).forEach((result, index) => {
+            if ('error' in result) {
+                entries[index].reject(new Error(result.error));
+            } else {
+                entries[index].resolve(result.result);
+            }
+        });
+    }).catch(error => {
+        // Entries already settled above ignore this
+        entries.forEach(entry => entry.reject(error));
+    }).finally(() => {
+        bridge_in_flight = false;
+        schedule_bridge_flush();
+    });
+}
+
+// Patches follow the rules in state_sync.py: lists are patched by index,
+// objects field by field, and big numbers {m, e} are replaced whole.
+function is_atomic(value) {
+    if (Array.isArray(value)) {
+        return false;
+    }
+    if (value !== null && typeof value === 'object') {
+        const keys = Object.keys(value);
+        return keys.length === 2 && 'm' in value && 'e' in value;
+    }
+    return true;
+}
+
+function apply_patch(target, patch) {
+    Object.keys(patch).forEach(key => {
+        const value = patch[key];
+        const current = target[key];
+        if (value !== null && typeof value === 'object' && !Array.isArray(value) &&
+                current !== undefined && current !== null && !is_atomic(current)) {
+            apply_patch(current, value);
+        } else {
+            target[key] = JSON.parse(JSON.stringify(value));
+        }
+    });
+}
+
+function on_state_delta(version, patch_json) {
+    if (game_state === null || version <= state_sync.version) {
+        // Covered by the full state that load or get_state returns
+        return;
+    }
+    if (version !== state_sync.version + 1) {
+        // A delta was missed, so there is no base to patch
+        request_state();
+        return;
+    }
+    apply_patch(game_state, JSON.parse(patch_json));
+    state_sync.version = version;
+    update_display();
+}
+
+function request_state() {
+    if (state_sync.requested) {
+        return;
+    }
+    state_sync.requested = true;
+    bridge_call('get_state').then(result => {
+        state_sync.requested = false;
+        set_state(result.version, result.state);
+    });
+}
+
+function set_state(version, state) {
+    const rebuild = game_state === null || game_state.generators.length !== state.generators.length;
+    game_state = state;
+    state_sync.version = version;
+    // A loaded game's milestones are not news
+    shown_milestones = state.milestones.unlocked;
+    if (rebuild) {
+        build_display();
+    } else {
+        update_display();
+    }
+}
+
+// Byte counts, costs and production are big numbers {m, e} = m * 10^e, as
+// produced by bignum.py. Values below BIG_SMALL_LIMIT are plain doubles with
+// e = 0; larger ones are normalized to 1 <= |m| < 10. All arithmetic happens
+// in the Python engine; the page only formats them.
+const BIG_SMALL_DIGITS = 15;
+const BIG_SMALL_LIMIT = Math.pow(10, BIG_SMALL_DIGITS);
+const BIG_ZERO = { m: 0, e: 0 };
+
+function big(value) {
+    // Accept a plain number or an {m, e} object from a save
+    if (typeof value === 'object' && value !== null) {
+        return big_normalize(value.m, value.e);
+    }
+    return big_normalize(value || 0, 0);
+}
+
+function big_normalize(m, e) {
+    if (m === 0 || !isFinite(m)) {
+        return m === 0 ? BIG_ZERO : { m: m, e: 0 };
+    }
+    if (e === 0 && Math.abs(m) < BIG_SMALL_LIMIT) {
+        return { m: m, e: 0 };
+    }
+    let shift = Math.floor(Math.log10(Math.abs(m)));
+    if (shift + e < BIG_SMALL_DIGITS) {
+        return { m: e >= 0 ? m * Math.pow(10, e) : m / Math.pow(10, -e), e: 0 };
+    }
+    m = shift >= 0 ? m / Math.pow(10, shift) : m * Math.pow(10, -shift);
+    // Division can land a hair outside [1, 10)
+    if (Math.abs(m) >= 10) {
+        m /= 10;
+        shift += 1;
+    } else if (Math.abs(m) < 1) {
+        m *= 10;
+        shift -= 1;
+    }
+    return { m: m, e: e + shift };
+}
+
+function big_scientific(a) {
+    if (a.e !== 0 || a.m === 0) {
+        return a;
+    }
+    const shift = Math.floor(Math.log10(Math.abs(a.m)));
+    return { m: shift >= 0 ? a.m / Math.pow(10, shift) : a.m * Math.pow(10, -shift), e: shift };
+}
+
+const SUFFIXES = build_suffixes();
+// Formatted strings keyed by the digits that are actually displayed
+const format_cache = new Map();
+const FORMAT_CACHE_SIZE = 512;
+
+function build_suffixes() {
+    // Short-scale suffixes up to centillion (1e303)
+    const small = ['', 'K', 'M', 'B', 'T', 'Qa', 'Qi', 'Sx', 'Sp', 'Oc', 'No'];
+    const units = ['', 'U', 'D', 'T', 'Qa', 'Qi', 'Sx', 'Sp', 'Oc', 'No'];
+    const tens = ['', 'Dc', 'Vg', 'Tg', 'Qag', 'Qig', 'Sxg', 'Spg', 'Ocg', 'Nog'];
+    const suffixes = small.slice();
+    for (let n = small.length - 1; n <= 100; n++) {
+        suffixes.push(units[n % 10] + tens[Math.floor(n / 10) % 10] + (n >= 100 ? 'Ce' : ''));
+    }
+    return suffixes;
+}
+
+function format_number(value) {
+    const num = typeof value === 'number' ? big(value) : value;
+    if (num.e === 0 && Math.abs(num.m) < 1e3) {
+        return num.m.toFixed(2);
+    }
+    if (num.m < 0) {
+        return '-' + format_number({ m: -num.m, e: num.e });
+    }
+    const sci = big_scientific(num);
+    const group = Math.floor(sci.e / 3);
+    const scaled = sci.m * Math.pow(10, sci.e - group * 3);
+    const key = group * 1e6 + Math.round(scaled * 100);
+    let text = format_cache.get(key);
+    if (text === undefined) {
+        text = group < SUFFIXES.length
+            ? scaled.toFixed(2) + SUFFIXES[group]
+            : `${sci.m.toFixed(2)}e${sci.e}`;
+        if (format_cache.size >= FORMAT_CACHE_SIZE) {
+            format_cache.clear();
+        }
+        format_cache.set(key, text);
+    }
+    return text;
+}
+
+// Clicks are only counted in the event handler; once per animation frame
+// they are sent as a single click(count) operation, so autoclickers firing
+// hundreds of clicks per second cost one engine update and one render per
+// frame.
+let pending_clicks = 0;
+let click_frame_requested = false;
+
+function click_byte() {
+    pending_clicks++;
+    if (!click_frame_requested) {
+        click_frame_requested = true;
+        requestAnimationFrame(send_clicks);
+    }
+}
+
+function send_clicks() {
+    click_frame_requested = false;
+    queue_pending_clicks();
+    schedule_bridge_flush();
+}
+
+function queue_pending_clicks() {
+    if (pending_clicks === 0) {
+        return;
+    }
+    // While a batch is in flight, later frames add to the queued click
+    const last = bridge_queue[bridge_queue.length - 1];
+    if (last && last.op === 'click' && last.args.length === 1) {
+        last.args[0] += pending_clicks;
+    } else {
+        bridge_queue.push({ op: 'click', args: [pending_clicks], resolve: () => {}, reject: () => {} });
+    }
+    pending_clicks = 0;
+}
+
+function set_buy_amount(amount) {
+    // Units bought per click: 1, 10, 100 or 'max'; the engine prices them
+    document.querySelectorAll('.buy-amount button').forEach(button => {
+        button.classList.toggle('active', button.dataset.amount === String(amount));
+    });
+    bridge_call('set_buy_amount', [amount]);
+}
+
+function buy_generator(id) {
+    bridge_call('buy', [id]).then(bought => {
+        // Visual feedback
+        const element = bought && generator_views[id] && generator_views[id].element;
+        if (element) {
+            element.style.backgroundColor = '#4CAF50';
+            setTimeout(() => {
+                element.style.backgroundColor = '';
+            }, 100);
+        }
+    });
+}
+
+// Cached DOM handles, filled in once by build_display()
+let stat_views = null;
+let generator_views = [];
+let render_pending = false;
+
+function update_display() {
+    // Batch every state change in this frame into a single render
+    if (!render_pending) {
+        render_pending = true;
+        requestAnimationFrame(render);
+    }
+}
+
+function set_text(view, key, text) {
+    // Only touch the DOM when the formatted string changed
+    if (view.last[key] !== text) {
+        view.last[key] = text;
+        view[key].textContent = text;
+    }
+}
+
+function set_class(view, name, enabled) {
+    if (view.last[name] !== enabled) {
+        view.last[name] = enabled;
+        view.element.classList.toggle(name, enabled);
+    }
+}
+
+function render() {
+    render_pending = false;
+    if (!stat_views || game_state === null) {
+        return;
+    }
+
+    set_text(stat_views, 'bytes', format_number(game_state.bytes));
+    set_text(stat_views, 'bps', format_number(game_state.bytes_per_second));
+    set_text(stat_views, 'total_bytes', format_number(game_state.total_bytes));
+    set_text(stat_views, 'total_clicks', String(game_state.clicks));
+    set_text(stat_views, 'click_power', format_number(game_state.click_power));
+    set_text(stat_views, 'time_played', format_time(Date.now() - game_state.game_start));
+    const milestones = game_state.milestones;
+    set_text(stat_views, 'milestones', `${milestones.unlocked} / ${milestones.total}`);
+    if (milestones.unlocked > shown_milestones) {
+        show_milestone(milestones);
+    }
+    shown_milestones = milestones.unlocked;
+
+    game_state.generators.forEach((gen, id) => {
+        const view = generator_views[id];
+        if (!view) {
+            return;
+        }
+        set_class(view, 'affordable', gen.affordable);
+        set_class(view, 'locked', !gen.unlocked);
+        if (view.last.unlocked !== gen.unlocked) {
+            view.last.unlocked = gen.unlocked;
+            view.unlock_text.style.display = gen.unlocked ? 'none' : '';
+            view.element.title = gen.unlocked ? 'Click to buy' : gen.unlock_text;
+        }
+
+        set_text(view, 'name', `${gen.name} (${gen.count})`);
+        const label = gen.amount === 1 ? 'Cost' : `Cost (x${gen.amount})`;
+        set_text(view, 'cost', `${label}: ${format_number(gen.cost)} bytes`);
+        set_text(view, 'production', `Producing: ${format_number(gen.production)} bytes/s`);
+    });
+
+    if (!first_tick_reported && window.bridge) {
+        // The first rendered engine tick completes startup
+        first_tick_reported = true;
+        bridge.mark_startup('first_tick');
+    }
+}
+
+// Set once the first engine tick has been rendered and reported
+let first_tick_reported = false;
+// Unlocked milestone count last rendered, to announce new ones
+let shown_milestones = 0;
+
+function build_display() {
+    // Initial HTML structure for stats
+    document.getElementById('stats').innerHTML = `
+        <div>Total Bytes: <span id="total-bytes">0</span></div>
+        <div>Total Clicks: <span id="total-clicks">0</span></div>
+        <div>Click Power: <span id="click-power">1.00</span></div>
+        <div>Time Played: <span id="time-played">0h 0m 0s</span></div>
+        <div>Milestones: <span id="milestones">0 / 0</span></div>
+    `;
+
+    // Initial HTML structure for generators
+    document.getElementById('generators').innerHTML = game_state.generators.map((gen, id) => `
+        <div class="generator" data-id="${id}" onclick="buy_generator(${id})">
+            <div class="generator-name"></div>
+            <div class="generator-cost"></div>
+            <div class="generator-production"></div>
+            <div class="generator-unlock-text">${gen.unlock_text}</div>
+        </div>
+    `).join('');
+
+    stat_views = {
+        bytes: document.getElementById('bytes'),
+        bps: document.getElementById('bps'),
+        total_bytes: document.getElementById('total-bytes'),
+        total_clicks: document.getElementById('total-clicks'),
+        click_power: document.getElementById('click-power'),
+        time_played: document.getElementById('time-played'),
+        milestones: document.getElementById('milestones'),
+        last: {}
+    };
+    generator_views = Array.from(document.querySelectorAll('#generators .generator'), element => ({
+        element: element,
+        name: element.querySelector('.generator-name'),
+        cost: element.querySelector('.generator-cost'),
+        production: element.querySelector('.generator-production'),
+        unlock_text: element.querySelector('.generator-unlock-text'),
+        last: {}
+    }));
+    update_display();
+}
+
+function format_time(ms) {
+    const seconds = Math.floor(ms / 1000);
+    const minutes = Math.floor(seconds / 60);
+    const hours = Math.floor(minutes / 60);
+    return `${hours}h ${minutes % 60}m ${seconds % 60}s`;
+}
+
+function new_game() {
+    if (confirm("Are you sure you want to start a new game? This will erase your current progress.")) {
+        bridge_call('new_game');
+        save_game();  // Save the new game state
+    }
+}
+
+function save_game() {
+    if (window.bridge) {
+        return request_save()
+            .then(response => {
+                // Show save feedback
+                const saveBtn = document.querySelector('.save-button');
+                saveBtn.textContent = 'Saved!';
+                setTimeout(() => {
+                    saveBtn.textContent = 'Save Game';
+                }, 1000);
+                refresh_slots();
+                return response;
+            });
+    }
+}
+
+function request_save() {
+    // Resolves once the engine state has actually been written to disk
+    return new Promise(resolve => {
+        bridge_call('save').then(ticket => {
+            if (ticket in finished_saves) {
+                resolve(finished_saves[ticket]);
+                delete finished_saves[ticket];
+            } else {
+                pending_saves[ticket] = resolve;
+            }
+        });
+    });
+}
+
+function on_save_finished(ticket, message) {
+    const resolve = pending_saves[ticket];
+    if (resolve) {
+        delete pending_saves[ticket];
+        resolve(message);
+    } else {
+        finished_saves[ticket] = message;
+    }
+}
+
+function load_game() {
+    if (window.bridge) {
+        // Python loads the save, credits offline progress and starts ticking
+        bridge_call('load').then(result => {
+            set_state(result.version, result.state);
+            show_load_errors(result.errors);
+            bridge_call('get_offline_summary').then(show_offline_summary);
+            refresh_slots();
+        });
+    }
+}
+
+// Slot names by list position, so names never have to be quoted in markup
+let slot_names = [];
+
+function refresh_slots() {
+    if (window.bridge) {
+        bridge_call('list_slots').then(render_slots);
+    }
+}
+
+function escape_html(text) {
+    return text.replace(/[&<>"']/g, c => `&#${c.charCodeAt(0)};`);
+}
+
+function render_slots(slots) {
+    // Summaries come from the slot index, so no save is decoded to list them
+    document.getElementById('slots').innerHTML = slots.map((slot, index) => `
+        <div class="slot${slot.current ? ' current' : ''}">
+            <div class="slot-name">${escape_html(slot.name)}</div>
+            <div class="slot-details">${format_number(big(slot.total_bytes))} bytes,
+                ${format_time(slot.play_seconds * 1000)} played,
+                ${slot.generator_counts.reduce((a, b) => a + b, 0)} generators,
+                saved ${new Date(slot.last_save).toLocaleString()}</div>
+            ${slot.current ? '' : `<button onclick="load_slot(slot_names[${index}])">Load</button>`}
+            <button onclick="clone_slot(slot_names[${index}])">Clone</button>
+            ${slot.current ? '' : `<button onclick="delete_slot(slot_names[${index}])">Delete</button>`}
+        </div>
+    `).join('');
+    slot_names = slots.map(slot => slot.name);
+}
+
+function load_slot(name) {
+    bridge_call('load_slot', [name]).then(result => {
+        set_state(result.version, result.state);
+        show_load_errors(result.errors);
+        refresh_slots();
+        bridge_call('get_offline_summary').then(show_offline_summary);
+    }).catch(error => alert(error.message));
+}
+
+function new_slot() {
+    const name = document.getElementById('slot-name').value.trim();
+    if (name && !slot_names.includes(name)) {
+        load_slot(name);
+    }
+}
+
+function clone_slot(name) {
+    const target = prompt(`Copy "${name}" as:`, `${name} copy`);
+    if (target) {
+        bridge_call('clone_slot', [name, target]).then(refresh_slots).catch(error => alert(error.message));
+    }
+}
+
+function delete_slot(name) {
+    if (confirm(`Delete the save slot "${name}"?`)) {
+        bridge_call('delete_slot', [name]).then(refresh_slots).catch(error => alert(error.message));
+    }
+}
+
+function rewind_game() {
+    // Snapshots and the event journal reach back to history.earliest
+    bridge_call('get_history').then(history => {
+        const available = Math.floor((history.latest - history.earliest) / 60000);
+        const minutes = parseFloat(prompt(`Rewind how many minutes? (up to ${available})`, '1'));
+        if (minutes > 0) {
+            return bridge_call('rewind', [history.latest - minutes * 60000]).then(result => {
+                set_state(result.version, result.state);
+                refresh_slots();
+            });
+        }
+    }).catch(error => alert(error.message));
+}
+
+function show_load_errors(errors) {
+    // Saves Python could not read, e.g. a damaged slot
+    if (errors && errors.length > 0) {
+        alert(errors.join('\n'));
+    }
+}
+
+function show_milestone(milestones) {
+    const element = document.getElementById('milestone-notice');
+    element.textContent = `Milestone unlocked: ${milestones.latest} - ${milestones.latest_description}`;
+    element.style.display = 'block';
+    clearTimeout(element.hide_timer);
+    element.hide_timer = setTimeout(() => {
+        element.style.display = 'none';
+    }, 5000);
+}
+
+function show_offline_summary(summary) {
+    if (!summary.bytes_earned || big(summary.bytes_earned).m === 0) {
+        return;
+    }
+    const element = document.getElementById('offline-summary');
+    let text = `While you were away for ${format_time(summary.elapsed_seconds * 1000)} ` +
+               `you earned ${format_number(big(summary.bytes_earned))} bytes`;
+    if (summary.capped) {
+        text += ` (capped at ${format_time(summary.credited_seconds * 1000)})`;
+    }
+    element.textContent = text;
+    element.style.display = 'block';
+    setTimeout(() => {
+        element.style.display = 'none';
+    }, 10000);
+}
+
+function show_about() {
+    if (window.bridge) {
+        bridge.show_about();
+    }
+}
+
+function exit_app() {
+    if (window.bridge) {
+        bridge.exit_app();
+    }
+}
+
+// Timing instrumentation. Functions are only wrapped while telemetry is on,
+// so the game runs the original functions when it is off.
+const TELEMETRY_FUNCTIONS = ['on_state_delta', 'render'];
+const TELEMETRY_BRIDGE_METHODS = ['batch', 'save_stats'];
+// Samples kept per metric between flushes to Python
+const TELEMETRY_MAX_SAMPLES = 256;
+const telemetry = { enabled: false, originals: {}, samples: {}, timer: null };
+
+function telemetry_sample(name, ms) {
+    const samples = telemetry.samples[name] || (telemetry.samples[name] = []);
+    if (samples.length < TELEMETRY_MAX_SAMPLES) {
+        samples.push(ms);
+    }
+}
+
+function telemetry_wrap(name, original) {
+    return function(...args) {
+        const start = performance.now();
+        try {
+            return original.apply(this, args);
+        } finally {
+            telemetry_sample(name, performance.now() - start);
+        }
+    };
+}
+
+function telemetry_wrap_bridge(name, original) {
+    // Bridge calls are timed until their promise resolves
+    return function(...args) {
+        const start = performance.now();
+        const result = original.apply(bridge, args);
+        if (result && typeof result.then === 'function') {
+            result.then(() => telemetry_sample(name, performance.now() - start));
+        }
+        return result;
+    };
+}
+
+function set_telemetry(enabled) {
+    enabled = Boolean(enabled);
+    if (enabled === telemetry.enabled || !window.bridge) {
+        return;
+    }
+    telemetry.enabled = enabled;
+    // Python times the engine ticks while instrumentation is on
+    bridge_call('set_telemetry_enabled', [enabled]);
+    if (enabled) {
+        TELEMETRY_FUNCTIONS.forEach(name => {
+            telemetry.originals[name] = window[name];
+            window[name] = telemetry_wrap(name, window[name]);
+        });
+        TELEMETRY_BRIDGE_METHODS.forEach(name => {
+            telemetry.originals['bridge.' + name] = bridge[name];
+            bridge[name] = telemetry_wrap_bridge('bridge.' + name, bridge[name]);
+        });
+        telemetry.timer = setInterval(flush_telemetry, 1000);
+    } else {
+        TELEMETRY_FUNCTIONS.forEach(name => {
+            window[name] = telemetry.originals[name];
+        });
+        TELEMETRY_BRIDGE_METHODS.forEach(name => {
+            bridge[name] = telemetry.originals['bridge.' + name];
+        });
+        clearInterval(telemetry.timer);
+        flush_telemetry();
+    }
+    document.getElementById('perf-overlay').style.display = enabled ? 'block' : 'none';
+}
+
+function flush_telemetry() {
+    if (Object.keys(telemetry.samples).length > 0) {
+        bridge_call('report_timings', [telemetry.samples]);
+        telemetry.samples = {};
+    }
+    if (telemetry.enabled) {
+        bridge_call('get_timing_summary').then(render_perf_overlay);
+    }
+}
+
+function render_perf_overlay(summary) {
+    const rows = Object.keys(summary).map(name => {
+        const stats = summary[name];
+        return `${name.padEnd(28)} ${stats.p50.toFixed(3).padStart(8)} ${stats.p95.toFixed(3).padStart(8)} ` +
+               `${stats.p99.toFixed(3).padStart(8)} ${String(stats.count).padStart(6)}`;
+    });
+    document.getElementById('perf-overlay').textContent =
+        `${'ms'.padEnd(28)} ${'p50'.padStart(8)} ${'p95'.padStart(8)} ${'p99'.padStart(8)} ${'n'.padStart(6)}\n` +
+        rows.join('\n');
+}
+
+document.addEventListener('keydown', event => {
+    if (event.key === 'F3') {
+        event.preventDefault();
+        set_telemetry(!telemetry.enabled);
+    }
+});
+
+// Auto-save every minute
+setInterval(save_game, 60000);
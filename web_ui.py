@@ -0,0 +1,359 @@
+"""Web front end: the game page in QWebEngineView and its QWebChannel bridge"""
+
+import os
+import json
+import mimetypes
+import time
+from PyQt6.QtWidgets import QApplication, QMainWindow, QMessageBox
+from PyQt6.QtCore import (QUrl, QObject, pyqtSlot, pyqtSignal, QCoreApplication,
+                          QBuffer, QByteArray, QIODevice, QEvent)
+from PyQt6.QtWebEngineCore import (QWebEngineProfile, QWebEnginePage, QWebEngineUrlScheme,
+                                   QWebEngineUrlSchemeHandler, QWebEngineUrlRequestJob)
+from PyQt6.QtWebEngineWidgets import QWebEngineView
+from PyQt6.QtWebChannel import QWebChannel
+from bignum import json_default
+from state_sync import StateMirror
+from session import VERSION, GameSession
+
+# Page files are served from here under app://game/
+WEB_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "web")
+APP_SCHEME = b"app"
+START_URL = "app://game/index.html"
+# Shortest interval between view snapshots sent to the page, in milliseconds
+SNAPSHOT_INTERVAL_MS = 100
+
+
+def register_app_scheme():
+    """Register the app:// scheme; must run before QApplication is created"""
+    scheme = QWebEngineUrlScheme(APP_SCHEME)
+    scheme.setSyntax(QWebEngineUrlScheme.Syntax.Host)
+    scheme.setFlags(QWebEngineUrlScheme.Flag.SecureScheme |
+                    QWebEngineUrlScheme.Flag.LocalScheme |
+                    QWebEngineUrlScheme.Flag.LocalAccessAllowed |
+                    QWebEngineUrlScheme.Flag.CorsEnabled)
+    QWebEngineUrlScheme.registerScheme(scheme)
+
+
+class AppSchemeHandler(QWebEngineUrlSchemeHandler):
+    """Serve the page files from memory under app://game/"""
+
+    def __init__(self, root, parent=None):
+        super().__init__(parent)
+        self.root = root
+        self._files = {}
+        self.preload()
+
+    def preload(self):
+        """Read every page file once so requests never touch the disk"""
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if os.path.isfile(path):
+                with open(path, 'rb') as f:
+                    mime = mimetypes.guess_type(name)[0] or "application/octet-stream"
+                    self._files[name] = (QByteArray(mime.encode('ascii')), QByteArray(f.read()))
+
+    def requestStarted(self, job):
+        """Reply to an app:// request from the preloaded files"""
+        name = job.requestUrl().path().lstrip("/") or "index.html"
+        if name not in self._files:
+            job.fail(QWebEngineUrlRequestJob.Error.UrlNotFound)
+            return
+        mime, data = self._files[name]
+        buffer = QBuffer(job)
+        buffer.setData(data)
+        buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+        job.reply(mime, buffer)
+
+
+class WebBridge(QObject):
+    """Bridge class for JavaScript to Python communication"""
+
+    # Emitted on the GUI thread once the write covering a save ticket is done
+    save_finished = pyqtSignal(int, str)
+    # Emitted when the page reports its first rendered game tick
+    startup_complete = pyqtSignal()
+    # Emitted with (version, patch JSON) when the engine's view state changes
+    state_delta = pyqtSignal(int, str)
+    
+    def __init__(self, session=None):
+        super().__init__()
+        self.startup_profile = None
+        # Engine, ticking and the save path, shared with the native front end
+        self.session = session or GameSession(self)
+        self.engine = self.session.engine
+        self.save_writer = self.session.save_writer
+        self.telemetry = self.session.telemetry
+        self.session.save_finished.connect(self.save_finished)
+        self.session.ticked.connect(self.push_view)
+        # The view state last sent to the page; it receives patches of it
+        self.mirror = StateMirror()
+        self.snapshot_interval_ms = SNAPSHOT_INTERVAL_MS
+        self._last_push = 0.0
+        # Operations the page may send through batch(), with decoded arguments
+        self.batch_ops = {
+            "click": self.session.click,
+            "buy": self.session.buy,
+            "set_buy_amount": self.session.set_buy_amount,
+            "new_game": self.session.new_game,
+            "save": self.session.save,
+            "load": self._load_state,
+            "get_state": self._get_state,
+            "get_offline_summary": lambda: self.session.offline_summary or {},
+            "save_stats": self.save_writer.stats,
+            "get_telemetry_enabled": lambda: self.session.telemetry_enabled,
+            "set_telemetry_enabled": self.session.set_telemetry_enabled,
+            "report_timings": self.telemetry.record_batch,
+            "get_timing_summary": self.telemetry.summary,
+            "list_slots": self.session.list_slots,
+            "load_slot": self._load_slot,
+            "delete_slot": self.session.delete_slot,
+            "clone_slot": self.session.clone_slot,
+            "get_history": self.session.history,
+            "list_milestones": self.engine.milestones.list,
+            "start_recording": self.session.start_recording,
+            "stop_recording": self.session.stop_recording,
+            "rewind": self._rewind,
+        }
+    
+    @pyqtSlot(result=str)
+    def load_game(self):
+        """Load game state from file and credit production earned while away"""
+        if not self._load_state()["loaded"]:
+            return "{}"
+        return json.dumps(self.engine.to_state(), default=json_default)
+
+    def _load_state(self):
+        """Load the save into the engine, start ticking and return the view state"""
+        loaded = self.session.load()
+        return dict(self._get_state(), loaded=loaded, errors=self.session.take_load_errors())
+
+    def _load_slot(self, name):
+        """Switch to a save slot and return its view state"""
+        loaded = self.session.load_slot(name)
+        return dict(self._get_state(), loaded=loaded, errors=self.session.take_load_errors())
+
+    def _rewind(self, time):
+        """Rewind the game to an earlier engine time and return the view state"""
+        self.session.rewind(time)
+        return self._get_state()
+
+    def _get_state(self):
+        """Return the current view state and its version for a full refresh"""
+        self.push_view(force=True)
+        return {"version": self.mirror.version, "state": self.mirror.snapshot()}
+
+    def push_view(self, force=False):
+        """Send the page the fields of the view state that changed, at most once per interval
+
+        Pushes follow the ticks, so half a tick of slack keeps timer jitter
+        from dropping every other push when the interval is a tick long.
+        """
+        now = time.perf_counter() * 1000
+        if not force and now - self._last_push < self.snapshot_interval_ms - self.session.engine.tick_ms / 2:
+            return
+        self._last_push = now
+        # Only generators that changed are compared and sent
+        fields, generators = self.engine.view_delta()
+        version, patch = self.mirror.update(fields, {"generators": generators})
+        if patch:
+            self.state_delta.emit(version, json.dumps(patch))
+
+    @pyqtSlot(str, result=str)
+    def batch(self, operations):
+        """Run a JSON list of {"op", "args"} operations and return their results
+
+        Results are returned in order as {"result": ...} or {"error": ...}.
+        Changes made by the operations reach the page right away as a
+        state_delta instead of waiting for the next snapshot interval.
+        """
+        try:
+            operations = json.loads(operations)
+        except ValueError as e:
+            return json.dumps({"version": self.mirror.version, "error": str(e)})
+        if not isinstance(operations, list) or not all(isinstance(operation, dict) for operation in operations):
+            return json.dumps({"version": self.mirror.version,
+                               "error": "Operations must be a list of {\"op\", \"args\"} objects"})
+        results = []
+        for operation in operations:
+            handler = self.batch_ops.get(operation.get("op"))
+            args = operation.get("args", [])
+            if handler is None:
+                results.append({"error": f"Unknown operation {operation.get('op')!r}"})
+                continue
+            if not isinstance(args, list):
+                results.append({"error": f"Arguments of {operation['op']!r} must be a list"})
+                continue
+            try:
+                results.append({"result": handler(*args)})
+            except Exception as e:
+                results.append({"error": str(e)})
+        self.push_view(force=True)
+        return json.dumps({"version": self.mirror.version, "results": results}, default=json_default)
+
+    def _call(self, handler, *args):
+        """Run one operation and return {"result": ...} or {"error": ...} as JSON"""
+        try:
+            reply = {"result": handler(*args)}
+        except Exception as e:
+            reply = {"error": str(e)}
+        return json.dumps(reply, default=json_default)
+
+    @pyqtSlot(result=str)
+    def list_slots(self):
+        """Return the save slot summaries as JSON, most recently saved first"""
+        return self._call(self.session.list_slots)
+
+    @pyqtSlot(str, result=str)
+    def load_slot(self, name):
+        """Save the current game and switch to a slot, creating it if needed"""
+        return self._call(self._load_slot, name)
+
+    @pyqtSlot(str, result=str)
+    def delete_slot(self, name):
+        """Delete a save slot other than the one in use"""
+        return self._call(self.session.delete_slot, name)
+
+    @pyqtSlot(str, str, result=str)
+    def clone_slot(self, source, target):
+        """Copy a save slot under a new name"""
+        return self._call(self.session.clone_slot, source, target)
+
+    @pyqtSlot(result=str)
+    def get_offline_summary(self):
+        """Return the offline progress credited by the last load as JSON"""
+        return json.dumps(self.session.offline_summary or {}, default=json_default)
+
+    @pyqtSlot(result=str)
+    def save_stats(self):
+        """Return save queue depth and write latency statistics as JSON"""
+        return json.dumps(self.save_writer.stats())
+
+    @pyqtSlot(result=bool)
+    def get_telemetry_enabled(self):
+        """Whether the page should start with timing instrumentation on"""
+        return self.session.telemetry_enabled
+
+    @pyqtSlot(str)
+    def report_timings(self, batch):
+        """Store a batch of page timings sent as {name: [ms, ...]}"""
+        try:
+            self.telemetry.record_batch(json.loads(batch))
+        except (ValueError, AttributeError, TypeError):
+            pass
+
+    @pyqtSlot(result=str)
+    def get_timing_summary(self):
+        """Return p50/p95/p99 timings per instrumented function as JSON"""
+        return json.dumps(self.telemetry.summary())
+
+    @pyqtSlot(str)
+    def mark_startup(self, name):
+        """Record a startup milestone reached by the page"""
+        if self.startup_profile is not None:
+            self.startup_profile.mark(name)
+        if name == "first_tick":
+            self.startup_complete.emit()
+
+    @pyqtSlot()
+    def show_about(self):
+        """Show the About dialog"""
+        msg = QMessageBox()
+        msg.setWindowTitle("About Byte Clicker")
+        msg.setText(f"Byte Clicker v{VERSION}")
+        msg.setInformativeText("A fun incremental game about collecting bytes!\n\n"
+                              "Click to generate bytes and buy generators to automate your byte production.\n\n"
+                              "© 2024 Byte Clicker")
+        msg.setIcon(QMessageBox.Icon.Information)
+        msg.exec()
+        
+    @pyqtSlot()
+    def exit_app(self):
+        """Exit the application with confirmation"""
+        reply = QMessageBox.question(None, 'Exit Confirmation',
+                                   'Are you sure you want to exit?\nMake sure to save your game!',
+                                   QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                                   QMessageBox.StandardButton.No)
+        
+        if reply == QMessageBox.StandardButton.Yes:
+            QCoreApplication.quit()
+
+class WebWindow(QMainWindow):
+    def __init__(self, startup_profile=None):
+        super().__init__()
+        self.setWindowTitle(f"Byte Clicker v{VERSION}")
+        self.startup_profile = startup_profile
+        
+        # Set fixed size 1280x720
+        self.setFixedSize(1280, 720)
+        
+        # Center window on screen
+        self.center_window()
+        
+        # Create WebView
+        self.web_view = QWebEngineView(self)
+        self.setCentralWidget(self.web_view)
+        self.setup_profile()
+        
+        # Create bridge object
+        self.bridge = WebBridge()
+        self.bridge.startup_profile = startup_profile
+        
+        # Set up QWebChannel
+        self.setup_web_channel()
+        
+        # Load initial HTML
+        self.load_html()
+    
+    def center_window(self):
+        """Center the window on the screen"""
+        screen = QApplication.primaryScreen().geometry()
+        size = self.geometry()
+        x = (screen.width() - size.width()) // 2
+        y = (screen.height() - size.height()) // 2
+        self.move(x, y)
+
+    def setup_profile(self):
+        """Use a persistent profile so Chromium keeps its disk caches between runs"""
+        # Parented to the application so the page is destroyed first
+        self.profile = QWebEngineProfile("ByteClicker", QApplication.instance())
+        self.profile.setHttpCacheType(QWebEngineProfile.HttpCacheType.DiskHttpCache)
+        self.scheme_handler = AppSchemeHandler(WEB_ROOT, self.profile)
+        self.profile.installUrlSchemeHandler(APP_SCHEME, self.scheme_handler)
+        self.web_view.setPage(QWebEnginePage(self.profile, self.web_view))
+        # Let Chromium freeze the page's timers while it is hidden
+        self.web_view.page().recommendedStateChanged.connect(self.apply_lifecycle_state)
+
+    def apply_lifecycle_state(self, state):
+        """Follow Chromium's lifecycle recommendation, except discarding the page"""
+        if state != QWebEnginePage.LifecycleState.Discarded:
+            self.web_view.page().setLifecycleState(state)
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.WindowStateChange:
+            self.update_activity()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.update_activity()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.update_activity()
+
+    def update_activity(self):
+        """Tell the bridge whether the game can be seen"""
+        self.bridge.session.set_window_active(self.isVisible() and not self.isMinimized())
+    
+    def setup_web_channel(self):
+        """Set up the QWebChannel for JavaScript bridge"""
+        page = self.web_view.page()
+        self.channel = QWebChannel(page)
+        page.setWebChannel(self.channel)
+        self.channel.registerObject("bridge", self.bridge)
+    
+    def load_html(self):
+        """Load the game page from the app:// scheme"""
+        if self.startup_profile is not None:
+            self.web_view.loadFinished.connect(lambda ok: self.startup_profile.mark("load_finished"))
+        self.web_view.load(QUrl(START_URL))